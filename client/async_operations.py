@@ -0,0 +1,711 @@
+import time
+import asyncio
+import inspect
+import functools
+from collections import deque
+from collections.abc import AsyncIterator
+from common import protocol, serialization
+from common.singleflight import AsyncSingleFlight
+from common.enums import OperationsEnum
+from client import tcp_client
+from client.operations import HOST, PORT, format_command, command_args
+from client.rpc_exception import RPCServerNotFound
+
+class _DatagramQuery(asyncio.DatagramProtocol):
+    """
+        Protocolo UDP de uma única consulta ao Name Server.
+    """
+
+    def __init__(self, future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+async def resolve_operation(cmd, host, port, timeout=tcp_client.DNS_TIMEOUT):
+    """
+        Versão assíncrona de tcp_client.resolve_operation (consulta UDP ao Name Server, repetida por TCP se a resposta
+        vier truncada).
+
+        Returns:
+            tuple[tcp_client.Resolution | None, float]: Réplicas candidatas e estratégia (ou None) e TTL em segundos.
+
+        Raises:
+            RPCServerNotFound: Se o Name Server não responder.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    try:
+        transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramQuery(future), remote_addr=(host, port))
+    except OSError:
+        raise RPCServerNotFound(host, port) from None
+
+    try:
+        transport.sendto(cmd.encode())
+        data = await asyncio.wait_for(future, timeout)
+    except (OSError, asyncio.TimeoutError):
+        raise RPCServerNotFound(host, port) from None
+    finally:
+        transport.close()
+
+    response = tcp_client._decode_resolution(data)
+    if response.get('truncated', False):
+        response = tcp_client._decode_resolution(await _resolve_tcp(cmd, host, port, timeout))
+
+    return tcp_client._parse_resolution(response)
+
+async def _resolve_tcp(cmd, host, port, timeout):
+    """
+        Versão assíncrona de tcp_client._resolve_tcp (consulta ao Name Server por TCP).
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        raise RPCServerNotFound(host, port) from None
+
+    try:
+        protocol.write_frame(writer, cmd.encode())
+        await writer.drain()
+        frame = await asyncio.wait_for(protocol.read_frame_async(reader), timeout)
+    except (OSError, protocol.ProtocolError, asyncio.TimeoutError):
+        raise RPCServerNotFound(host, port) from None
+    finally:
+        writer.close()
+
+    if frame is None:
+        raise RPCServerNotFound(host, port)
+
+    return frame[1]
+
+class AsyncConnectionPool:
+    """
+        Pool de conexões persistentes baseadas em asyncio streams, por servidor (host, porta).
+
+        Mesmo comportamento do tcp_client.ConnectionPool: conexões ociosas são reutilizadas, falhas de E/S descartam a
+        conexão e uma conexão reaproveitada que falhar é substituída por uma nova uma única vez.
+
+        Attributes:
+            max_size (int): Número máximo de conexões ociosas mantidas por servidor.
+            idle_timeout (float): Tempo máximo, em segundos, que uma conexão pode ficar ociosa no pool.
+            connect_timeout (float): Timeout, em segundos, para abrir novas conexões.
+    """
+
+    def __init__(self, max_size=tcp_client.POOL_MAX_SIZE, idle_timeout=tcp_client.POOL_IDLE_TIMEOUT,
+                 connect_timeout=tcp_client.CONNECT_TIMEOUT, wire_format=tcp_client.WIRE_FORMAT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.wire_format = wire_format
+        self._idle = {}
+        self._outstanding = {}
+
+    def outstanding(self, host, port):
+        """
+            Número de requisições em andamento para o servidor (usado pela estratégia least_outstanding).
+        """
+        return self._outstanding.get((host, port), 0)
+
+    async def _negotiate(self, reader, writer):
+        """
+            Oferece o formato binário ao servidor (frame FLAG_HELLO), se configurado.
+
+            Returns:
+                bool: True se o servidor aceitou o formato binário.
+        """
+        if self.wire_format != serialization.WIRE_BINARY:
+            return False
+
+        protocol.write_frame(writer, ','.join(serialization.SUPPORTED_WIRE_FORMATS).encode(), protocol.FLAG_HELLO)
+        await writer.drain()
+
+        frame = await protocol.read_frame_async(reader)
+        if frame is None:
+            raise protocol.ProtocolError('Conexão encerrada durante a negociação')
+
+        flags, payload = frame
+        return bool(flags & protocol.FLAG_HELLO) and payload == serialization.WIRE_BINARY.encode()
+
+    async def acquire(self, host, port):
+        """
+            Obtém uma conexão (reader, writer, binary) para o servidor.
+
+            Returns:
+                tuple[tuple[asyncio.StreamReader, asyncio.StreamWriter, bool], bool]: A conexão (com o formato negociado)
+                e se ela foi reaproveitada.
+
+            Raises:
+                RPCServerNotFound: Se não for possível abrir uma nova conexão.
+        """
+        idle = self._idle.get((host, port))
+        now = time.monotonic()
+
+        while idle:
+            reader, writer, binary, last_used = idle.pop()
+            if now - last_used < self.idle_timeout and not reader.at_eof():
+                return (reader, writer, binary), True
+            writer.close()
+
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.connect_timeout)
+        except (OSError, asyncio.TimeoutError):
+            raise RPCServerNotFound(host, port) from None
+
+        protocol.configure_socket(writer.get_extra_info('socket'))
+
+        try:
+            binary = await asyncio.wait_for(self._negotiate(reader, writer), self.connect_timeout)
+        except (OSError, protocol.ProtocolError, asyncio.TimeoutError):
+            writer.close()
+            raise RPCServerNotFound(host, port) from None
+
+        return (reader, writer, binary), False
+
+    def release(self, host, port, conn):
+        """
+            Devolve uma conexão saudável ao pool (ou a fecha se o pool estiver cheio).
+        """
+        reader, writer, binary = conn
+        idle = self._idle.setdefault((host, port), deque())
+
+        if len(idle) < self.max_size:
+            idle.append((reader, writer, binary, time.monotonic()))
+        else:
+            writer.close()
+
+    async def pipeline(self, host, port, messages, window=tcp_client.PIPELINE_WINDOW):
+        """
+            Envia uma ou mais mensagens (comando ou lista de comandos) por uma única conexão e retorna as respostas na ordem.
+
+            As mensagens são codificadas no formato negociado pela conexão. No máximo window frames ficam sem resposta
+            ao mesmo tempo.
+
+            Returns:
+                list[tuple[int, bytes]]: Respostas (flags, payload).
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver inacessível ou encerrar a conexão antes de responder tudo.
+        """
+        address = (host, port)
+        self._outstanding[address] = self._outstanding.get(address, 0) + len(messages)
+        try:
+            return await self._pipeline(host, port, messages, window)
+        finally:
+            self._outstanding[address] -= len(messages)
+            if not self._outstanding[address]:
+                del self._outstanding[address]
+
+    async def _pipeline(self, host, port, messages, window):
+        while True:
+            conn, reused = await self.acquire(host, port)
+            reader, writer, binary = conn
+            responses = []
+
+            try:
+                sent = 0
+                while len(responses) < len(messages):
+                    while sent < len(messages) and sent - len(responses) < window:
+                        flags, payload = serialization.encode_request(messages[sent], binary)
+                        protocol.write_frame(writer, payload, flags)
+                        sent += 1
+                    await writer.drain()
+
+                    frame = await protocol.read_frame_async(reader)
+                    if frame is None:
+                        break
+                    responses.append(frame)
+            except (OSError, protocol.ProtocolError):
+                pass
+
+            if len(responses) == len(messages):
+                self.release(host, port, conn)
+                return responses
+
+            writer.close()
+            if not reused or responses:
+                raise RPCServerNotFound(host, port)
+
+    async def stream(self, host, port, message):
+        """
+            Versão assíncrona de tcp_client.ConnectionPool.stream: gera os frames de uma resposta em partes
+            (FLAG_STREAM) à medida que chegam, fechando a conexão se a iteração for interrompida antes do fim.
+
+            Yields:
+                tuple[int, bytes]: Frames (flags, payload) da resposta.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver inacessível ou encerrar a conexão antes do fim da resposta.
+        """
+        address = (host, port)
+        self._outstanding[address] = self._outstanding.get(address, 0) + 1
+        try:
+            while True:
+                conn, reused = await self.acquire(host, port)
+                reader, writer, binary = conn
+
+                try:
+                    flags, payload = serialization.encode_request(message, binary)
+                    protocol.write_frame(writer, payload, flags | protocol.FLAG_STREAM)
+                    await writer.drain()
+                    frame = await protocol.read_frame_async(reader)
+                except (OSError, protocol.ProtocolError):
+                    frame = None
+
+                if frame is not None:
+                    break
+
+                writer.close()
+                if not reused:
+                    raise RPCServerNotFound(host, port)
+
+            try:
+                while frame[0] & protocol.FLAG_STREAM and frame[1]:
+                    yield frame
+                    frame = await protocol.read_frame_async(reader)
+                    if frame is None:
+                        raise protocol.ProtocolError('Conexão encerrada no meio de uma resposta em partes')
+            except (OSError, protocol.ProtocolError):
+                writer.close()
+                raise RPCServerNotFound(host, port) from None
+            except BaseException:
+                writer.close()
+                raise
+
+            self.release(host, port, conn)
+            yield frame
+        finally:
+            self._outstanding[address] -= 1
+            if not self._outstanding[address]:
+                del self._outstanding[address]
+
+    async def request(self, host, port, message):
+        """
+            Executa uma requisição (um frame de ida e um de volta).
+
+            Returns:
+                tuple[int, bytes]: Tupla (flags, payload) da resposta.
+        """
+        responses = await self.pipeline(host, port, [message])
+        return responses[0]
+
+    def clear(self):
+        """
+            Fecha todas as conexões ociosas do pool.
+        """
+        for idle in self._idle.values():
+            for reader, writer, binary, last_used in idle:
+                writer.close()
+        self._idle.clear()
+
+async def _stream_chunks(frame, frames):
+    """
+        Decodifica as partes de uma resposta em partes até o frame vazio que a encerra.
+    """
+    try:
+        while frame[1]:
+            yield serialization.decode_stream_chunk(*frame)
+            frame = await frames.__anext__()
+    finally:
+        await frames.aclose()
+
+def async_cache_operation(cmd):
+    """
+        Decorator equivalente a cache_operation para métodos assíncronos.
+
+        Args:
+            cmd (str): Comando da operação (ex: 'sum', 'sub', 'prod').
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            return await self._process_operation(cmd, *command_args(signature, self, args, kwargs), use_cache=True)
+        return wrapper
+    return decorator
+
+def async_cache_text_operation(cmd):
+    """
+        Decorator equivalente a cache_text_operation para métodos assíncronos.
+
+        Args:
+            cmd (str): O comando da operação definido no OperationsEnum.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, text: str, **kwargs):
+            if not text or not isinstance(text, str):
+                return 'Erro: problema inválido'
+            return await self._process_operation(cmd, text, use_cache=True)
+        return wrapper
+    return decorator
+
+class AsyncOperations:
+    """
+        Cliente RPC assíncrono (asyncio), com a mesma interface de Operations.
+
+        Permite disparar centenas de chamadas concorrentes a partir de uma única thread (ex: com asyncio.gather).
+        Compartilha com o cliente síncrono o cache de resultados em memória e o cache de resoluções do Name Server.
+
+        Attributes:
+            ip (str): Endereço IP do Name Server.
+            port (int): Porta UDP do Name Server.
+            pool (AsyncConnectionPool): Pool de conexões persistentes usado pelo cliente.
+            selector (tcp_client.ReplicaSelector): Ordem de tentativa das réplicas, com a carga medida pelo pool.
+            flights (AsyncSingleFlight): Deduplicação de chamadas simultâneas do mesmo comando ao mesmo servidor.
+
+        Note:
+            Uma instância (e seu pool) deve ser usada sempre no mesmo event loop.
+    """
+
+    def __init__(self, ip=HOST, port=PORT):
+        """
+            Inicializa o cliente assíncrono.
+
+            Args:
+                ip (str, optional): Endereço IP do Name Server.
+                port (int, optional): Porta UDP do Name Server.
+        """
+        self.ip = ip
+        self.port = port
+        self.pool = AsyncConnectionPool()
+        self.selector = tcp_client.ReplicaSelector(self.pool.outstanding)
+        self.flights = AsyncSingleFlight()
+
+    async def _resolve(self, cmd):
+        """
+            Resolve as réplicas de uma operação, usando o cache de resoluções compartilhado.
+
+            Returns:
+                tuple[tcp_client.Resolution | None, bool]: Resolução (ou None) e se veio do cache.
+        """
+        cached, resolution = tcp_client.resolution_cache.get(cmd)
+        if not cached:
+            resolution, ttl = await resolve_operation(cmd, self.ip, self.port)
+            tcp_client.resolution_cache.put(cmd, resolution, ttl)
+        return resolution, cached
+
+    async def _call_replicas(self, command, resolution, use_cache):
+        """
+            Executa um comando na primeira réplica disponível, com failover para as seguintes (ver
+            tcp_client._call_replicas).
+        """
+        addresses = self.selector.order(resolution)
+
+        for i, (host, port) in enumerate(addresses):
+            last = i == len(addresses) - 1
+            try:
+                return await self._call(command, host, port, use_cache, disk_fallback=last)
+            except RPCServerNotFound:
+                self.selector.mark_failed(host, port)
+                if last:
+                    raise
+
+    async def _call(self, command, host, port, use_cache, disk_fallback=True):
+        """
+            Executa um comando em um servidor, com cache em memória e fallback para o cache em disco.
+        """
+        if use_cache:
+            hit, response = tcp_client._get_cached_response(command)
+            if hit:
+                return response
+
+        async def request():
+            flags, payload = await self.pool.request(host, port, command)
+            return serialization.decode_reply(flags, payload)
+
+        try:
+            response, ttl = await self.flights.do((host, port, command), request)
+        except RPCServerNotFound:
+            tcp_client.resolution_cache.invalidate_address(host, port)
+            if use_cache and disk_fallback:
+                hit, response = tcp_client.offline_store.lookup(command)
+                if hit:
+                    return response
+            raise
+
+        if use_cache:
+            tcp_client._cache_response(command, response, ttl)
+
+        return response
+
+    async def _process_operation(self, cmd, *args, use_cache:bool=False):
+        """
+            Orquestra o fluxo DNS -> Servidor de Operação de forma assíncrona.
+
+            Args:
+                cmd (str): Comando da operação.
+                *args: Argumentos da operação.
+                use_cache (bool): Define se o cliente deve aceitar respostas do cache local/remoto.
+        """
+        if cmd == OperationsEnum.FAT.value:
+            if not args or args[0] is None:
+                return 'Erro: É necessário fornecer um número para calcular o fatorial'
+
+        command = format_command(cmd, *args)
+
+        resolution, cached = await self._resolve(cmd)
+        if resolution is None:
+            return 'Erro: Operação não suportada'
+
+        try:
+            return await self._call_replicas(command, resolution, use_cache)
+        except RPCServerNotFound as e:
+            if not cached:
+                raise
+            error = e
+
+        # A resolução em cache pode estar desatualizada: consulta o Name Server novamente
+        tcp_client.resolution_cache.invalidate(cmd)
+        new_resolution, cached = await self._resolve(cmd)
+
+        if new_resolution is None:
+            return 'Erro: Operação não suportada'
+        if set(new_resolution.replicas) == set(resolution.replicas):
+            raise error
+
+        return await self._call_replicas(command, new_resolution, use_cache)
+
+    async def _process_stream(self, cmd, *args, sink=None):
+        """
+            Versão assíncrona de Operations._process_stream: resolve as réplicas e inicia a resposta em partes na
+            primeira que aceitar a requisição.
+        """
+        command = format_command(cmd, *args)
+
+        resolution, cached = await self._resolve(cmd)
+        if resolution is None:
+            return 'Erro: Operação não suportada'
+
+        addresses = self.selector.order(resolution)
+
+        for i, (host, port) in enumerate(addresses):
+            try:
+                result = await self._open_stream(command, host, port)
+                break
+            except RPCServerNotFound:
+                tcp_client.resolution_cache.invalidate_address(host, port)
+                self.selector.mark_failed(host, port)
+                if i == len(addresses) - 1:
+                    raise
+
+        if sink is None or not isinstance(result, AsyncIterator):
+            return result
+
+        count = 0
+        async for chunk in result:
+            count += tcp_client._write_chunk(chunk, sink)
+        return count
+
+    async def _open_stream(self, command, host, port):
+        """
+            Versão assíncrona de tcp_client.stream_connection.
+
+            Returns:
+                AsyncIterator[any]: Partes do resultado.
+                any: Resposta completa (ex: mensagem de erro), se o servidor respondeu em um único frame.
+        """
+        frames = self.pool.stream(host, port, command)
+        flags, payload = await frames.__anext__()
+
+        if not flags & protocol.FLAG_STREAM:
+            await frames.aclose()
+            return serialization.decode_reply(flags, payload)[0]
+
+        return _stream_chunks((flags, payload), frames)
+
+    async def batch(self, requests, use_cache:bool=True):
+        """
+            Versão assíncrona de Operations.batch: executa várias operações agrupadas por servidor.
+
+            Os grupos de servidores diferentes são enviados concorrentemente.
+
+            Args:
+                requests (list[tuple[str, tuple | any]]): Lista de pares (operação, argumentos).
+                use_cache (bool, optional): Define se o cliente deve aceitar respostas do cache local.
+
+            Returns:
+                list: Resultados na mesma ordem das requisições. Requisições de um servidor offline (sem cache em disco)
+                    recebem mensagem de erro, sem afetar as demais.
+        """
+        results = [None] * len(requests)
+        groups = {}
+
+        for i, (cmd, args) in enumerate(requests):
+            if not isinstance(args, (tuple, list)):
+                args = () if args is None else (args,)
+
+            command = format_command(cmd, *args)
+            if use_cache:
+                hit, response = tcp_client._get_cached_response(command)
+                if hit:
+                    results[i] = response
+                    continue
+
+            resolution, cached = await self._resolve(cmd)
+            if resolution is None:
+                results[i] = 'Erro: Operação não suportada'
+                continue
+
+            groups.setdefault(resolution, []).append((i, command))
+
+        async def run_group(resolution, items):
+            chunks = [items[i:i + tcp_client.BATCH_SIZE] for i in range(0, len(items), tcp_client.BATCH_SIZE)]
+            messages = [[command for i, command in chunk] for chunk in chunks]
+            addresses = self.selector.order(resolution)
+
+            for j, (host, port) in enumerate(addresses):
+                try:
+                    frames = await self.pool.pipeline(host, port, messages)
+                    break
+                except RPCServerNotFound as e:
+                    tcp_client.resolution_cache.invalidate_address(host, port)
+                    self.selector.mark_failed(host, port)
+                    if j == len(addresses) - 1:
+                        for i, command in items:
+                            results[i] = tcp_client._offline_response(command, e, use_cache)
+                        return
+
+            for chunk, (flags, payload) in zip(chunks, frames):
+                for (i, command), (response, ttl) in zip(chunk, serialization.decode_batch_reply(flags, payload)):
+                    results[i] = response
+                    if use_cache:
+                        tcp_client._cache_response(command, response, ttl)
+
+        await asyncio.gather(*(run_group(resolution, items) for resolution, items in groups.items()))
+        return results
+
+    def close(self):
+        """
+            Fecha as conexões ociosas do cliente.
+        """
+        self.pool.clear()
+
+    @async_cache_operation(OperationsEnum.SUM.value)
+    async def sum(self, *args):
+        """
+            Realiza a soma de múltiplos números.
+
+            Returns:
+                float: Resultado da soma.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.SUB.value)
+    async def sub(self, *args):
+        """
+            Realiza a subtração sequencial de múltiplos números.
+
+            Returns:
+                float: Resultado da subtração.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.PROD.value)
+    async def prod(self, *args):
+        """
+            Realiza a multiplicação de múltiplos números.
+
+            Returns:
+                float: Resultado da multiplicação.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.DIV.value)
+    async def div(self, *args):
+        """
+            Realiza a divisão sequencial de múltiplos números.
+
+            Returns:
+                float: Resultado da divisão.
+                str: Mensagem de erro se divisão por zero ou sem argumentos.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.FAT.value)
+    async def fat(self, n=None, mode=None, param=None):
+        """
+            Calcula o fatorial de um número (ou a forma reduzida indicada por mode; veja Operations.fat).
+
+            Returns:
+                str: Fatorial de n (n!) em decimal, qualquer que seja o seu tamanho.
+                int: Resultado dos modos 'digits' e 'mod'.
+        """
+        pass
+
+    async def fat_stream(self, n=None, sink=None):
+        """
+            Calcula o fatorial de um número recebendo os dígitos em partes (veja Operations.fat_stream).
+
+            Returns:
+                AsyncIterator[str]: Partes dos dígitos de n! (sem sink).
+                int: Quantidade de dígitos escritos em sink.
+        """
+        if n is None:
+            return 'Erro: É necessário fornecer um número para calcular o fatorial'
+        return await self._process_stream(OperationsEnum.FAT.value, n, sink=sink)
+
+    @async_cache_operation(OperationsEnum.PRIM.value)
+    async def prim(self, *args):
+        """
+            Verifica se números são primos.
+
+            Returns:
+                list[bool]: Lista de booleanos indicando se cada número é primo.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.PRIME_RANGE.value)
+    async def primes(self, start, end):
+        """
+            Lista os números primos do intervalo [start, end].
+
+            Returns:
+                list[int]: Primos do intervalo, em ordem crescente.
+        """
+        pass
+
+    async def primes_stream(self, start, end, sink=None):
+        """
+            Lista os números primos do intervalo [start, end] recebendo-os em partes (veja Operations.primes_stream).
+
+            Returns:
+                AsyncIterator[list[int]]: Listas de primos, em ordem crescente (sem sink).
+                int: Quantidade de primos escritos em sink.
+        """
+        return await self._process_stream(OperationsEnum.PRIME_RANGE.value, start, end, sink=sink)
+
+    @async_cache_operation(OperationsEnum.PRIME_COUNT.value)
+    async def prime_count(self, start, end):
+        """
+            Conta os números primos do intervalo [start, end].
+
+            Returns:
+                int: Quantidade de primos do intervalo.
+        """
+        pass
+
+    @async_cache_text_operation(OperationsEnum.SOLVER.value)
+    async def solver(self, problem: str):
+        """
+            Envia um problema matemático em linguagem natural para resolução via IA.
+
+            Returns:
+                str: O resultado numérico ou mensagem de erro.
+        """
+        pass
+
+    @async_cache_operation(OperationsEnum.NEWS.value)
+    async def news(self):
+        """
+            Obtém as principais manchetes de notícias do UOL.
+
+            Returns:
+                list[str]: Lista com até 5 manchetes de notícias.
+        """
+        pass
@@ -1,7 +1,9 @@
 import os
 import sys
+import inspect
+from collections.abc import Iterator
 from config import config
-from client.tcp_client import dns_connection
+from client.tcp_client import dns_connection, batch_dns_connection, stream_dns_connection, write_stream
 from common.enums import OperationsEnum
 
 data_config = config.load_config()
@@ -9,11 +11,59 @@ data_config = config.load_config()
 HOST = data_config['ip_name_server']
 PORT = data_config['port_name_server']
 
+def format_command(cmd, *args):
+    """
+        Monta o comando textual enviado ao servidor.
+
+        Args:
+            cmd (str): Comando da operação.
+            *args: Argumentos, separados por espaço no comando.
+
+        Returns:
+            str: Comando no formato "comando arg1 arg2 ...".
+    """
+    str_args = ' '.join(str(a) for a in args)
+    return f'{cmd} {str_args}'
+
+def command_args(signature, self, args, kwargs):
+    """
+        Converte os argumentos de um método de operação (posicionais ou nomeados) nos argumentos posicionais do comando.
+
+        Os argumentos são associados aos parâmetros do método e enviados na ordem da assinatura, de modo que
+        op.fat(10, mode='digits') e op.fat(10, 'digits') gerem o mesmo comando ("fat 10 digits"). Parâmetros opcionais
+        não informados (None) no final da assinatura são omitidos.
+
+        Args:
+            signature (inspect.Signature): Assinatura do método decorado.
+            self: Instância do cliente.
+            args (tuple): Argumentos posicionais recebidos.
+            kwargs (dict): Argumentos nomeados recebidos.
+
+        Returns:
+            list: Argumentos do comando.
+
+        Raises:
+            TypeError: Se os argumentos não corresponderem à assinatura do método.
+    """
+    bound = signature.bind(self, *args, **kwargs)
+    values = []
+
+    for name, value in list(bound.arguments.items())[1:]:
+        if signature.parameters[name].kind is inspect.Parameter.VAR_POSITIONAL:
+            values.extend(value)
+        else:
+            values.append(value)
+
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
 def cache_operation(cmd):
     """
         Decorator que habilita cache para operações RPC.
         
         Wraps uma função para automaticamente usar cache ao processar a operação RPC correspondente.
+        Argumentos nomeados são convertidos em argumentos posicionais do comando (ver command_args).
         
         Args:
             cmd (str): Comando da operação (ex: 'sum', 'sub', 'prod').
@@ -22,8 +72,10 @@ def cache_operation(cmd):
             function: Função decorada com cache habilitado.
     """
     def decorator(func):
+        signature = inspect.signature(func)
+
         def wrapper(self, *args, **kwargs):
-            return self._process_operation(cmd, *args, use_cache=True, **kwargs)
+            return self._process_operation(cmd, *command_args(signature, self, args, kwargs), use_cache=True)
         return wrapper
     return decorator
 
@@ -86,8 +138,7 @@ class Operations:
             if not args or args[0] is None:
                 return 'Erro: É necessário fornecer um número para calcular o fatorial'
 
-        str_args = ' '.join(str(a) for a in args)   
-        return dns_connection(f'{cmd} {str_args}', self.ip, self.port, use_cache=use_cache)
+        return dns_connection(format_command(cmd, *args), self.ip, self.port, use_cache=use_cache)
 
     def _process_text_operation(self, cmd, text, use_cache=False):
         """
@@ -100,6 +151,50 @@ class Operations:
                 use_cache (bool): Define se o cliente deve aceitar respostas do cache local/remoto.
         """
         return dns_connection(f'{cmd} {text}', self.ip, self.port, use_cache=use_cache)
+
+    def _process_stream(self, cmd, *args, sink=None):
+        """
+            Executa uma operação com resposta em partes, opcionalmente escrevendo as partes em sink.
+
+            Args:
+                cmd (str): Comando da operação.
+                *args: Argumentos da operação.
+                sink (file-like, optional): Destino das partes (ver tcp_client.write_stream).
+        """
+        result = stream_dns_connection(format_command(cmd, *args), self.ip, self.port)
+
+        if sink is None or not isinstance(result, Iterator):
+            return result
+        return write_stream(result, sink)
+
+    def batch(self, requests, use_cache:bool=True):
+        """
+            Executa várias operações de uma vez, agrupadas por servidor.
+
+            As requisições destinadas ao mesmo servidor são enviadas em lote por uma única conexão (pipelining),
+            eliminando uma ida e volta de rede por operação.
+
+            Args:
+                requests (list[tuple[str, tuple | any]]): Lista de pares (operação, argumentos).
+                    Os argumentos podem ser uma tupla/lista ou um único valor.
+                    Ex: [('sum', (1, 2)), ('fat', 5), ('solver', 'Quanto é 2 + 2?')]
+                use_cache (bool, optional): Define se o cliente deve aceitar respostas do cache local.
+
+            Returns:
+                list: Resultados na mesma ordem das requisições. Requisições de um servidor offline (sem cache em disco)
+                    recebem mensagem de erro, sem afetar as demais.
+
+            Raises:
+                RPCServerNotFound: Se o Name Server estiver offline.
+        """
+        commands = []
+        for cmd, args in requests:
+            if not isinstance(args, (tuple, list)):
+                args = () if args is None else (args,)
+
+            commands.append(format_command(cmd, *args))
+
+        return batch_dns_connection(commands, self.ip, self.port, use_cache=use_cache)
       
     @cache_operation(OperationsEnum.SUM.value)
     def sum(self, *args):
@@ -162,19 +257,63 @@ class Operations:
         pass
 
     @cache_operation(OperationsEnum.FAT.value)
-    def fat(self, n=None):
+    def fat(self, n=None, mode=None, param=None):
         """
             Calcula o fatorial de um número.
             
             Args:
                 n (int, optional): Número inteiro não-negativo.
+                mode (str, optional): Forma reduzida do resultado, calculada no servidor sem transferir n! inteiro:
+                    - 'digits': quantidade de dígitos
+                    - 'lead': os param primeiros dígitos
+                    - 'mod': n! mod param
+                    - 'hex': n! em hexadecimal
+                param (int, optional): Parâmetro dos modos 'lead' e 'mod'.
             
             Returns:
-                int: Fatorial de n (n!).
+                str: Fatorial de n (n!) em decimal, qualquer que seja o seu tamanho (ex: '120'), ou os dígitos pedidos
+                    nos modos 'lead' e 'hex'.
+                int: Resultado dos modos 'digits' e 'mod'.
                 str: Mensagem de erro se n for None, negativo ou inválido.
+
+            Note:
+                n! é devolvido como texto para que o tipo não dependa do tamanho do resultado: converter centenas de
+                milhares de dígitos para int custaria segundos (conversão quadrática) e excederia o limite de
+                sys.get_int_max_str_digits(). Use int(op.fat(n)) para resultados pequenos, se necessário.
+
+            Example:
+                >>> op.fat(100000, mode='digits')
+                456574
         """
         pass
     
+    def fat_stream(self, n=None, sink=None):
+        """
+            Calcula o fatorial de um número recebendo os dígitos em partes, sem que cliente ou servidor mantenham a
+            representação decimal inteira em memória (ex: n na casa de 10^6, com milhões de dígitos).
+
+            Args:
+                n (int): Número inteiro não-negativo.
+                sink (file-like, optional): Objeto com write(str) (ex: arquivo aberto em modo texto) que recebe os
+                    dígitos à medida que chegam.
+
+            Returns:
+                Iterator[str]: Partes dos dígitos de n!, da mais significativa para a menos significativa (sem sink).
+                int: Quantidade de dígitos escritos em sink.
+                str: Mensagem de erro se n for None, negativo ou inválido.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver offline.
+
+            Example:
+                >>> with open('fat.txt', 'w') as f:
+                ...     op.fat_stream(1000000, sink=f)
+                5565709
+        """
+        if n is None:
+            return 'Erro: É necessário fornecer um número para calcular o fatorial'
+        return self._process_stream(OperationsEnum.FAT.value, n, sink=sink)
+
     @cache_operation(OperationsEnum.PRIM.value)
     def prim(self, *args):
         """
@@ -191,6 +330,61 @@ class Operations:
         """
         pass
 
+    @cache_operation(OperationsEnum.PRIME_RANGE.value)
+    def primes(self, start, end):
+        """
+            Lista os números primos de um intervalo.
+
+            Args:
+                start (int): Início do intervalo (inclusivo).
+                end (int): Fim do intervalo (inclusivo).
+
+            Returns:
+                list[int]: Primos do intervalo, em ordem crescente.
+                str: Mensagem de erro se o intervalo for inválido ou grande demais.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver offline.
+        """
+        pass
+
+    def primes_stream(self, start, end, sink=None):
+        """
+            Lista os números primos de um intervalo recebendo-os em partes (um segmento do crivo por vez).
+
+            Args:
+                start (int): Início do intervalo (inclusivo).
+                end (int): Fim do intervalo (inclusivo).
+                sink (file-like, optional): Objeto com write(str) que recebe um primo por linha.
+
+            Returns:
+                Iterator[list[int]]: Listas de primos, em ordem crescente (sem sink).
+                int: Quantidade de primos escritos em sink.
+                str: Mensagem de erro se o intervalo for inválido ou grande demais.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver offline.
+        """
+        return self._process_stream(OperationsEnum.PRIME_RANGE.value, start, end, sink=sink)
+
+    @cache_operation(OperationsEnum.PRIME_COUNT.value)
+    def prime_count(self, start, end):
+        """
+            Conta os números primos de um intervalo.
+
+            Args:
+                start (int): Início do intervalo (inclusivo).
+                end (int): Fim do intervalo (inclusivo).
+
+            Returns:
+                int: Quantidade de primos do intervalo.
+                str: Mensagem de erro se o intervalo for inválido ou grande demais.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver offline.
+        """
+        pass
+
     @cache_text_operation(OperationsEnum.SOLVER.value)
     def solver(self, problem: str):
         """
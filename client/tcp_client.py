@@ -1,54 +1,955 @@
 import os
 import sys
+import re
+import glob
 import json
+import mmap
+import time
 import socket
-from datetime import datetime, timedelta
+import threading
+from collections import deque, namedtuple, OrderedDict
 from config import config
+from common import protocol, serialization, balancing
+from common.singleflight import SingleFlight
+from common.commands import canonical_command
 from client.rpc_exception import RPCServerNotFound
 
-CACHE_FILE = 'cache_operations.json'
-
-operations_cache = {}
 data_config = config.load_config()
 CACHE_EXPIRATION_MINUTES = data_config.get('cache_expiration', 10)
+CLIENT_CACHE_MAX_ENTRIES = data_config.get('client_cache_max_entries', 10000)
+CLIENT_CACHE_MAX_BYTES = data_config.get('client_cache_max_bytes', 64 * 1024 * 1024)
+
+# Caminhos relativos do cache offline são resolvidos a partir da raiz do projeto (e não do diretório atual)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OFFLINE_CACHE_FILES = [os.path.join(PROJECT_DIR, pattern)
+                       for pattern in data_config.get('offline_cache_files', ['server/cache_server*.jsonl'])]
+POOL_MAX_SIZE = data_config.get('pool_max_size', 8)
+POOL_IDLE_TIMEOUT = data_config.get('pool_idle_timeout', 30)
+CONNECT_TIMEOUT = data_config.get('connect_timeout', 2)
+DNS_TIMEOUT = data_config.get('dns_timeout', 2)
+DNS_DEFAULT_TTL = 60
+BATCH_SIZE = data_config.get('batch_size', 256)
+PIPELINE_WINDOW = data_config.get('pipeline_window', 4)
+WIRE_FORMAT = data_config.get('wire_format', serialization.WIRE_BINARY)
+FAILOVER_COOLDOWN = data_config.get('failover_cooldown', 5)
+
+# Resolução de uma operação: réplicas candidatas e estratégia de balanceamento informadas pelo Name Server
+Resolution = namedtuple('Resolution', ['replicas', 'strategy'])
 
-def load_disk_cache():
+class ResolutionCache:
     """
-        Carrega o cache persistente do disco.
-        
-        Tenta ler o arquivo de cache JSON do servidor. Se houver erro ou arquivo não existir, retorna dicionário vazio.
-        
+        Cache de resoluções do Name Server (comando -> réplicas do servidor de operação).
+
+        Cada entrada expira após o TTL informado pelo Name Server. Operações não suportadas também são guardadas
+        (cache negativo), com resolução None. Entradas que incluem um servidor que falhou são invalidadas.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, cmd):
+        """
+            Busca a resolução de um comando.
+
+            Returns:
+                tuple[bool, Resolution | None]: (encontrado, resolução). A resolução é None em entradas negativas.
+        """
+        with self._lock:
+            entry = self._entries.get(cmd)
+            if entry is None:
+                return False, None
+
+            expires_at, resolution = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[cmd]
+                return False, None
+
+            return True, resolution
+
+    def put(self, cmd, resolution, ttl):
+        """
+            Armazena a resolução de um comando por ttl segundos.
+        """
+        with self._lock:
+            self._entries[cmd] = (time.monotonic() + ttl, resolution)
+
+    def invalidate(self, cmd):
+        """
+            Remove a resolução de um comando.
+        """
+        with self._lock:
+            self._entries.pop(cmd, None)
+
+    def invalidate_address(self, host, port):
+        """
+            Remove todas as resoluções que incluem o servidor informado.
+        """
+        with self._lock:
+            for cmd in [c for c, (_, resolution) in self._entries.items()
+                        if resolution is not None and any((r.host, r.port) == (host, port) for r in resolution.replicas)]:
+                del self._entries[cmd]
+
+    def clear(self):
+        """
+            Remove todas as resoluções.
+        """
+        with self._lock:
+            self._entries.clear()
+
+resolution_cache = ResolutionCache()
+
+def _approximate_size(value):
+    """
+        Tamanho aproximado, em bytes, de uma resposta em memória.
+
+        Listas são estimadas pelo primeiro elemento, para não percorrer resultados grandes (ex: listas de primos).
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)) and value:
+        size += len(value) * _approximate_size(value[0])
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return size
+
+class ResultCache:
+    """
+        Cache em memória das respostas recebidas pelo cliente (comando -> resposta).
+
+        Limitado por número de entradas e por tamanho aproximado em bytes, com remoção LRU. Cada entrada expira após
+        cache_expiration minutos ou, antes, no TTL informado pelo servidor; a validade é guardada como instante do relógio
+        monotônico. Entradas expiradas são removidas ao serem consultadas ou ao chegarem ao fim da fila LRU.
+
+        Attributes:
+            max_entries (int): Número máximo de entradas.
+            max_size (int): Tamanho máximo aproximado das respostas, em bytes.
+            expiration (float): Validade máxima de uma entrada, em segundos.
+            size (int): Tamanho aproximado atual, em bytes.
+            hits (int): Número de buscas que encontraram a entrada.
+            misses (int): Número de buscas que não encontraram a entrada.
+            evictions (int): Número de entradas removidas para liberar espaço.
+            expirations (int): Número de entradas removidas por expiração.
+
+        Note:
+            Todos os métodos são thread-safe (a interface gráfica consulta o cache a partir de threads de trabalho).
+    """
+
+    def __init__(self, max_entries=CLIENT_CACHE_MAX_ENTRIES, max_size=CLIENT_CACHE_MAX_BYTES,
+                 expiration=CACHE_EXPIRATION_MINUTES * 60):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.expiration = expiration
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, command):
+        with self._lock:
+            entry = self._entries.get(command)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def _remove(self, command):
+        expires_at, response, size = self._entries.pop(command)
+        self.size -= size
+
+    def get(self, command):
+        """
+            Busca uma resposta válida (não expirada).
+
+            Returns:
+                tuple[bool, any]: (encontrado, resposta).
+        """
+        with self._lock:
+            entry = self._entries.get(command)
+
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(command)
+                    self.hits += 1
+                    return True, entry[1]
+
+                self._remove(command)
+                self.expirations += 1
+
+            self.misses += 1
+            return False, None
+
+    def put(self, command, response, ttl=None):
+        """
+            Armazena uma resposta, removendo as entradas menos usadas se necessário para respeitar os limites.
+
+            Args:
+                command (str): Comando executado.
+                response (any): Resposta do servidor.
+                ttl (float, optional): Validade restante do resultado no cache do servidor, em segundos.
+
+            Returns:
+                bool: True se a resposta foi armazenada, False se sozinha ela excede o limite de tamanho.
+        """
+        expiration = self.expiration if ttl is None else min(self.expiration, ttl)
+        size = _approximate_size(command) + _approximate_size(response)
+
+        if size > self.max_size:
+            return False
+
+        with self._lock:
+            if command in self._entries:
+                self._remove(command)
+
+            now = time.monotonic()
+            while self._entries and (len(self._entries) >= self.max_entries or self.size + size > self.max_size):
+                oldest, (expires_at, _, _) = next(iter(self._entries.items()))
+                self._remove(oldest)
+                if expires_at <= now:
+                    self.expirations += 1
+                else:
+                    self.evictions += 1
+
+            self._entries[command] = (now + expiration, response, size)
+            self.size += size
+            return True
+
+    def clear(self):
+        """
+            Remove todas as entradas.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+            Retorna as estatísticas de uso do cache.
+
+            Returns:
+                dict: entries, max_entries, size, max_size, hits, misses, evictions, expirations e hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+operations_cache = ResultCache()
+
+class ReplicaSelector:
+    """
+        Define, a cada chamada, a ordem em que as réplicas de uma operação são tentadas.
+
+        Usa a estratégia de balanceamento informada pelo Name Server (common.balancing), com a carga medida pelo pool
+        de conexões do cliente. Réplicas que falharam recentemente vão para o fim da ordem por failover_cooldown segundos.
+
+        Attributes:
+            load (callable): Função que recebe (host, porta) e retorna o número de requisições em andamento.
+            failover_cooldown (float): Segundos que uma réplica que falhou fica no fim da ordem.
+    """
+
+    def __init__(self, load, failover_cooldown=FAILOVER_COOLDOWN):
+        self.load = load
+        self.failover_cooldown = failover_cooldown
+        self._balancers = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def order(self, resolution):
+        """
+            Ordena as réplicas de uma resolução.
+
+            Returns:
+                list[tuple[str, int]]: Endereços (ip, porta) na ordem em que devem ser tentados.
+        """
+        strategy = resolution.strategy if resolution.strategy in balancing.STRATEGIES else balancing.DEFAULT_STRATEGY
+
+        with self._lock:
+            balancer = self._balancers.get(strategy)
+            if balancer is None:
+                balancer = self._balancers[strategy] = balancing.Balancer(strategy, lambda address: self.load(*address))
+
+            now = time.monotonic()
+            for address in [a for a, until in self._failed.items() if until <= now]:
+                del self._failed[address]
+            failed = set(self._failed)
+
+        addresses = [(replica.host, replica.port) for replica in balancer.order(resolution.replicas)]
+        if failed:
+            addresses.sort(key=lambda address: address in failed)
+        return addresses
+
+    def mark_failed(self, host, port):
+        """
+            Registra que uma réplica está inacessível.
+        """
+        with self._lock:
+            self._failed[(host, port)] = time.monotonic() + self.failover_cooldown
+
+class PooledConnection:
+    """
+        Conexão TCP persistente com um servidor de operações.
+
+        Attributes:
+            host (str): Endereço IP do servidor.
+            port (int): Porta TCP do servidor.
+            sock (socket.socket): Socket conectado.
+            reader (protocol.FrameReader): Leitor de frames associado ao socket.
+            last_used (float): Instante (relógio monotônico) do último uso.
+            binary (bool): Se a conexão negociou o formato binário tipado (common.serialization).
+    """
+
+    def __init__(self, host, port, connect_timeout=CONNECT_TIMEOUT, wire_format=WIRE_FORMAT):
+        """
+            Abre a conexão com o servidor e negocia o formato dos payloads.
+
+            Raises:
+                OSError: Se não for possível conectar.
+        """
+        self.host = host
+        self.port = port
+        self.sock = socket.create_connection((host, port), timeout=connect_timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        protocol.configure_socket(self.sock)
+        self.reader = protocol.FrameReader(self.sock)
+        self.last_used = time.monotonic()
+
+        try:
+            self.binary = self._negotiate(wire_format)
+        except (OSError, protocol.ProtocolError) as e:
+            self.close()
+            raise OSError(f'Falha na negociação com {host}:{port}: {e}') from None
+
+    def _negotiate(self, wire_format):
+        """
+            Oferece o formato binário ao servidor (frame FLAG_HELLO), se configurado.
+
+            Returns:
+                bool: True se o servidor aceitou o formato binário.
+        """
+        if wire_format != serialization.WIRE_BINARY:
+            return False
+
+        offer = ','.join(serialization.SUPPORTED_WIRE_FORMATS).encode()
+        frame = self.request(offer, protocol.FLAG_HELLO)
+        if frame is None:
+            raise protocol.ProtocolError('Conexão encerrada durante a negociação')
+
+        flags, payload = frame
+        return bool(flags & protocol.FLAG_HELLO) and payload == serialization.WIRE_BINARY.encode()
+
+    def request(self, payload, flags=0):
+        """
+            Envia um frame e aguarda o frame de resposta.
+
+            Returns:
+                tuple[int, bytes] | None: Tupla (flags, payload) da resposta, ou None se o servidor encerrou a conexão.
+
+            Raises:
+                OSError: Em falhas de rede.
+                protocol.ProtocolError: Se a resposta for inválida.
+        """
+        protocol.send_frame(self.sock, payload, flags)
+        frame = self.reader.read_frame()
+        self.last_used = time.monotonic()
+        return frame
+
+    def close(self):
+        """
+            Fecha a conexão, ignorando erros.
+        """
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class ConnectionPool:
+    """
+        Pool de conexões TCP persistentes (keep-alive) por servidor (host, porta).
+
+        Conexões ociosas são reutilizadas entre chamadas, evitando um handshake TCP por RPC.
+        Uma conexão só é considerada defeituosa quando uma operação real de E/S falha: nesse caso ela é descartada e,
+        se era uma conexão reaproveitada (que pode ter sido fechada pelo servidor por ociosidade), a requisição é repetida
+        uma vez em uma conexão nova.
+
+        Attributes:
+            max_size (int): Número máximo de conexões ociosas mantidas por servidor.
+            idle_timeout (float): Tempo máximo, em segundos, que uma conexão pode ficar ociosa no pool.
+            connect_timeout (float): Timeout, em segundos, para abrir novas conexões.
+    """
+
+    def __init__(self, max_size=POOL_MAX_SIZE, idle_timeout=POOL_IDLE_TIMEOUT, connect_timeout=CONNECT_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._idle = {}
+        self._outstanding = {}
+        self._lock = threading.Lock()
+
+    def outstanding(self, host, port):
+        """
+            Número de requisições em andamento para o servidor (usado pela estratégia least_outstanding).
+        """
+        return self._outstanding.get((host, port), 0)
+
+    def _track(self, host, port, delta):
+        with self._lock:
+            count = self._outstanding.get((host, port), 0) + delta
+            if count:
+                self._outstanding[(host, port)] = count
+            else:
+                self._outstanding.pop((host, port), None)
+
+    def acquire(self, host, port):
+        """
+            Obtém uma conexão para o servidor, reaproveitando uma conexão ociosa quando possível.
+
+            Returns:
+                tuple[PooledConnection, bool]: A conexão e se ela foi reaproveitada do pool.
+
+            Raises:
+                RPCServerNotFound: Se não for possível abrir uma nova conexão.
+        """
+        now = time.monotonic()
+        expired = []
+
+        with self._lock:
+            idle = self._idle.get((host, port))
+            conn = None
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used < self.idle_timeout:
+                    conn = candidate
+                    break
+                expired.append(candidate)
+
+        for old in expired:
+            old.close()
+
+        if conn is not None:
+            return conn, True
+
+        try:
+            return PooledConnection(host, port, self.connect_timeout), False
+        except OSError:
+            raise RPCServerNotFound(host, port) from None
+
+    def release(self, conn):
+        """
+            Devolve uma conexão saudável ao pool (ou a fecha se o pool estiver cheio).
+        """
+        with self._lock:
+            idle = self._idle.setdefault((conn.host, conn.port), deque())
+            if len(idle) < self.max_size:
+                idle.append(conn)
+                return
+
+        conn.close()
+
+    def request(self, host, port, message):
+        """
+            Executa uma requisição (um frame de ida e um de volta) usando uma conexão do pool.
+
+            A mensagem é codificada no formato negociado pela conexão utilizada.
+
+            Args:
+                host (str): Endereço IP do servidor.
+                port (int): Porta TCP do servidor.
+                message (str | list[str]): Comando, ou lista de comandos (lote).
+
+            Returns:
+                tuple[int, bytes]: Tupla (flags, payload) da resposta.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver inacessível ou encerrar a conexão sem responder.
+        """
+        self._track(host, port, 1)
+        try:
+            return self._request(host, port, message)
+        finally:
+            self._track(host, port, -1)
+
+    def _request(self, host, port, message):
+        while True:
+            conn, reused = self.acquire(host, port)
+
+            try:
+                flags, payload = serialization.encode_request(message, conn.binary)
+                frame = conn.request(payload, flags)
+            except (OSError, protocol.ProtocolError):
+                frame = None
+
+            if frame is not None:
+                self.release(conn)
+                return frame
+
+            conn.close()
+            if not reused:
+                raise RPCServerNotFound(host, port)
+
+    def pipeline(self, host, port, messages, window=PIPELINE_WINDOW):
+        """
+            Envia vários frames por uma única conexão sem aguardar cada resposta (pipelining).
+
+            No máximo window frames ficam sem resposta ao mesmo tempo, para que cliente e servidor não fiquem
+            bloqueados escrevendo com os buffers de recepção cheios.
+
+            Args:
+                host (str): Endereço IP do servidor.
+                port (int): Porta TCP do servidor.
+                messages (list[str | list[str]]): Mensagem de cada requisição (codificada no formato da conexão).
+                window (int, optional): Número máximo de requisições em trânsito.
+
+            Returns:
+                list[tuple[int, bytes]]: Respostas (flags, payload), na ordem das requisições.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver inacessível ou encerrar a conexão antes de responder tudo.
+        """
+        self._track(host, port, len(messages))
+        try:
+            return self._pipeline(host, port, messages, window)
+        finally:
+            self._track(host, port, -len(messages))
+
+    def _pipeline(self, host, port, messages, window):
+        while True:
+            conn, reused = self.acquire(host, port)
+            responses = []
+
+            try:
+                sent = 0
+                while len(responses) < len(messages):
+                    while sent < len(messages) and sent - len(responses) < window:
+                        flags, payload = serialization.encode_request(messages[sent], conn.binary)
+                        protocol.send_frame(conn.sock, payload, flags)
+                        sent += 1
+
+                    frame = conn.reader.read_frame()
+                    if frame is None:
+                        break
+                    responses.append(frame)
+            except (OSError, protocol.ProtocolError):
+                pass
+
+            if len(responses) == len(messages):
+                conn.last_used = time.monotonic()
+                self.release(conn)
+                return responses
+
+            conn.close()
+            if not reused or responses:
+                raise RPCServerNotFound(host, port)
+
+    def stream(self, host, port, message):
+        """
+            Executa uma requisição com resposta em partes (FLAG_STREAM), gerando os frames à medida que chegam.
+
+            A conexão fica reservada até o frame que encerra a resposta. Se a iteração for interrompida antes disso,
+            a conexão é fechada (ainda há partes em trânsito) em vez de voltar ao pool.
+
+            Args:
+                host (str): Endereço IP do servidor.
+                port (int): Porta TCP do servidor.
+                message (str): Comando.
+
+            Yields:
+                tuple[int, bytes]: Frames (flags, payload) da resposta: um frame comum, ou as partes FLAG_STREAM
+                seguidas do frame FLAG_STREAM vazio que encerra a resposta.
+
+            Raises:
+                RPCServerNotFound: Se o servidor estiver inacessível ou encerrar a conexão antes do fim da resposta.
+        """
+        self._track(host, port, 1)
+        try:
+            yield from self._stream(host, port, message)
+        finally:
+            self._track(host, port, -1)
+
+    def _stream(self, host, port, message):
+        while True:
+            conn, reused = self.acquire(host, port)
+
+            try:
+                flags, payload = serialization.encode_request(message, conn.binary)
+                frame = conn.request(payload, flags | protocol.FLAG_STREAM)
+            except (OSError, protocol.ProtocolError):
+                frame = None
+
+            if frame is not None:
+                break
+
+            conn.close()
+            if not reused:
+                raise RPCServerNotFound(host, port)
+
+        try:
+            while frame[0] & protocol.FLAG_STREAM and frame[1]:
+                yield frame
+                frame = conn.reader.read_frame()
+                if frame is None:
+                    raise protocol.ProtocolError('Conexão encerrada no meio de uma resposta em partes')
+        except (OSError, protocol.ProtocolError):
+            conn.close()
+            raise RPCServerNotFound(host, port) from None
+        except BaseException:
+            conn.close()
+            raise
+
+        conn.last_used = time.monotonic()
+        self.release(conn)
+        yield frame
+
+    def clear(self):
+        """
+            Fecha todas as conexões ociosas do pool.
+        """
+        with self._lock:
+            idle_lists = list(self._idle.values())
+            self._idle.clear()
+
+        for idle in idle_lists:
+            for conn in idle:
+                conn.close()
+
+connection_pool = ConnectionPool()
+replica_selector = ReplicaSelector(connection_pool.outstanding)
+
+# Chamadas simultâneas do mesmo comando para o mesmo servidor (ex: threads da interface gráfica) compartilham uma única
+# requisição; a chave inclui o endereço para que uma falha de uma réplica não seja atribuída a outra durante o failover
+request_flights = SingleFlight()
+
+# Início de cada registro do log do cache dos servidores: {"k": <chave JSON>[, "d"...]
+_RECORD_PREFIX = b'{"k": '
+_RECORD_KEY = re.compile(rb'^\{"k": ("(?:[^"\\\n]|\\.)*")(, "d")?', re.MULTILINE)
+
+class OfflineStore:
+    """
+        Cache local em disco consultado somente quando o servidor de operação está inacessível.
+
+        O arquivo pode ser um objeto JSON (comando -> resposta) ou um log JSONL no formato do cache dos servidores
+        (config.cache_config.PersistentCache), como server/cache_server1.jsonl. Nada é lido até a primeira consulta, e o
+        arquivo só é relido quando sua data de modificação ou tamanho mudam.
+
+        Logs JSONL são indexados sem desserializar as respostas: o arquivo é mapeado em memória (mmap), cada linha tem
+        apenas a chave interpretada e o índice guarda a posição do registro; a resposta é lida e desserializada só
+        quando consultada. Objetos JSON são carregados inteiros (uma vez por modificação do arquivo).
+
+        Attributes:
+            path (str): Caminho absoluto do arquivo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._signature = None
+        self._index = {}
+        self._values = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """
+            Reconstrói o índice se o arquivo mudou desde a última leitura.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._signature, self._index, self._values = None, {}, None
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+
+        self._signature = signature
+        self._index, self._values = {}, None
+
+        if stat.st_size == 0:
+            return
+
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[:len(_RECORD_PREFIX)] == _RECORD_PREFIX:
+                    self._index = self._build_index(data)
+                else:
+                    values = json.loads(data[:])
+                    self._values = values if isinstance(values, dict) else {}
+        except (OSError, ValueError) as e:
+            print(f'Erro ao ler o cache offline {self.path}: {e}')
+
+    def _build_index(self, data):
+        """
+            Indexa um log JSONL: chave -> (início, fim) do último registro da chave. Remoções retiram a chave do índice.
+
+            As chaves são localizadas com uma expressão regular sobre o mapeamento, sem laço Python por byte e sem
+            desserializar as respostas; um registro final sem quebra de linha (incompleto) é ignorado.
+        """
+        index = {}
+        end = data.rfind(b'\n') + 1
+
+        for match in _RECORD_KEY.finditer(data, 0, end):
+            raw_key = match.group(1)
+            key = json.loads(raw_key) if b'\\' in raw_key else raw_key[1:-1].decode()
+
+            if match.group(2):
+                index.pop(key, None)
+            else:
+                index[key] = (match.start(), data.find(b'\n', match.end()))
+
+        return index
+
+    def lookup(self, command):
+        """
+            Busca a resposta de um comando no cache offline.
+
+            Entradas de logs JSONL já expiradas (campo "e") são ignoradas.
+
+            Returns:
+                tuple[bool, any]: (encontrado, resposta).
+        """
+        with self._lock:
+            self._refresh()
+
+            if self._values is not None:
+                return (True, self._values[command]) if command in self._values else (False, None)
+
+            position = self._index.get(command)
+
+        if position is None:
+            return False, None
+
+        start, end = position
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                record = json.loads(f.read(end - start))
+        except (OSError, ValueError):
+            return False, None
+
+        if not isinstance(record, dict) or record.get('k') != command:
+            return False, None
+        if record.get('e') is not None and record['e'] <= time.time():
+            return False, None
+
+        return True, record.get('v')
+
+class OfflineCache:
+    """
+        Cache offline formado por vários arquivos, como os logs de todos os servidores e réplicas da máquina
+        (server/cache_server*.jsonl), cada um lido por um OfflineStore.
+
+        Os padrões (glob) são expandidos a cada consulta, de modo que arquivos criados depois (ex: uma nova réplica)
+        também sejam consultados; as consultas só acontecem com o servidor inacessível. Os logs dos servidores são
+        indexados pelo comando canônico (common.commands.canonical_command), então o comando é procurado como recebido
+        e na forma canônica ("sum 2 1" -> "sum 1.0 2.0").
+
+        Attributes:
+            patterns (list[str]): Padrões glob dos arquivos (caminhos absolutos).
+    """
+
+    def __init__(self, patterns=OFFLINE_CACHE_FILES):
+        self.patterns = list(patterns)
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def _current_stores(self):
+        """
+            OfflineStore de cada arquivo existente, reaproveitando os índices já construídos.
+        """
+        paths = sorted({path for pattern in self.patterns for path in glob.glob(pattern)})
+
+        with self._lock:
+            self._stores = {path: self._stores.get(path) or OfflineStore(path) for path in paths}
+            return list(self._stores.values())
+
+    def lookup(self, command):
+        """
+            Busca a resposta de um comando nos arquivos do cache offline.
+
+            Returns:
+                tuple[bool, any]: (encontrado, resposta).
+        """
+        keys = [command, command.strip(), canonical_command(command)]
+        keys = [key for key in dict.fromkeys(keys) if key]
+
+        for store in self._current_stores():
+            for key in keys:
+                hit, response = store.lookup(key)
+                if hit:
+                    return True, response
+
+        return False, None
+
+offline_store = OfflineCache()
+
+def resolve_operation(cmd, host, port, timeout=DNS_TIMEOUT):
+    """
+        Consulta o Name Server (UDP) para descobrir qual servidor processa um comando.
+
+        Se a resposta vier truncada (lista de réplicas maior que o limite UDP), a consulta é repetida por TCP.
+
+        Args:
+            cmd (str): Nome da operação (ex: "sum").
+            host (str): Endereço IP do Name Server.
+            port (int): Porta UDP do Name Server.
+            timeout (float, optional): Tempo máximo de espera pela resposta, em segundos.
+
         Returns:
-            dict: Dicionário com operações cacheadas ou vazio.
+            tuple[Resolution | None, float]: Réplicas candidatas e estratégia de balanceamento, ou None se a operação
+                                             não for suportada, e o TTL da resposta em segundos.
+
+        Raises:
+            RPCServerNotFound: Se o Name Server não responder.
     """
-    if os.path.exists(CACHE_FILE):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client_socket:
+        client_socket.settimeout(timeout)
+
         try:
-            with open(CACHE_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+            client_socket.sendto(cmd.encode(), (host, port))
+            data, addr = client_socket.recvfrom(1024 * 1024)
+        except OSError:
+            raise RPCServerNotFound(host, port) from None
+
+    response = _decode_resolution(data)
+    if response.get('truncated', False):
+        response = _decode_resolution(_resolve_tcp(cmd, host, port, timeout))
+
+    return _parse_resolution(response)
+
+def _resolve_tcp(cmd, host, port, timeout):
+    """
+        Consulta o Name Server por TCP (mesma porta, framing de common.protocol).
+
+        Returns:
+            bytes: Resposta JSON do Name Server.
+
+        Raises:
+            RPCServerNotFound: Se o Name Server não responder.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            protocol.send_frame(sock, cmd.encode())
+            frame = protocol.FrameReader(sock).read_frame()
+    except (OSError, protocol.ProtocolError):
+        raise RPCServerNotFound(host, port) from None
+
+    if frame is None:
+        raise RPCServerNotFound(host, port)
+
+    return frame[1]
+
+def _decode_resolution(data):
+    """
+        Decodifica a resposta JSON do Name Server. Respostas UDP truncadas (que devem ser repetidas por TCP) têm
+        "truncated": true.
+    """
+    return json.loads(data.decode())
+
+def _parse_resolution(response):
+    """
+        Interpreta a resposta decodificada do Name Server.
+
+        Respostas sem a lista "servers" (um único servidor) são tratadas como uma réplica de peso 1.
+
+        Returns:
+            tuple[Resolution | None, float]: Resolução (ou None) e TTL em segundos.
+    """
+    ttl = response.get('ttl', DNS_DEFAULT_TTL)
+
+    if 'server_ip' not in response:
+        return None, ttl
+
+    if 'servers' in response:
+        replicas = tuple(balancing.Replica(ip, int(port), int(weight)) for ip, port, weight in response['servers'])
+    else:
+        replicas = (balancing.Replica(response['server_ip'], int(response['server_port']), 1),)
+
+    return Resolution(replicas, response.get('strategy', balancing.DEFAULT_STRATEGY)), ttl
+
+def _call_replicas(command, resolution, use_cache):
+    """
+        Executa um comando na primeira réplica disponível, na ordem definida pela estratégia de balanceamento.
+
+        Se uma réplica estiver inacessível, a próxima é tentada (failover). O cache em disco só é consultado quando
+        todas as réplicas falharem.
+
+        Raises:
+            RPCServerNotFound: Se nenhuma réplica estiver acessível.
+    """
+    addresses = replica_selector.order(resolution)
+
+    for i, (host, port) in enumerate(addresses):
+        last = i == len(addresses) - 1
+        try:
+            return rpc_connection(command, host, port, use_cache, disk_fallback=last)
+        except RPCServerNotFound:
+            replica_selector.mark_failed(host, port)
+            if last:
+                raise
 
 def dns_connection(operation:str, host, port, use_cache:bool = True):
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client_socket:
+    """
+        Resolve as réplicas responsáveis pela operação e executa a chamada RPC.
 
-        parts = operation.strip().split()
-        cmd = parts[0]
+        A resolução é mantida em cache pelo TTL informado pelo Name Server, evitando uma consulta UDP por chamada.
+        A cada chamada as réplicas são ordenadas pela estratégia de balanceamento e, se uma estiver inacessível, a
+        próxima é tentada. Se todas as réplicas de uma resolução em cache falharem, a resolução é refeita uma vez.
 
-        client_socket.sendto((cmd).encode(), (host, port))
+        Args:
+            operation (str): Comando completo (ex: "sum 5 2").
+            host (str): Endereço IP do Name Server.
+            port (int): Porta UDP do Name Server.
+            use_cache (bool, optional): Se deve usar o cache de resultados. Padrão: True.
 
-        data, addr = client_socket.recvfrom(1024 * 1024)
+        Returns:
+            any: Resposta do servidor, ou mensagem de erro se a operação não for suportada.
 
-        response = json.loads(data.decode())
+        Raises:
+            RPCServerNotFound: Se o Name Server ou todas as réplicas do servidor de operação estiverem inacessíveis.
+    """
+    cmd = operation.strip().split()[0]
+
+    cached, resolution = resolution_cache.get(cmd)
+    if not cached:
+        resolution, ttl = resolve_operation(cmd, host, port)
+        resolution_cache.put(cmd, resolution, ttl)
+
+    if resolution is None:
+        return 'Erro: Operação não suportada'
+
+    try:
+        return _call_replicas(operation, resolution, use_cache)
+    except RPCServerNotFound as e:
+        if not cached:
+            raise
+        error = e
 
-        server_ip = response["server_ip"]
-        server_port = int(response["server_port"])
+    # A resolução em cache pode estar desatualizada: consulta o Name Server novamente
+    new_resolution, ttl = resolve_operation(cmd, host, port)
+    resolution_cache.put(cmd, new_resolution, ttl)
 
-        return rpc_connection(operation, server_ip, server_port, use_cache)
+    if new_resolution is None:
+        return 'Erro: Operação não suportada'
+    if set(new_resolution.replicas) == set(resolution.replicas):
+        raise error
 
-def rpc_connection(command:str, host, port, use_cache:bool = True):
+    return _call_replicas(operation, new_resolution, use_cache)
+
+def rpc_connection(command:str, host, port, use_cache:bool = True, disk_fallback:bool = True):
     """
-        Estabelece conexão RPC com o servidor via TCP.
+        Executa uma chamada RPC no servidor via TCP, reutilizando conexões persistentes do pool.
         
         Implementa sistema de cache em memória com expiração por tempo.
         Em caso de servidor offline, tenta usar cache em disco do servidor.
@@ -58,6 +959,7 @@ def rpc_connection(command:str, host, port, use_cache:bool = True):
             host (str): Endereço IP do servidor.
             port (int): Porta TCP do servidor.
             use_cache (bool, optional): Se deve usar cache. Padrão: True.
+            disk_fallback (bool, optional): Se deve usar o cache em disco com o servidor offline. Padrão: True.
         
         Returns:
             any: Resposta do servidor (pode ser string, número, lista, etc).
@@ -67,69 +969,278 @@ def rpc_connection(command:str, host, port, use_cache:bool = True):
             RPCServerNotFound: Se servidor offline e sem cache disponível.
         
         Note:
-            Cache em memória expira após tempo configurado (padrão: 1 minuto).
+            Cache em memória expira após tempo configurado (padrão: 1 minuto), ou antes, se o servidor informar
+            um TTL menor para o resultado.
             Cache em disco é usado como fallback se servidor offline.
     """
 
     # Verifica cache em memória
-    if use_cache and command in operations_cache:
-        cache_entry = operations_cache[command]
-        timestamp = datetime.fromisoformat(cache_entry['timestamp'])
-        if datetime.now() - timestamp < timedelta(minutes=CACHE_EXPIRATION_MINUTES):
+    if use_cache:
+        hit, response = _get_cached_response(command)
+        if hit:
             print('Retornando do cache em memória (cliente).')
-            return cache_entry['response']
+            return response
     
-    # Tenta acessar cache em disco se servidor offline
-    disk_cache = load_disk_cache()
+    # Envia pela conexão persistente; o cache em disco só é usado se o servidor estiver inacessível
     try:
-        check_status_server(host, port)
+        response, ttl = request_flights.do((host, port, command), lambda: _request_reply(command, host, port))
     except RPCServerNotFound:
-        if use_cache and command in disk_cache:
-            cache_entry = disk_cache[command]
-            print('Servidor offline, usando cache de disco (servidor).')
-            return cache_entry
+        resolution_cache.invalidate_address(host, port)
+        if use_cache and disk_fallback:
+            hit, cache_entry = offline_store.lookup(command)
+            if hit:
+                print('Servidor offline, usando cache de disco (servidor).')
+                return cache_entry
         raise
 
-    # Conecta ao servidor  
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
-        client_socket.connect((host, port))
-        client_socket.sendall((command).encode())
+    if use_cache:
+        _cache_response(command, response, ttl)
+
+    return response
+
+def _request_reply(command, host, port):
+    """
+        Envia um comando pelo pool de conexões e decodifica a resposta.
+
+        Returns:
+            tuple[any, int | None]: Resposta e TTL restante informado pelo servidor.
+    """
+    flags, payload = connection_pool.request(host, port, command)
+    return serialization.decode_reply(flags, payload)
+
+def stream_connection(command, host, port):
+    """
+        Executa uma chamada RPC com resposta em partes: nem o cliente nem o servidor precisam do resultado inteiro em
+        memória. Respostas em partes não passam pelos caches do cliente.
+
+        Args:
+            command (str): Comando a ser executado (ex: "fat 1000000").
+            host (str): Endereço IP do servidor.
+            port (int): Porta TCP do servidor.
 
-        raw_response = client_socket.recv(1024 * 1024).decode().strip()
+        Returns:
+            Iterator[any]: Partes do resultado, recebidas à medida que são consumidas.
+            any: Resposta completa (ex: mensagem de erro), se o servidor respondeu em um único frame.
 
+        Raises:
+            RPCServerNotFound: Se o servidor estiver inacessível (ao iniciar ou durante a iteração).
+    """
+    frames = connection_pool.stream(host, port, command)
+    flags, payload = next(frames)
+
+    if not flags & protocol.FLAG_STREAM:
+        frames.close()
+        return serialization.decode_reply(flags, payload)[0]
+
+    return _stream_chunks((flags, payload), frames)
+
+def _stream_chunks(frame, frames):
+    """
+        Decodifica as partes de uma resposta em partes até o frame vazio que a encerra.
+    """
+    try:
+        while frame[1]:
+            yield serialization.decode_stream_chunk(*frame)
+            frame = next(frames)
+    finally:
+        frames.close()
+
+def stream_dns_connection(operation:str, host, port):
+    """
+        Resolve as réplicas responsáveis pela operação e executa a chamada com resposta em partes (stream_connection).
+
+        As réplicas são tentadas na ordem da estratégia de balanceamento até uma aceitar a requisição; uma falha no
+        meio da iteração é repassada ao chamador, que já consumiu parte do resultado.
+
+        Args:
+            operation (str): Comando completo (ex: "primes 1 10000000").
+            host (str): Endereço IP do Name Server.
+            port (int): Porta UDP do Name Server.
+
+        Returns:
+            Iterator[any]: Partes do resultado.
+            any: Resposta completa (ex: mensagem de erro), se o servidor respondeu em um único frame.
+
+        Raises:
+            RPCServerNotFound: Se o Name Server ou todas as réplicas do servidor de operação estiverem inacessíveis.
+    """
+    cmd = operation.strip().split()[0]
+
+    cached, resolution = resolution_cache.get(cmd)
+    if not cached:
+        resolution, ttl = resolve_operation(cmd, host, port)
+        resolution_cache.put(cmd, resolution, ttl)
+
+    if resolution is None:
+        return 'Erro: Operação não suportada'
+
+    addresses = replica_selector.order(resolution)
+
+    for i, (replica_host, replica_port) in enumerate(addresses):
         try:
-            response = json.loads(raw_response)
-        except json.JSONDecodeError:
-            response = raw_response
+            return stream_connection(operation, replica_host, replica_port)
+        except RPCServerNotFound:
+            resolution_cache.invalidate_address(replica_host, replica_port)
+            replica_selector.mark_failed(replica_host, replica_port)
+            if i == len(addresses) - 1:
+                raise
 
-        if use_cache:
-            cache_data = {
-                'response': response,
-                'timestamp': datetime.now().isoformat()
-            }
-            operations_cache[command] = cache_data
+def write_stream(chunks, sink):
+    """
+        Escreve as partes de uma resposta em um objeto de arquivo de texto, à medida que chegam.
+
+        Partes de texto (dígitos) são escritas como recebidas; partes em lista, um elemento por linha.
 
-        return response
+        Args:
+            chunks (Iterable[str | list]): Partes do resultado.
+            sink (file-like): Objeto com write(str) (ex: arquivo aberto em modo texto).
 
-def check_status_server(host, port, timeout=2):
+        Returns:
+            int: Quantidade de dígitos ou elementos escritos.
     """
-        Verifica se o servidor RPC está online e acessível.
-        
-        Tenta estabelecer conexão TCP com timeout configurável.
-        
+    count = 0
+    for chunk in chunks:
+        count += _write_chunk(chunk, sink)
+    return count
+
+def _write_chunk(chunk, sink):
+    if isinstance(chunk, str):
+        sink.write(chunk)
+    else:
+        sink.write(''.join(f'{item}\n' for item in chunk))
+    return len(chunk)
+
+def batch_connection(commands, host, port, use_cache:bool = True):
+    """
+        Executa um lote de comandos em um mesmo servidor usando uma única conexão.
+
+        Os comandos que não estão no cache em memória são agrupados em frames de lote (até batch_size comandos cada),
+        enviados em sequência sem aguardar as respostas (pipelining) e processados pelo servidor em uma única passada por frame.
+
         Args:
+            commands (list[str]): Comandos a serem executados (ex: ["sum 5 2", "prod 3 4"]).
             host (str): Endereço IP do servidor.
             port (int): Porta TCP do servidor.
-            timeout (int, optional): Timeout em segundos. Padrão: 2.
-        
+            use_cache (bool, optional): Se deve usar cache. Padrão: True.
+
         Returns:
-            bool: True se servidor está acessível.
-        
+            list[any]: Respostas na mesma ordem dos comandos.
+
         Raises:
-            RPCServerNotFound: Se não conseguir conectar ao servidor.
+            RPCServerNotFound: Se o servidor estiver inacessível.
     """
+    results = [None] * len(commands)
+    pending = []
+
+    for i, command in enumerate(commands):
+        if use_cache:
+            hit, response = _get_cached_response(command)
+            if hit:
+                results[i] = response
+                continue
+        pending.append(i)
+
+    chunks = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    messages = [[commands[i] for i in chunk] for chunk in chunks]
+
+    if not messages:
+        return results
+
     try:
-        with socket.create_connection((host, port), timeout=timeout):
-            return True
-    except (socket.timeout, ConnectionRefusedError, OSError):
-        raise RPCServerNotFound(host, port) from None
+        frames = connection_pool.pipeline(host, port, messages)
+    except RPCServerNotFound:
+        resolution_cache.invalidate_address(host, port)
+        raise
+
+    for chunk, (flags, payload) in zip(chunks, frames):
+        for i, (response, ttl) in zip(chunk, serialization.decode_batch_reply(flags, payload)):
+            results[i] = response
+            if use_cache:
+                _cache_response(commands[i], response, ttl)
+
+    return results
+
+def batch_dns_connection(operations, host, port, use_cache:bool = True):
+    """
+        Executa um lote de comandos, possivelmente de servidores diferentes.
+
+        Cada comando é resolvido (com o cache de resoluções), os comandos são agrupados por servidor e cada grupo é
+        enviado com batch_connection à primeira réplica da ordem de balanceamento; se ela estiver inacessível, o grupo
+        é reenviado à próxima (failover). Se todas as réplicas de um grupo estiverem inacessíveis, apenas os comandos
+        desse grupo recebem o cache em disco ou uma mensagem de erro; os resultados dos demais grupos são mantidos.
+
+        Args:
+            operations (list[str]): Comandos completos (ex: ["sum 5 2", "fat 10"]).
+            host (str): Endereço IP do Name Server.
+            port (int): Porta UDP do Name Server.
+            use_cache (bool, optional): Se deve usar o cache de resultados. Padrão: True.
+
+        Returns:
+            list[any]: Respostas na mesma ordem dos comandos. Comandos de operações não suportadas ou de servidores
+                       inacessíveis (sem cache em disco) recebem mensagem de erro.
+
+        Raises:
+            RPCServerNotFound: Se o Name Server estiver inacessível.
+    """
+    results = [None] * len(operations)
+    groups = {}
+
+    for i, operation in enumerate(operations):
+        cmd = operation.strip().split()[0]
+
+        cached, resolution = resolution_cache.get(cmd)
+        if not cached:
+            resolution, ttl = resolve_operation(cmd, host, port)
+            resolution_cache.put(cmd, resolution, ttl)
+
+        if resolution is None:
+            results[i] = 'Erro: Operação não suportada'
+            continue
+
+        groups.setdefault(resolution, []).append(i)
+
+    for resolution, indexes in groups.items():
+        addresses = replica_selector.order(resolution)
+        for j, (server_host, server_port) in enumerate(addresses):
+            try:
+                responses = batch_connection([operations[i] for i in indexes], server_host, server_port, use_cache)
+                break
+            except RPCServerNotFound as e:
+                replica_selector.mark_failed(server_host, server_port)
+                if j == len(addresses) - 1:
+                    responses = [_offline_response(operations[i], e, use_cache) for i in indexes]
+
+        for i, response in zip(indexes, responses):
+            results[i] = response
+
+    return results
+
+def _offline_response(command, error, use_cache):
+    """
+        Resposta de um comando do lote cujo servidor está inacessível: o cache em disco, se houver, ou uma mensagem de erro.
+    """
+    if use_cache:
+        hit, cache_entry = offline_store.lookup(command)
+        if hit:
+            return cache_entry
+    return f'Erro: {error}'
+
+def _get_cached_response(command):
+    """
+        Busca uma resposta válida (não expirada) no cache em memória.
+
+        Returns:
+            tuple[bool, any]: (encontrado, resposta).
+    """
+    return operations_cache.get(command)
+
+def _cache_response(command, response, ttl=None):
+    """
+        Armazena uma resposta no cache em memória.
+
+        Args:
+            command (str): Comando executado.
+            response (any): Resposta do servidor.
+            ttl (float, optional): Validade restante do resultado no cache do servidor, em segundos.
+    """
+    operations_cache.put(command, response, ttl)
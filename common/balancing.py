@@ -0,0 +1,125 @@
+import threading
+from collections import namedtuple
+
+# Estratégias de balanceamento entre réplicas de um servidor de operações
+ROUND_ROBIN = 'round_robin'
+LEAST_OUTSTANDING = 'least_outstanding'
+WEIGHTED = 'weighted'
+STRATEGIES = (ROUND_ROBIN, LEAST_OUTSTANDING, WEIGHTED)
+DEFAULT_STRATEGY = ROUND_ROBIN
+
+# Réplica de um servidor de operações; o peso é usado pelas estratégias weighted e least_outstanding
+Replica = namedtuple('Replica', ['host', 'port', 'weight'])
+
+# Limite de conjuntos de réplicas com estado guardado (o conjunto muda quando réplicas entram ou saem)
+_MAX_TRACKED_SETS = 1024
+
+class Balancer:
+    """
+        Ordena as réplicas candidatas de uma operação segundo uma estratégia de balanceamento.
+
+        A primeira réplica da ordem é a escolhida; as demais são as alternativas, em ordem, caso ela falhe (failover).
+
+        - round_robin: alterna a réplica inicial a cada chamada.
+        - weighted: round robin suave ponderado pelo peso (réplica de peso 3 é escolhida 3x mais que uma de peso 1).
+        - least_outstanding: escolhe a réplica com menos requisições em andamento por unidade de peso (informadas pela
+          função load); empates são desfeitos com round robin.
+
+        Attributes:
+            strategy (str): Estratégia de balanceamento.
+            load (callable): Função que recebe (host, porta) e retorna o número de requisições em andamento.
+    """
+
+    def __init__(self, strategy=DEFAULT_STRATEGY, load=None):
+        """
+            Inicializa o balanceador.
+
+            Raises:
+                ValueError: Se a estratégia não for reconhecida.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f'Estratégia de balanceamento desconhecida: {strategy}')
+
+        self.strategy = strategy
+        self.load = load or (lambda address: 0)
+        self._turns = {}
+        self._current_weights = {}
+        self._last_orders = {}
+        self._lock = threading.Lock()
+
+    def _next_turn(self, replicas):
+        if len(self._turns) >= _MAX_TRACKED_SETS and replicas not in self._turns:
+            self._turns.clear()
+        turn = self._turns.get(replicas, 0)
+        self._turns[replicas] = turn + 1
+        return turn % len(replicas)
+
+    def _next_weighted(self, replicas):
+        """
+            Round robin suave ponderado (mesmo algoritmo do nginx): a escolha é a réplica de maior peso corrente,
+            que em seguida é reduzido pelo peso total.
+        """
+        if len(self._current_weights) >= _MAX_TRACKED_SETS and replicas not in self._current_weights:
+            self._current_weights.clear()
+        current = self._current_weights.setdefault(replicas, [0] * len(replicas))
+
+        best = 0
+        for i, replica in enumerate(replicas):
+            current[i] += replica.weight
+            if current[i] > current[best]:
+                best = i
+        current[best] -= sum(replica.weight for replica in replicas)
+        return best
+
+    def order(self, replicas):
+        """
+            Ordena as réplicas candidatas de uma operação.
+
+            Args:
+                replicas (tuple[Replica, ...]): Réplicas que atendem a operação.
+
+            Returns:
+                list[Replica]: Réplicas na ordem em que devem ser tentadas.
+        """
+        replicas = tuple(replicas)
+        if len(replicas) <= 1:
+            return list(replicas)
+
+        if self.strategy == WEIGHTED:
+            with self._lock:
+                best = self._next_weighted(replicas)
+            rest = sorted((r for i, r in enumerate(replicas) if i != best), key=lambda r: -r.weight)
+            ordered = [replicas[best]] + rest
+        else:
+            with self._lock:
+                turn = self._next_turn(replicas)
+            ordered = list(replicas[turn:] + replicas[:turn])
+
+            if self.strategy == LEAST_OUTSTANDING:
+                # sort é estável: réplicas com a mesma carga mantêm a ordem do round robin
+                ordered.sort(key=lambda r: self.load((r.host, r.port)) / max(r.weight, 1))
+
+        with self._lock:
+            if len(self._last_orders) >= _MAX_TRACKED_SETS and replicas not in self._last_orders:
+                self._last_orders.clear()
+            self._last_orders[replicas] = ordered
+
+        return list(ordered)
+
+    def repeat(self, replicas):
+        """
+            Repete a última ordem entregue por order para as réplicas, sem avançar o estado da estratégia.
+
+            Usada quando a mesma consulta é refeita (ex: por TCP após uma resposta UDP truncada), para que ela não
+            conte como uma nova escolha.
+
+            Args:
+                replicas (tuple[Replica, ...]): Réplicas que atendem a operação.
+
+            Returns:
+                list[Replica]: A última ordem entregue, ou as réplicas na ordem recebida se nenhuma foi entregue.
+        """
+        replicas = tuple(replicas)
+        with self._lock:
+            ordered = self._last_orders.get(replicas, replicas)
+        return list(ordered)
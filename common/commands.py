@@ -0,0 +1,129 @@
+import re
+from fractions import Fraction
+from common.enums import OperationsEnum
+
+# Modos da operação fat: "fat n" retorna o valor decimal; "fat n <modo> [parâmetro]" retorna uma forma reduzida
+FACTORIAL_MODES = {
+    'digits': 0,  # quantidade de dígitos decimais
+    'lead': 1,    # os k primeiros dígitos ("fat n lead k")
+    'mod': 1,     # resto da divisão por m ("fat n mod m")
+    'hex': 0,     # valor em hexadecimal (conversão linear)
+}
+
+# Operações aritméticas básicas (servidor 1)
+BASIC_OPERATIONS = {OperationsEnum.SUM.value, OperationsEnum.SUB.value, OperationsEnum.PROD.value, OperationsEnum.DIV.value}
+
+# Palavra que, logo após o comando, seleciona a aritmética exata (ex: "sum exact 0.1 0.2" -> 0.3)
+EXACT_MODE = 'exact'
+
+# Limite do tamanho dos operandos no modo exato: soma, para todos os operandos, do número de caracteres e do valor
+# absoluto do expoente ("1e30000000" conta 30000010). Limita os dígitos das frações e, com eles, o custo da operação
+EXACT_MAX_DIGITS = 100000
+
+_EXPONENT = re.compile(r'[eE]([-+]?\d+)')
+
+def parse_operands(args):
+    """
+        Interpreta os operandos de uma operação básica de uma só vez.
+
+        No modo padrão a conversão é feita com map(float, ...), sem laço Python por operando. Se o primeiro argumento
+        for EXACT_MODE, os operandos são convertidos para Fraction ("0.1" vira exatamente 1/10), desde que seu tamanho
+        total (caracteres e expoentes) não ultrapasse EXACT_MAX_DIGITS.
+
+        Args:
+            args (list[str]): Argumentos do comando.
+
+        Returns:
+            tuple[bool, list[float] | list[Fraction]]: (modo exato, operandos).
+
+        Raises:
+            ValueError: Se algum operando não for numérico ou se os operandos do modo exato forem grandes demais.
+    """
+    if args and args[0] == EXACT_MODE:
+        operands = args[1:]
+        size = sum(map(len, operands)) + sum(abs(int(e)) for e in _EXPONENT.findall(' '.join(operands)))
+        if size > EXACT_MAX_DIGITS:
+            raise ValueError(f'operandos do modo exato grandes demais (limite: {EXACT_MAX_DIGITS} dígitos)')
+        return True, list(map(Fraction, operands))
+    return False, list(map(float, args))
+
+# Operações cujo resultado não depende da ordem dos operandos
+COMMUTATIVE_OPERATIONS = {OperationsEnum.SUM.value, OperationsEnum.PROD.value}
+
+def canonical_command(data):
+    """
+        Normaliza um comando para uso como chave de cache.
+
+        Os argumentos são interpretados uma única vez e reescritos em forma canônica, de modo que comandos
+        equivalentes compartilhem a mesma entrada no cache:
+        - espaços extras são descartados ("sum  1 2" -> "sum 1.0 2.0")
+        - números das operações básicas são normalizados como float ("1", "1.0" e "1e0" -> "1.0"), ou como fração
+          no modo exato ("sum exact 0.5 0.25" -> "sum exact 1/4 1/2")
+        - números de fat e prim são normalizados como int ("007" -> "7"); o modo de fat é validado
+        - operandos de operações comutativas (sum, prod) são ordenados ("sum 2 1" -> "sum 1.0 2.0")
+
+        Args:
+            data (str): Comando recebido (ex: "sum 2 1").
+
+        Returns:
+            str | None: Comando canônico, ou None se o comando for desconhecido ou tiver argumentos inválidos.
+    """
+    parts = data.strip().split()
+    if not parts:
+        return None
+
+    cmd, args = parts[0], parts[1:]
+
+    try:
+        if cmd in BASIC_OPERATIONS:
+            exact, nums = parse_operands(args)
+        elif cmd == OperationsEnum.FAT.value:
+            return _canonical_factorial(args)
+        elif cmd in (OperationsEnum.PRIM.value, OperationsEnum.PRIME_RANGE.value, OperationsEnum.PRIME_COUNT.value):
+            nums = [int(a) for a in args]
+        else:
+            return None
+
+        if cmd in COMMUTATIVE_OPERATIONS:
+            nums.sort()
+
+        if cmd in BASIC_OPERATIONS and exact:
+            return ' '.join([cmd, EXACT_MODE] + [str(n) for n in nums])
+
+        return ' '.join([cmd] + [repr(n) for n in nums])
+    except ValueError:
+        return None
+
+def parse_factorial_args(args):
+    """
+        Interpreta os argumentos de fat: "n [modo [parâmetro]]".
+
+        Returns:
+            tuple[int, str | None, int | None]: (n, modo, parâmetro).
+
+        Raises:
+            ValueError: Se os argumentos forem inválidos.
+    """
+    if not args or len(args) > 3:
+        raise ValueError('argumentos inválidos')
+
+    n = int(args[0])
+    mode = args[1] if len(args) > 1 else None
+    param = int(args[2]) if len(args) > 2 else None
+
+    if mode is not None and (mode not in FACTORIAL_MODES or FACTORIAL_MODES[mode] != len(args) - 2):
+        raise ValueError('modo inválido')
+
+    return n, mode, param
+
+def _canonical_factorial(args):
+    """
+        Forma canônica dos argumentos de fat ("fat 007 lead 05" -> "fat 7 lead 5").
+    """
+    n, mode, param = parse_factorial_args(args)
+    parts = [OperationsEnum.FAT.value, repr(n)]
+    if mode is not None:
+        parts.append(mode)
+    if param is not None:
+        parts.append(repr(param))
+    return ' '.join(parts)
@@ -11,6 +11,8 @@ class OperationsEnum(Enum):
             DIV (str): Comando de divisão ('div').
             FAT (str): Comando de fatorial ('fat').
             PRIM (str): Comando de verificação de primos ('prim').
+            PRIME_RANGE (str): Comando de listagem dos primos de um intervalo ('primes').
+            PRIME_COUNT (str): Comando de contagem dos primos de um intervalo ('pcount').
     """
     SUM = 'sum'
     SUB = 'sub'
@@ -18,5 +20,20 @@ class OperationsEnum(Enum):
     DIV = 'div'
     FAT = 'fat'
     PRIM = 'prim'
+    PRIME_RANGE = 'primes'
+    PRIME_COUNT = 'pcount'
     SOLVER = 'solver'
-    NEWS = 'news'
\ No newline at end of file
+    NEWS = 'news'
+
+class RegistryMessageEnum(Enum):
+    """
+        Tipos de mensagem de registro enviadas pelos servidores de operações ao Name Server (UDP, JSON).
+
+        Attributes:
+            REGISTER (str): Anúncio do servidor ao iniciar ('register').
+            HEARTBEAT (str): Renovação periódica do registro, com métricas de carga ('heartbeat').
+            DEREGISTER (str): Cancelamento do registro ao encerrar ('deregister').
+    """
+    REGISTER = 'register'
+    HEARTBEAT = 'heartbeat'
+    DEREGISTER = 'deregister'
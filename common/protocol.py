@@ -0,0 +1,295 @@
+import math
+import socket
+import struct
+import asyncio
+
+# Cabeçalho de cada frame: versão (1 byte), flags (1 byte) e tamanho do payload (4 bytes, big-endian)
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct('!BBI')
+
+# Flags de frame
+FLAG_BATCH = 0x01  # Payload é uma lista JSON de comandos (requisição) ou de pares [resposta, ttl] (resposta)
+FLAG_TTL = 0x02    # Payload começa com o TTL restante (4 bytes, segundos) do resultado no cache do servidor
+FLAG_BINARY = 0x04 # Payload no formato binário tipado (common.serialization) em vez de texto/JSON
+FLAG_HELLO = 0x08  # Negociação do formato de payload da conexão (oferta do cliente / escolha do servidor)
+FLAG_STREAM = 0x10 # Resposta em partes: a requisição pede o resultado em vários frames; cada frame de resposta leva
+                   # uma parte e um frame FLAG_STREAM com payload vazio encerra a resposta
+
+TTL_HEADER = struct.Struct('!I')
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+DEFAULT_MAX_FRAME_SIZE = 512 * 1024 * 1024
+
+# Frames pequenos são enviados em uma única escrita (cabeçalho + payload)
+_COALESCE_LIMIT = 64 * 1024
+
+class ProtocolError(Exception):
+    """
+        Exceção lançada quando um frame recebido é inválido ou a conexão é encerrada no meio de um frame.
+    """
+    pass
+
+def configure_socket(sock):
+    """
+        Ajusta um socket TCP para troca de frames pequenos de requisição/resposta.
+
+        Desativa o algoritmo de Nagle (TCP_NODELAY) para que respostas curtas não aguardem o ACK atrasado do outro lado.
+
+        Args:
+            sock (socket.socket): Socket TCP conectado.
+    """
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
+
+def encode_header(length, flags=0):
+    """
+        Monta o cabeçalho de um frame.
+
+        Args:
+            length (int): Tamanho do payload em bytes.
+            flags (int, optional): Flags do frame. Padrão: 0.
+
+        Returns:
+            bytes: Cabeçalho de 6 bytes.
+    """
+    return HEADER.pack(PROTOCOL_VERSION, flags, length)
+
+def decode_header(header, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+    """
+        Interpreta e valida o cabeçalho de um frame.
+
+        Args:
+            header (bytes | memoryview): Cabeçalho de 6 bytes.
+            max_frame_size (int, optional): Tamanho máximo aceito para o payload.
+
+        Returns:
+            tuple[int, int]: Tupla (flags, tamanho do payload).
+
+        Raises:
+            ProtocolError: Se a versão não for suportada ou o frame exceder o tamanho máximo.
+    """
+    version, flags, length = HEADER.unpack(header)
+
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f'Versão de protocolo não suportada: {version}')
+    if length > max_frame_size:
+        raise ProtocolError(f'Frame muito grande ({length} bytes, limite: {max_frame_size} bytes)')
+
+    return flags, length
+
+def encode_frame(payload, flags=0):
+    """
+        Monta um frame completo (cabeçalho + payload).
+
+        Args:
+            payload (bytes): Conteúdo do frame.
+            flags (int, optional): Flags do frame. Padrão: 0.
+
+        Returns:
+            bytes: Frame pronto para envio.
+    """
+    return encode_header(len(payload), flags) + payload
+
+def pack_ttl(payload, ttl):
+    """
+        Prefixa o payload de uma resposta com o TTL restante do resultado.
+
+        Args:
+            payload (bytes): Conteúdo da resposta.
+            ttl (float | None): Tempo de validade em segundos, ou None se o resultado não expira.
+
+        Returns:
+            tuple[int, bytes]: Flags e payload do frame de resposta.
+    """
+    if ttl is None:
+        return 0, payload
+    return FLAG_TTL, TTL_HEADER.pack(max(0, math.ceil(ttl))) + payload
+
+def unpack_ttl(flags, payload):
+    """
+        Separa o TTL (se presente) do conteúdo de uma resposta.
+
+        Args:
+            flags (int): Flags do frame recebido.
+            payload (bytes): Conteúdo do frame recebido.
+
+        Returns:
+            tuple[int | None, bytes]: TTL em segundos (ou None) e o conteúdo da resposta.
+    """
+    if not flags & FLAG_TTL:
+        return None, payload
+    return TTL_HEADER.unpack_from(payload)[0], payload[TTL_HEADER.size:]
+
+def send_frame(sock, payload, flags=0):
+    """
+        Envia um frame por um socket TCP.
+
+        Payloads pequenos são enviados junto com o cabeçalho em uma única chamada; payloads grandes são enviados
+        separadamente para evitar a cópia do conteúdo.
+
+        Args:
+            sock (socket.socket): Socket TCP conectado.
+            payload (bytes): Conteúdo do frame.
+            flags (int, optional): Flags do frame. Padrão: 0.
+    """
+    if len(payload) <= _COALESCE_LIMIT:
+        sock.sendall(encode_frame(payload, flags))
+    else:
+        sock.sendall(encode_header(len(payload), flags))
+        sock.sendall(payload)
+
+class FrameReader:
+    """
+        Leitor de frames sobre um socket TCP com buffer reutilizável.
+
+        Os dados são lidos com recv_into diretamente em um bytearray mantido entre as leituras,
+        de modo que vários frames (inclusive parciais) podem ser recebidos em uma única chamada ao sistema.
+
+        Attributes:
+            sock (socket.socket): Socket TCP conectado.
+            max_frame_size (int): Tamanho máximo aceito para um payload.
+    """
+
+    def __init__(self, sock, buffer_size=DEFAULT_BUFFER_SIZE, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        """
+            Inicializa o leitor de frames.
+
+            Args:
+                sock (socket.socket): Socket TCP conectado.
+                buffer_size (int, optional): Tamanho inicial do buffer de leitura.
+                max_frame_size (int, optional): Tamanho máximo aceito para um payload.
+        """
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+        self._initial_size = buffer_size
+        self._buffer = bytearray(buffer_size)
+        self._start = 0
+        self._end = 0
+
+    def _fill(self, n):
+        """
+            Garante que pelo menos n bytes estejam disponíveis no buffer.
+
+            Returns:
+                bool: False se a conexão foi encerrada antes de qualquer byte ser recebido.
+
+            Raises:
+                ProtocolError: Se a conexão for encerrada com dados parciais no buffer.
+        """
+        available = self._end - self._start
+        if available >= n:
+            return True
+
+        # Compacta ou aumenta o buffer para caber o restante do frame
+        if self._start + n > len(self._buffer):
+            if n > len(self._buffer):
+                new_buffer = bytearray(max(n, 2 * len(self._buffer)))
+                new_buffer[:available] = self._buffer[self._start:self._end]
+                self._buffer = new_buffer
+            else:
+                self._buffer[:available] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = available
+
+        with memoryview(self._buffer) as view:
+            while self._end - self._start < n:
+                received = self.sock.recv_into(view[self._end:])
+                if received == 0:
+                    if self._end == self._start:
+                        return False
+                    raise ProtocolError('Conexão encerrada no meio de um frame')
+                self._end += received
+
+        return True
+
+    def _consume(self, n):
+        """
+            Retira n bytes do início do buffer.
+        """
+        data = bytes(self._buffer[self._start:self._start + n])
+        self._start += n
+
+        if self._start == self._end:
+            self._start = self._end = 0
+            # Libera buffers que cresceram para um frame grande
+            if len(self._buffer) > 16 * self._initial_size:
+                self._buffer = bytearray(self._initial_size)
+
+        return data
+
+    def has_buffered_data(self):
+        """
+            Indica se já existem bytes recebidos e ainda não consumidos.
+
+            Returns:
+                bool: True se há dados no buffer.
+        """
+        return self._end > self._start
+
+    def read_frame(self):
+        """
+            Lê o próximo frame da conexão.
+
+            Returns:
+                tuple[int, bytes] | None: Tupla (flags, payload), ou None se a conexão foi encerrada entre frames.
+
+            Raises:
+                ProtocolError: Se o frame for inválido ou estiver incompleto.
+        """
+        if not self._fill(HEADER.size):
+            return None
+
+        flags, length = decode_header(self._buffer[self._start:self._start + HEADER.size], self.max_frame_size)
+        self._start += HEADER.size
+
+        if not self._fill(length):
+            raise ProtocolError('Conexão encerrada no meio de um frame')
+
+        return flags, self._consume(length)
+
+async def read_frame_async(reader, max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+    """
+        Lê o próximo frame de um asyncio.StreamReader.
+
+        Args:
+            reader (asyncio.StreamReader): Stream de leitura.
+            max_frame_size (int, optional): Tamanho máximo aceito para um payload.
+
+        Returns:
+            tuple[int, bytes] | None: Tupla (flags, payload), ou None se a conexão foi encerrada entre frames.
+
+        Raises:
+            ProtocolError: Se o frame for inválido ou estiver incompleto.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ProtocolError('Conexão encerrada no meio de um frame') from None
+
+    flags, length = decode_header(header, max_frame_size)
+
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise ProtocolError('Conexão encerrada no meio de um frame') from None
+
+    return flags, payload
+
+def write_frame(writer, payload, flags=0):
+    """
+        Escreve um frame em um asyncio.StreamWriter (sem aguardar o drain).
+
+        Args:
+            writer (asyncio.StreamWriter): Stream de escrita.
+            payload (bytes): Conteúdo do frame.
+            flags (int, optional): Flags do frame. Padrão: 0.
+    """
+    if len(payload) <= _COALESCE_LIMIT:
+        writer.write(encode_frame(payload, flags))
+    else:
+        writer.write(encode_header(len(payload), flags))
+        writer.write(payload)
@@ -0,0 +1,366 @@
+import sys
+import json
+import struct
+from array import array
+from common import protocol
+
+# Formatos de payload suportados, em ordem de preferência (negociados por conexão com FLAG_HELLO)
+WIRE_BINARY = 'binary'
+WIRE_TEXT = 'text'
+SUPPORTED_WIRE_FORMATS = (WIRE_BINARY, WIRE_TEXT)
+
+# Tags de tipo da codificação binária; números e vetores usam little-endian
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT64 = b'i'
+_BIGINT = b'I'
+_FLOAT64 = b'd'
+_STR = b's'
+_BYTES = b'b'
+_LIST = b'l'
+_DICT = b'm'
+_BOOL_VECTOR = b'B'
+_INT64_VECTOR = b'Q'
+_FLOAT64_VECTOR = b'D'
+
+_INT64_STRUCT = struct.Struct('<q')
+_FLOAT64_STRUCT = struct.Struct('<d')
+_LENGTH_STRUCT = struct.Struct('<I')
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+_BIG_ENDIAN_HOST = sys.byteorder == 'big'
+
+class SerializationError(Exception):
+    """
+        Exceção lançada quando um payload binário é inválido.
+    """
+    pass
+
+def _pack_array(typecode, values):
+    """
+        Converte uma lista homogênea em bytes (little-endian) com array, sem laço Python por elemento.
+    """
+    data = array(typecode, values)
+    if _BIG_ENDIAN_HOST:
+        data.byteswap()
+    return data.tobytes()
+
+def _unpack_array(typecode, data):
+    """
+        Converte bytes (little-endian) de volta em uma lista, sem laço Python por elemento.
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN_HOST:
+        values.byteswap()
+    return values.tolist()
+
+def _encode_list(values, out):
+    """
+        Codifica uma lista, usando vetores compactos quando todos os elementos são do mesmo tipo numérico.
+    """
+    count = _LENGTH_STRUCT.pack(len(values))
+    types = set(map(type, values))
+
+    if types == {bool}:
+        out += (_BOOL_VECTOR, count, bytes(values))
+        return
+    if types == {float}:
+        out += (_FLOAT64_VECTOR, count, _pack_array('d', values))
+        return
+    if types == {int}:
+        try:
+            out += (_INT64_VECTOR, count, _pack_array('q', values))
+            return
+        except OverflowError:
+            pass
+
+    out += (_LIST, count)
+    for value in values:
+        _encode(value, out)
+
+def _encode(value, out):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out += (_INT64, _INT64_STRUCT.pack(value))
+        else:
+            size = (value.bit_length() + 8) // 8
+            out += (_BIGINT, _LENGTH_STRUCT.pack(size), value.to_bytes(size, 'little', signed=True))
+    elif isinstance(value, float):
+        out += (_FLOAT64, _FLOAT64_STRUCT.pack(value))
+    elif isinstance(value, (bytes, bytearray)):
+        out += (_BYTES, _LENGTH_STRUCT.pack(len(value)), bytes(value))
+    elif isinstance(value, (list, tuple)):
+        _encode_list(value, out)
+    elif isinstance(value, dict):
+        out += (_DICT, _LENGTH_STRUCT.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        # Strings e demais tipos (ex: Fraction, Decimal) seguem como texto
+        data = str(value).encode()
+        out += (_STR, _LENGTH_STRUCT.pack(len(data)), data)
+
+def encode(value):
+    """
+        Codifica um valor Python no formato binário tipado.
+
+        Suporta None, bool, int (64 bits ou arbitrário), float, str, bytes, listas/tuplas e dicionários.
+        Listas homogêneas de bool, int64 ou float64 são enviadas como vetores compactos (1 ou 8 bytes por elemento).
+
+        Args:
+            value (any): Valor a ser codificado.
+
+        Returns:
+            bytes: Valor codificado.
+    """
+    out = []
+    _encode(value, out)
+    return b''.join(out)
+
+class _Decoder:
+    """
+        Decodificador do formato binário tipado sobre um buffer, com posição de leitura.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def _take(self, n):
+        end = self.pos + n
+        if end > len(self.data):
+            raise SerializationError('Payload binário truncado')
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def _length(self):
+        return _LENGTH_STRUCT.unpack(self._take(_LENGTH_STRUCT.size))[0]
+
+    def value(self):
+        tag = bytes(self._take(1))
+
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT64:
+            return _INT64_STRUCT.unpack(self._take(8))[0]
+        if tag == _BIGINT:
+            return int.from_bytes(self._take(self._length()), 'little', signed=True)
+        if tag == _FLOAT64:
+            return _FLOAT64_STRUCT.unpack(self._take(8))[0]
+        if tag == _STR:
+            return str(self._take(self._length()), 'utf-8')
+        if tag == _BYTES:
+            return bytes(self._take(self._length()))
+        if tag == _BOOL_VECTOR:
+            return [b != 0 for b in self._take(self._length())]
+        if tag == _INT64_VECTOR:
+            return _unpack_array('q', self._take(8 * self._length()))
+        if tag == _FLOAT64_VECTOR:
+            return _unpack_array('d', self._take(8 * self._length()))
+        if tag == _LIST:
+            return [self.value() for _ in range(self._length())]
+        if tag == _DICT:
+            result = {}
+            for _ in range(self._length()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+
+        raise SerializationError(f'Tipo desconhecido no payload binário: {tag!r}')
+
+def decode(data):
+    """
+        Decodifica um valor no formato binário tipado.
+
+        Args:
+            data (bytes): Valor codificado por encode().
+
+        Returns:
+            any: Valor decodificado (vetores compactos voltam como listas).
+
+        Raises:
+            SerializationError: Se o payload for inválido ou tiver bytes sobrando.
+    """
+    decoder = _Decoder(data)
+    value = decoder.value()
+    if decoder.pos != len(decoder.data):
+        raise SerializationError('Bytes extras no payload binário')
+    return value
+
+def negotiate(offer):
+    """
+        Escolhe o formato de payload de uma conexão a partir da oferta do cliente (frame FLAG_HELLO).
+
+        Args:
+            offer (bytes): Formatos aceitos pelo cliente, separados por vírgula, em ordem de preferência.
+
+        Returns:
+            str: Primeiro formato da oferta suportado pelo servidor (texto se nenhum for).
+    """
+    for wire_format in offer.decode(errors='replace').split(','):
+        if wire_format.strip() in SUPPORTED_WIRE_FORMATS:
+            return wire_format.strip()
+    return WIRE_TEXT
+
+# Início de um texto que json.loads interpretaria como outro tipo (número, lista, objeto, string JSON)
+_JSON_START = frozenset('-0123456789[{"')
+_JSON_WORDS = frozenset(('true', 'false', 'null', 'NaN', 'Infinity'))
+
+def to_text(value):
+    """
+        Representação textual de uma resposta: listas e dicionários em JSON, demais valores com str().
+
+        Strings que decode_text converteria em outro tipo (ex: o fatorial "120" ou o resultado exato "0.3") seguem como
+        string JSON ("\"120\""), para que o cliente as receba como texto, assim como no formato binário.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if text and (text[0] in _JSON_START or text in _JSON_WORDS):
+            return json.dumps(value)
+        return value
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value)
+    return str(value)
+
+def decode_text(text):
+    """
+        Converte uma resposta textual, deserializando JSON quando possível.
+    """
+    text = text.strip()
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def encode_request(message, binary):
+    """
+        Monta o payload de uma requisição.
+
+        Args:
+            message (str | list[str]): Comando, ou lista de comandos (lote).
+            binary (bool): Se a conexão negociou o formato binário.
+
+        Returns:
+            tuple[int, bytes]: Flags e payload do frame.
+    """
+    flags = protocol.FLAG_BATCH if isinstance(message, list) else 0
+
+    if binary:
+        return flags | protocol.FLAG_BINARY, encode(message)
+    if flags:
+        return flags, json.dumps(message).encode()
+    return flags, message.encode()
+
+def decode_request(flags, payload):
+    """
+        Interpreta o payload de uma requisição recebida pelo servidor.
+
+        Returns:
+            str | list[str]: Comando, ou lista de comandos se FLAG_BATCH estiver presente.
+    """
+    if flags & protocol.FLAG_BINARY:
+        return decode(payload)
+
+    text = payload.decode()
+    return json.loads(text) if flags & protocol.FLAG_BATCH else text
+
+def encode_reply(value, ttl, binary):
+    """
+        Monta o frame de resposta de um comando.
+
+        Args:
+            value (any): Resposta do handler.
+            ttl (float | None): TTL restante do resultado no cache do servidor.
+            binary (bool): Se a requisição chegou no formato binário.
+
+        Returns:
+            tuple[int, bytes]: Flags e payload do frame.
+    """
+    if binary:
+        flags, payload = protocol.pack_ttl(encode(value), ttl)
+        return flags | protocol.FLAG_BINARY, payload
+    return protocol.pack_ttl(to_text(value).encode(), ttl)
+
+def encode_batch_reply(replies, binary):
+    """
+        Monta o frame de resposta de um lote: lista de pares [resposta, ttl], na ordem dos comandos.
+
+        Args:
+            replies (list[tuple[any, float | None]]): Respostas e TTLs.
+            binary (bool): Se a requisição chegou no formato binário.
+
+        Returns:
+            tuple[int, bytes]: Flags e payload do frame.
+    """
+    if binary:
+        return protocol.FLAG_BATCH | protocol.FLAG_BINARY, encode([[value, ttl] for value, ttl in replies])
+    return protocol.FLAG_BATCH, json.dumps([[to_text(value), ttl] for value, ttl in replies]).encode()
+
+def encode_stream_chunk(chunk, binary):
+    """
+        Monta o frame de uma parte de uma resposta em partes (FLAG_STREAM).
+
+        Partes sempre levam o tipo (binário tipado ou JSON), para que dígitos ("0012") cheguem como texto e não como
+        número.
+
+        Args:
+            chunk (str | list): Parte do resultado.
+            binary (bool): Se a requisição chegou no formato binário.
+
+        Returns:
+            tuple[int, bytes]: Flags e payload do frame (nunca vazio: o payload vazio encerra a resposta).
+    """
+    if binary:
+        return protocol.FLAG_STREAM | protocol.FLAG_BINARY, encode(chunk)
+    return protocol.FLAG_STREAM, json.dumps(chunk).encode()
+
+def decode_stream_chunk(flags, payload):
+    """
+        Interpreta o frame de uma parte de uma resposta em partes.
+
+        Returns:
+            str | list: Parte do resultado.
+    """
+    if flags & protocol.FLAG_BINARY:
+        return decode(payload)
+    return json.loads(payload.decode())
+
+def decode_reply(flags, payload):
+    """
+        Interpreta o frame de resposta de um comando.
+
+        Returns:
+            tuple[any, int | None]: Resposta e TTL restante informado pelo servidor.
+    """
+    ttl, body = protocol.unpack_ttl(flags, payload)
+    if flags & protocol.FLAG_BINARY:
+        return decode(body), ttl
+    return decode_text(body.decode()), ttl
+
+def decode_batch_reply(flags, payload):
+    """
+        Interpreta o frame de resposta de um lote.
+
+        Returns:
+            list[tuple[any, int | None]]: Respostas e TTLs, na ordem dos comandos.
+    """
+    if flags & protocol.FLAG_BINARY:
+        return [(value, ttl) for value, ttl in decode(payload)]
+    return [(decode_text(value), ttl) for value, ttl in json.loads(payload.decode())]
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+class SingleFlight:
+    """
+        Deduplicação de chamadas concorrentes idênticas (single-flight).
+
+        A primeira chamada com uma chave executa a função; chamadas com a mesma chave que chegam enquanto ela está em
+        andamento aguardam e recebem o mesmo resultado (ou a mesma exceção). Assim que a execução termina a chave é
+        liberada: chamadas posteriores executam novamente (normalmente encontrando o resultado no cache).
+
+        Attributes:
+            coalesced (int): Número de chamadas atendidas pela execução de outra chamada.
+
+        Note:
+            Thread-safe.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+            Executa function uma única vez entre as chamadas concorrentes com a mesma chave.
+
+            Args:
+                key (hashable): Identificação da computação (ex: o comando canônico).
+                function (callable): Função sem argumentos que realiza a computação.
+
+            Returns:
+                any: Resultado de function.
+
+            Raises:
+                Exception: A exceção lançada por function, repassada a todas as chamadas que a aguardavam.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+
+class AsyncSingleFlight:
+    """
+        Versão para asyncio de SingleFlight: corrotinas concorrentes com a mesma chave aguardam a mesma execução.
+
+        A computação roda em uma task própria, que cada corrotina aguarda protegida por asyncio.shield. Cancelar uma
+        das corrotinas (inclusive a que iniciou a computação) não afeta as demais; a task só é cancelada quando todas
+        as corrotinas que a aguardavam forem canceladas.
+
+        Attributes:
+            coalesced (int): Número de chamadas atendidas pela execução de outra chamada.
+
+        Note:
+            Uma instância deve ser usada sempre no mesmo event loop.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._waiters = {}
+
+    async def do(self, key, function):
+        """
+            Executa function uma única vez entre as corrotinas concorrentes com a mesma chave.
+
+            Args:
+                key (hashable): Identificação da computação.
+                function (callable): Função sem argumentos que retorna o awaitable da computação.
+
+            Returns:
+                any: Resultado da computação.
+
+            Raises:
+                Exception: A exceção lançada pela computação, repassada a todas as corrotinas que a aguardavam.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(function())
+            self._waiters[task] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # A última corrotina a desistir cancela a computação
+            if self._waiters[task] == 1 and not task.done():
+                self._finish(key, task)
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _finish(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Marca a exceção como recuperada caso nenhuma corrotina aguarde mais o resultado
+        if task.done() and not task.cancelled():
+            task.exception()
@@ -1,102 +1,395 @@
 import os
 import sys
 import json
+import time
+import heapq
+import threading
+from config import cache_policies
 
-def load_cache(f):
+class PersistentCache:
     """
-        Carrega cache do arquivo JSON no disco.
-        
-        Args:
-            f (str): Caminho do arquivo de cache.
-        
-        Returns:
-            dict: Dicionário com operações cacheadas ou vazio em caso de erro.
-    """
-    if os.path.exists(f):
-        try:
-            with open(f, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+        Cache persistente em disco baseado em log de escrita sequencial (append-only).
 
+        Cada inserção ou remoção acrescenta apenas uma linha JSON ao final do arquivo, em vez de reescrever o cache inteiro.
+        O tamanho de cada entrada é contabilizado em memória (bytes do seu registro no log), de modo que o limite
+        de tamanho é verificado sem acessar o disco.
 
-def save_cache(f, cache):
-    """
-        Salva cache no arquivo JSON no disco.
-        
-        Args:
-            f (str): Caminho do arquivo de cache.
-            cache (dict): Dicionário com dados a serem salvos.
-    """
-    with open(f, 'w') as f:
-        json.dump(cache, f, indent=4)
+        Quando o cache está cheio, a política de remoção configurada (FIFO, LRU, LFU ou GDSF) escolhe as vítimas,
+        removendo quantas entradas forem necessárias para a nova caber. Acertos, falhas e remoções são contabilizados.
 
+        Quando o arquivo acumula registros obsoletos demais, ele é compactado: as entradas vivas são escritas em um
+        arquivo temporário, sincronizado com fsync e trocado atomicamente com os.replace.
+
+        Entradas podem ter prazo de validade (TTL). Entradas expiradas são removidas na consulta (expiração preguiçosa)
+        e, opcionalmente, por uma thread de varredura periódica (start_sweeper).
+
+        Formato do log (uma linha por registro):
+            {"k": chave, "v": valor}            -> inserção/atualização
+            {"k": chave, "v": valor, "e": ts}   -> inserção com expiração (timestamp Unix)
+            {"k": chave, "d": 1}                -> remoção
+
+        Attributes:
+            path (str): Caminho do arquivo de log.
+            max_size (int): Tamanho máximo das entradas vivas, em bytes.
+            size (int): Tamanho atual das entradas vivas, em bytes.
+            policy (cache_policies.EvictionPolicy): Política de remoção.
+            hits (int): Número de buscas que encontraram a entrada.
+            misses (int): Número de buscas que não encontraram a entrada.
+            evictions (int): Número de entradas removidas para liberar espaço.
+            expirations (int): Número de entradas removidas por expiração.
 
-def enforce_cache_limit(cache: dict, f: str, max_size: int, new_key: str, new_value):
-    """
-        Gerencia limite de tamanho do cache usando política FIFO.
-        
-        Remove entradas antigas se necessário para manter o cache dentro do limite configurado. 
-        Valida se nova entrada cabe antes de adicionar.
-        
-        Args:
-            cache (dict): Cache atual em memória.
-            f (str): Caminho do arquivo de cache.
-            max_size (int): Tamanho máximo do cache em bytes.
-            new_key (str): Chave da nova entrada.
-            new_value (any): Valor da nova entrada.
-        
-        Returns:
-            bool: True se entrada foi adicionada com sucesso, False caso contrário.
-        
         Note:
-            - Valida tamanho da nova entrada individualmente
-            - Remove entrada mais antiga (FIFO) se necessário
-            - Não adiciona se entrada sozinha excede limite
+            Uma linha incompleta no final do arquivo (queda durante uma escrita) é descartada na carga.
+            Todos os métodos são thread-safe.
     """
 
-    # Valida tamanho da nova entrada
-    temp_single = {new_key: new_value}
-    
-    temp_file = 'temp_cache_check.json'
-    with open(temp_file, 'w') as tf:
-        json.dump(temp_single, tf)
-    
-    new_entry_size = os.path.getsize(temp_file)
-    os.remove(temp_file)  
-    
-    if new_entry_size > max_size:
-        print(f'Aviso: A entrada "{new_key}" é muito grande para o cache (tamanho: {new_entry_size} bytes, limite: {max_size} bytes)')
+    def __init__(self, path, max_size, policy='lru', compaction_ratio=2.0, min_compaction_size=64 * 1024):
+        """
+            Abre (ou cria) o cache, reconstruindo o estado a partir do log.
+
+            Args:
+                path (str): Caminho do arquivo de log.
+                max_size (int): Tamanho máximo das entradas vivas, em bytes.
+                policy (str | cache_policies.EvictionPolicy, optional): Política de remoção ('fifo', 'lru', 'lfu' ou 'gdsf').
+                compaction_ratio (float, optional): Compacta quando o log for maior que compaction_ratio * size.
+                min_compaction_size (int, optional): Tamanho mínimo do log para considerar a compactação.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.compaction_ratio = compaction_ratio
+        self.min_compaction_size = min_compaction_size
+        self.size = 0
+        self.policy = cache_policies.create_policy(policy) if isinstance(policy, str) else policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = {}
+        self._sizes = {}
+        self._expires = {}
+        self._expiry_heap = []
+        self._sweeper = None
+        self._log_size = 0
+        self._lock = threading.RLock()
+
+        self._load()
+        self._file = open(self.path, 'ab')
+
+        # O limite pode ter sido reduzido desde a última execução
+        if self.size > self.max_size:
+            self._evict(0)
+
+    def _load(self):
+        """
+            Reconstrói as entradas a partir do log, descartando um registro final incompleto.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        valid_size = 0
+        now = time.time()
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = record['k']
+                except (ValueError, KeyError, TypeError):
+                    break
+                if not line.endswith(b'\n'):
+                    break
+
+                valid_size += len(line)
+                expires_at = record.get('e')
+                if 'd' in record or (expires_at is not None and expires_at <= now):
+                    self._remove(key)
+                else:
+                    self._store(key, record.get('v'), len(line), expires_at=expires_at)
+
+        self._log_size = valid_size
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_size)
+
+    @staticmethod
+    def _encode(key, value, expires_at=None):
+        record = {'k': key, 'v': value}
+        if expires_at is not None:
+            record['e'] = expires_at
+        return (json.dumps(record) + '\n').encode()
+
+    def _store(self, key, value, entry_size, cost=1.0, expires_at=None):
+        self._remove(key)
+        self._entries[key] = value
+        self._sizes[key] = entry_size
+        self.size += entry_size
+        self.policy.on_insert(key, entry_size, cost)
+
+        if expires_at is not None:
+            self._expires[key] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+
+    def _remove(self, key):
+        if key in self._entries:
+            del self._entries[key]
+            self.size -= self._sizes.pop(key)
+            self._expires.pop(key, None)
+            self.policy.on_remove(key)
+            return True
         return False
-    
-    # Tenta adicionar ao cache existente
-    temp_cache = cache.copy()
-    temp_cache[new_key] = new_value
-    
-    save_cache(f, temp_cache)
-    new_size = os.path.getsize(f)
-    
-    if new_size <= max_size:
-        cache[new_key] = new_value
-        return True
-    
-    # Remove entrada mais antiga (FIFO)
-    if cache:  
-        oldest_key = next(iter(cache))
-        temp_cache_reduced = cache.copy()
-        temp_cache_reduced.pop(oldest_key)
-        temp_cache_reduced[new_key] = new_value
-        
-        save_cache(f, temp_cache_reduced)
-        reduced_size = os.path.getsize(f)
-        
-        if reduced_size <= max_size:
-            cache.clear()
-            cache.update(temp_cache_reduced)
-            print(f'Removida entrada antiga "{oldest_key}" para adicionar "{new_key}"')
+
+    def _expired(self, key, now):
+        expires_at = self._expires.get(key)
+        return expires_at is not None and expires_at <= now
+
+    def _evict(self, needed):
+        """
+            Remove entradas escolhidas pela política até haver espaço para needed bytes.
+
+            Returns:
+                int: Número de entradas removidas.
+        """
+        evicted = 0
+        while self._entries and self.size + needed > self.max_size:
+            key = self.policy.victim()
+            if key is None:
+                break
+            self.delete(key)
+            evicted += 1
+
+        self.evictions += evicted
+        return evicted
+
+    def _append(self, data):
+        self._file.write(data)
+        self._file.flush()
+        self._log_size += len(data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, key):
+        """
+            Busca uma entrada no cache.
+
+            Args:
+                key (str): Chave da entrada.
+
+            Returns:
+                tuple[bool, any]: (encontrado, valor).
+        """
+        hit, value, ttl = self.lookup_entry(key)
+        return hit, value
+
+    def lookup_entry(self, key, record_miss=True):
+        """
+            Busca uma entrada no cache, informando também o tempo de validade restante.
+
+            Entradas expiradas são removidas e contadas como falha (miss).
+
+            Args:
+                key (str): Chave da entrada.
+                record_miss (bool, optional): Se uma falha deve ser contabilizada. False em uma nova consulta da mesma
+                    chave, cuja falha já foi contada.
+
+            Returns:
+                tuple[bool, any, float | None]: (encontrado, valor, segundos até expirar ou None se não expira).
+        """
+        with self._lock:
+            now = time.time()
+
+            if key in self._entries and self._expired(key, now):
+                self.delete(key)
+                self.expirations += 1
+
+            if key in self._entries:
+                self.hits += 1
+                self.policy.on_access(key)
+                expires_at = self._expires.get(key)
+                return True, self._entries[key], None if expires_at is None else expires_at - now
+
+            if record_miss:
+                self.misses += 1
+            return False, None, None
+
+    def items(self):
+        """
+            Retorna uma cópia das entradas vivas.
+
+            Returns:
+                list[tuple[str, any]]: Pares (chave, valor).
+        """
+        with self._lock:
+            now = time.time()
+            return [(key, value) for key, value in self._entries.items() if not self._expired(key, now)]
+
+    def set(self, key, value, cost=1.0, ttl=None):
+        """
+            Insere ou atualiza uma entrada, removendo entradas escolhidas pela política se necessário para respeitar o limite.
+
+            Args:
+                key (str): Chave da entrada.
+                value (any): Valor serializável em JSON.
+                cost (float, optional): Custo de recomputar a entrada (considerado pela política GDSF).
+                ttl (float, optional): Tempo de validade em segundos. None para não expirar.
+
+            Returns:
+                bool: True se a entrada foi adicionada, False se sozinha ela excede o limite do cache.
+        """
+        expires_at = None if ttl is None else time.time() + ttl
+        data = self._encode(key, value, expires_at)
+
+        if len(data) > self.max_size:
+            print(f'Aviso: A entrada "{key}" é muito grande para o cache (tamanho: {len(data)} bytes, limite: {self.max_size} bytes)')
+            return False
+
+        with self._lock:
+            self._remove(key)
+            self._evict(len(data))
+            self._append(data)
+            self._store(key, value, len(data), cost, expires_at)
+            self._maybe_compact()
+            return True
+
+    def delete(self, key):
+        """
+            Remove uma entrada do cache (registrando a remoção no log).
+
+            Returns:
+                bool: True se a entrada existia.
+        """
+        with self._lock:
+            if not self._remove(key):
+                return False
+            self._append((json.dumps({'k': key, 'd': 1}) + '\n').encode())
             return True
-    
-    save_cache(f, cache)
-    print(f'Aviso: Não há espaço suficiente para adicionar "{new_key}" ao cache')
-    return False
\ No newline at end of file
+
+    def stats(self):
+        """
+            Retorna as estatísticas de uso do cache.
+
+            Returns:
+                dict: entries, size, max_size, hits, misses, evictions, expirations e hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def purge_expired(self):
+        """
+            Remove todas as entradas já expiradas.
+
+            Returns:
+                int: Número de entradas removidas.
+        """
+        removed = 0
+
+        with self._lock:
+            now = time.time()
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._expiry_heap)
+                # Itens do heap podem estar obsoletos (entrada atualizada ou removida)
+                if self._expires.get(key) == expires_at:
+                    self.delete(key)
+                    removed += 1
+
+            self.expirations += removed
+
+        return removed
+
+    def start_sweeper(self, interval):
+        """
+            Inicia uma thread (daemon) que remove entradas expiradas a cada interval segundos.
+
+            Args:
+                interval (float): Intervalo entre varreduras, em segundos.
+        """
+        if self._sweeper is not None:
+            return
+
+        def sweep():
+            while True:
+                time.sleep(interval)
+                self.purge_expired()
+
+        self._sweeper = threading.Thread(target=sweep, name='cache-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def _maybe_compact(self):
+        if self._log_size > self.min_compaction_size and self._log_size > self.compaction_ratio * self.size:
+            self.compact()
+
+    def compact(self):
+        """
+            Reescreve o log contendo apenas as entradas vivas, de forma atômica.
+
+            O novo conteúdo é gravado em um arquivo temporário, sincronizado com fsync e então substitui o log
+            com os.replace; uma queda durante a compactação mantém o log anterior intacto.
+
+            Entradas expiradas são descartadas. As demais são gravadas na ordem de remoção da política (da próxima
+            vítima à última), de modo que a carga do log as insere na mesma ordem: FIFO e LRU reconstroem exatamente a
+            ordem de remoção. LFU e GDSF não gravam frequências; após a carga, a ordem gravada desempata entradas de
+            mesma prioridade.
+        """
+        with self._lock:
+            temp_path = self.path + '.tmp'
+            log_size = 0
+
+            now = time.time()
+            for key in [k for k in self._entries if self._expired(k, now)]:
+                self._remove(key)
+                self.expirations += 1
+
+            order = self.policy.eviction_order()
+            # Chaves que a política não informou (não deveria haver) são gravadas por último
+            order += [key for key in self._entries.keys() - set(order)]
+
+            with open(temp_path, 'wb') as f:
+                for key in order:
+                    if key not in self._entries:
+                        continue
+                    data = self._encode(key, self._entries[key], self._expires.get(key))
+                    f.write(data)
+                    log_size += len(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'ab')
+            self._log_size = log_size
+
+    def close(self):
+        """
+            Fecha o arquivo de log.
+        """
+        with self._lock:
+            self._file.close()
+
+
+def operation_ttl(ttl_config, command):
+    """
+        Obtém o TTL configurado para a operação de um comando.
+
+        Args:
+            ttl_config (dict): Mapeamento operação -> TTL em segundos (chave cache_ttl de configuracoes.txt).
+            command (str): Comando completo (ex: "news" ou "sum 1 2").
+
+        Returns:
+            float | None: TTL em segundos, ou None se a operação não expira.
+    """
+    parts = command.split(maxsplit=1)
+    return ttl_config.get(parts[0]) if parts else None
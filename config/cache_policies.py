@@ -0,0 +1,228 @@
+import heapq
+import itertools
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+class EvictionPolicy(ABC):
+    """
+        Interface das políticas de remoção (eviction) do cache do servidor.
+
+        O cache notifica a política sobre inserções, acessos e remoções; quando precisa de espaço, pede à política
+        a próxima vítima (victim) e a remove, repetindo até a nova entrada caber.
+
+        Uma política que não implemente todos os métodos abstratos não pode ser instanciada.
+    """
+
+    @abstractmethod
+    def on_insert(self, key, size, cost=1.0):
+        """
+            Registra uma nova entrada.
+
+            Args:
+                key (str): Chave da entrada.
+                size (int): Tamanho da entrada em bytes.
+                cost (float, optional): Custo de recomputar a entrada (usado por políticas sensíveis a custo).
+        """
+
+    @abstractmethod
+    def on_access(self, key):
+        """
+            Registra um acerto (hit) na entrada.
+        """
+
+    @abstractmethod
+    def on_remove(self, key):
+        """
+            Registra a remoção da entrada (por eviction, expiração ou remoção explícita).
+        """
+
+    @abstractmethod
+    def victim(self):
+        """
+            Escolhe a próxima entrada a ser removida.
+
+            Returns:
+                str | None: Chave da entrada, ou None se não houver entradas.
+        """
+
+    @abstractmethod
+    def eviction_order(self):
+        """
+            Chaves na ordem em que seriam removidas (da próxima vítima à última), sem alterar o estado da política.
+
+            Returns:
+                list[str]: Chaves registradas.
+        """
+
+class FIFOPolicy(EvictionPolicy):
+    """
+        Remove a entrada inserida há mais tempo, independentemente dos acessos.
+    """
+
+    def __init__(self):
+        self._order = OrderedDict()
+
+    def on_insert(self, key, size, cost=1.0):
+        self._order.pop(key, None)
+        self._order[key] = None
+
+    def on_access(self, key):
+        pass
+
+    def on_remove(self, key):
+        self._order.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._order), None)
+
+    def eviction_order(self):
+        return list(self._order)
+
+class LRUPolicy(EvictionPolicy):
+    """
+        Remove a entrada acessada há mais tempo (Least Recently Used).
+    """
+
+    def __init__(self):
+        self._order = OrderedDict()
+
+    def on_insert(self, key, size, cost=1.0):
+        self._order.pop(key, None)
+        self._order[key] = None
+
+    def on_access(self, key):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def on_remove(self, key):
+        self._order.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._order), None)
+
+    def eviction_order(self):
+        return list(self._order)
+
+class _HeapPolicy(EvictionPolicy):
+    """
+        Base para políticas por prioridade, usando um heap com invalidação preguiçosa.
+
+        Cada alteração de prioridade empilha um novo item; itens cuja versão não é mais a atual são ignorados
+        quando chegam ao topo.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._current = {}
+        self._counter = itertools.count()
+
+    def _push(self, key, priority):
+        version = next(self._counter)
+        self._current[key] = version
+        heapq.heappush(self._heap, (priority, version, key))
+
+        # Reconstrói o heap quando acumula itens obsoletos demais
+        if len(self._heap) > 4 * len(self._current) + 64:
+            self._heap = [item for item in self._heap if self._current.get(item[2]) == item[1]]
+            heapq.heapify(self._heap)
+
+    def on_remove(self, key):
+        self._current.pop(key, None)
+
+    def _pop_victim(self):
+        while self._heap:
+            priority, version, key = self._heap[0]
+            if self._current.get(key) == version:
+                return priority, key
+            heapq.heappop(self._heap)
+        return None, None
+
+    def victim(self):
+        priority, key = self._pop_victim()
+        return key
+
+    def eviction_order(self):
+        return [key for priority, version, key in sorted(self._heap) if self._current.get(key) == version]
+
+class LFUPolicy(_HeapPolicy):
+    """
+        Remove a entrada com menos acessos (Least Frequently Used); empates favorecem a remoção da mais antiga.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._frequency = {}
+
+    def on_insert(self, key, size, cost=1.0):
+        self._frequency[key] = 1
+        self._push(key, 1)
+
+    def on_access(self, key):
+        if key in self._frequency:
+            self._frequency[key] += 1
+            self._push(key, self._frequency[key])
+
+    def on_remove(self, key):
+        super().on_remove(key)
+        self._frequency.pop(key, None)
+
+class GDSFPolicy(_HeapPolicy):
+    """
+        Greedy-Dual-Size-Frequency: prioridade = L + frequência * custo / tamanho.
+
+        Favorece manter entradas pequenas, populares e caras de recomputar. L (inflação) assume a prioridade
+        da última vítima, de forma que entradas antigas e pouco acessadas envelheçam em relação às novas.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._inflation = 0.0
+        self._meta = {}
+
+    def _priority(self, key):
+        frequency, size, cost = self._meta[key]
+        return self._inflation + frequency * cost / max(size, 1)
+
+    def on_insert(self, key, size, cost=1.0):
+        self._meta[key] = [1, size, cost]
+        self._push(key, self._priority(key))
+
+    def on_access(self, key):
+        if key in self._meta:
+            self._meta[key][0] += 1
+            self._push(key, self._priority(key))
+
+    def on_remove(self, key):
+        super().on_remove(key)
+        self._meta.pop(key, None)
+
+    def victim(self):
+        priority, key = self._pop_victim()
+        if key is not None:
+            self._inflation = priority
+        return key
+
+POLICIES = {
+    'fifo': FIFOPolicy,
+    'lru': LRUPolicy,
+    'lfu': LFUPolicy,
+    'gdsf': GDSFPolicy,
+}
+
+def create_policy(name):
+    """
+        Cria a política de remoção a partir do nome configurado.
+
+        Args:
+            name (str): 'fifo', 'lru', 'lfu' ou 'gdsf'.
+
+        Returns:
+            EvictionPolicy: Instância da política.
+
+        Raises:
+            ValueError: Se a política não for reconhecida.
+    """
+    try:
+        return POLICIES[name.lower()]()
+    except KeyError:
+        raise ValueError(f'Política de cache desconhecida: {name}') from None
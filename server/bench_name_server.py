@@ -0,0 +1,92 @@
+"""
+    Teste de carga do Name Server.
+
+    Inicia o Name Server em uma porta livre com 1 processo e com um processo por núcleo (SO_REUSEPORT) e mede as
+    consultas UDP respondidas por segundo, com vários processos clientes consultando em laço fechado.
+
+    Uso:
+        python -m server.bench_name_server [clientes] [segundos]
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import multiprocessing
+from server import name_server
+
+OPERATIONS = [b'sum', b'prim', b'fat', b'news', b'inexistente']
+
+def free_port():
+    """
+        Porta livre (UDP e TCP) no endereço local.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def client(port, seconds, results):
+    """
+        Envia consultas em laço fechado por seconds segundos e informa quantas foram respondidas e perdidas.
+    """
+    answered = lost = 0
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(0.5)
+        deadline = time.perf_counter() + seconds
+        i = 0
+
+        while time.perf_counter() < deadline:
+            sock.sendto(OPERATIONS[i % len(OPERATIONS)], ('127.0.0.1', port))
+            i += 1
+            try:
+                sock.recvfrom(64 * 1024)
+                answered += 1
+            except socket.timeout:
+                lost += 1
+
+    results.put((answered, lost))
+
+def measure(processes, clients, seconds):
+    """
+        Mede as consultas por segundo de um Name Server com o número de processos informado.
+    """
+    port = free_port()
+    server = multiprocessing.Process(target=name_server.serve, args=('127.0.0.1', port, processes))
+    server.start()
+    time.sleep(1.0)
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=client, args=(port, seconds, results)) for _ in range(clients)]
+    for worker in workers:
+        worker.start()
+
+    totals = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    # SIGINT: o processo principal do Name Server encerra os seus processos de atendimento
+    os.kill(server.pid, signal.SIGINT)
+    server.join()
+
+    answered = sum(a for a, _ in totals)
+    lost = sum(l for _, l in totals)
+    return answered / seconds, lost
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 2 * multiprocessing.cpu_count()
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    configurations = [1]
+    if multiprocessing.cpu_count() > 1 and hasattr(socket, 'SO_REUSEPORT'):
+        configurations.append(multiprocessing.cpu_count())
+
+    print(f'{"Processos":>10} {"Clientes":>9} {"Consultas/s":>13} {"Perdidas":>9}')
+
+    for processes in configurations:
+        rate, lost = measure(processes, clients, seconds)
+        print(f'{processes:>10} {clients:>9} {rate:>13.0f} {lost:>9}')
+
+if __name__ == '__main__':
+    main()
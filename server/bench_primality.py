@@ -0,0 +1,65 @@
+"""
+    Benchmark do teste de primalidade do servidor 2.
+
+    Compara o motor atual (crivo + Miller-Rabin determinístico + BPSW) com a implementação anterior por tentativa
+    de divisão, em faixas de tamanho crescente.
+
+    Uso:
+        python -m server.bench_primality
+"""
+
+import time
+import random
+from server.math_operations import check_primes
+
+# Acima deste valor a tentativa de divisão leva segundos por número e deixa de ser medida
+TRIAL_DIVISION_LIMIT = 10 ** 13
+
+def trial_division(n):
+    """
+        Implementação anterior: tentativa de divisão até a raiz quadrada.
+    """
+    if n < 2:
+        return False
+
+    for i in range(2, int(n**0.5) + 1):
+        if n % i == 0:
+            return False
+    return True
+
+def measure(function, numbers):
+    """
+        Mede o tempo médio, em microssegundos, de function para cada número da lista.
+    """
+    start = time.perf_counter()
+    results = [function(n) for n in numbers]
+    elapsed = time.perf_counter() - start
+    return elapsed / len(numbers) * 1e6, results
+
+def main():
+    random.seed(42)
+    ranges = [
+        ('< 10^6', 10 ** 3, 10 ** 6, 2000),
+        ('~ 10^9', 10 ** 9, 10 ** 9 + 10 ** 6, 500),
+        ('~ 10^12', 10 ** 12, 10 ** 12 + 10 ** 6, 50),
+        ('~ 10^15', 10 ** 15, 10 ** 15 + 10 ** 6, 2000),
+        ('~ 2^64', 2 ** 64 - 10 ** 6, 2 ** 64, 2000),
+        ('~ 10^30', 10 ** 30, 10 ** 30 + 10 ** 6, 2000),
+        ('~ 2^512', 2 ** 512, 2 ** 512 + 10 ** 6, 500),
+    ]
+
+    print(f'{"Faixa":<10} {"Qtd":>6} {"Atual (us)":>12} {"Divisão (us)":>14} {"Ganho":>10}')
+
+    for label, low, high, count in ranges:
+        numbers = [random.randrange(low, high) for _ in range(count)]
+        current, current_results = measure(check_primes, numbers)
+
+        if high <= TRIAL_DIVISION_LIMIT:
+            previous, previous_results = measure(trial_division, numbers)
+            assert current_results == previous_results, f'Resultados divergentes na faixa {label}'
+            print(f'{label:<10} {count:>6} {current:>12.2f} {previous:>14.2f} {previous / current:>9.0f}x')
+        else:
+            print(f'{label:<10} {count:>6} {current:>12.2f} {"-":>14} {"-":>10}')
+
+if __name__ == '__main__':
+    main()
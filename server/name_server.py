@@ -1,13 +1,20 @@
 import os
 import sys
 import json
+import time
 import socket
+import selectors
+import threading
+import multiprocessing
+from collections import deque
 from config import config
-from common.enums import OperationsEnum
+from common import balancing, protocol
+from common.balancing import Replica
+from common.enums import OperationsEnum, RegistryMessageEnum
 
 data_config = config.load_config()
 
-# Mapeamento de servidores e suas operações suportadas
+# Servidores da configuração e suas operações suportadas (os servidores também se registram dinamicamente)
 servers = {
       "server1": {
             "server_ip": data_config['ip_server1'],
@@ -17,7 +24,7 @@ servers = {
       "server2": {
             "server_ip": data_config['ip_server2'],
             "server_port": data_config['port_server2'],
-            "operations": [OperationsEnum.FAT.value, OperationsEnum.PRIM.value]
+            "operations": [OperationsEnum.FAT.value, OperationsEnum.PRIM.value, OperationsEnum.PRIME_RANGE.value, OperationsEnum.PRIME_COUNT.value]
       },
       "server3": {
             "server_ip": data_config['ip_server3'],
@@ -26,62 +33,451 @@ servers = {
       }
 }
 
-def search_operation_server(servers, operation):
+# Réplicas adicionais de cada servidor (mesmas operações, outro endereço)
+for server_name, replicas in data_config.get('server_replicas', {}).items():
+      servers[server_name]['replicas'] = [
+            Replica(replica['ip'], int(replica['port']), max(1, int(replica.get('weight', 1)))) for replica in replicas
+      ]
+
+class ServerRegistry:
     """
-        Busca o servidor responsável por processar uma operação específica.
-        
-        Itera sobre o dicionário de servidores registrados e retorna as informações de conexão do primeiro servidor 
-        que suporta a operação solicitada.
-        
-        Args:
-            servers (dict): Dicionário com configuração dos servidores.
-                Formato: {
-                    "server_name": {
-                        "server_ip": str,
-                        "server_port": int,
-                        "operations": list[str]
-                    }
-                }
-            operation (str): Nome da operação a ser buscada.
-                               
-        Returns:
-            tuple[str, int] | None: Tupla (ip, porta) do servidor responsável.
-                                    Retorna None se a operação não for encontrada em nenhum servidor registrado.
-        
-        Note:
-            Retorna o PRIMEIRO servidor encontrado que suporta a operação.
-            Se múltiplos servidores suportarem a mesma operação, apenas o primeiro será retornado (comportamento de busca linear).
+        Registro das réplicas de servidores de operações, com índice operação -> réplicas.
+
+        As réplicas da configuração são fixas. Servidores que se anunciam (register/heartbeat) entram ou são atualizados
+        no registro e são removidos se ficarem mais de heartbeat_timeout segundos sem heartbeat, ou ao cancelar o registro
+        (deregister); uma réplica da configuração que passa a enviar heartbeats é tratada da mesma forma.
+
+        A busca por operação é O(1): o índice guarda, por operação, um dicionário endereço -> Replica, e a tupla de
+        candidatas de cada operação só é recalculada quando o conjunto de réplicas muda.
+
+        Attributes:
+            heartbeat_timeout (float): Segundos sem heartbeat até a remoção de uma réplica registrada.
     """
-    for server_name, server_data in servers.items():    
-        if operation in server_data['operations']:
-            return server_data['server_ip'], server_data['server_port']
-    return None
+
+    def __init__(self, heartbeat_timeout):
+        self.heartbeat_timeout = heartbeat_timeout
+        self._entries = {}
+        self._index = {}
+        self._candidates = {}
+
+    def add(self, replica, operations, expires_at=None, load=None):
+        """
+            Adiciona ou atualiza uma réplica.
+
+            Args:
+                replica (Replica): Endereço e peso da réplica.
+                operations (list[str]): Operações atendidas.
+                expires_at (float, optional): Instante (relógio monotônico) de expiração; None para réplicas fixas.
+                load (dict, optional): Métricas de carga informadas no heartbeat.
+        """
+        address = (replica.host, replica.port)
+        operations = frozenset(operations)
+        entry = self._entries.get(address)
+
+        if entry is None or entry['replica'] != replica or entry['operations'] != operations:
+            old_operations = entry['operations'] if entry is not None else frozenset()
+            for operation in old_operations - operations:
+                del self._index[operation][address]
+            for operation in operations:
+                self._index.setdefault(operation, {})[address] = replica
+            for operation in old_operations | operations:
+                self._candidates.pop(operation, None)
+
+            if entry is None:
+                print(f'Réplica registrada: {replica.host}:{replica.port} ({", ".join(sorted(operations))})')
+
+        self._entries[address] = {'replica': replica, 'operations': operations, 'expires_at': expires_at, 'load': load}
+
+    def remove(self, address):
+        """
+            Remove uma réplica do registro.
+        """
+        entry = self._entries.pop(address, None)
+        if entry is None:
+            return
+
+        for operation in entry['operations']:
+            del self._index[operation][address]
+            self._candidates.pop(operation, None)
+        print(f'Réplica removida: {address[0]}:{address[1]}')
+
+    def candidates(self, operation):
+        """
+            Busca as réplicas capazes de processar uma operação.
+
+            Returns:
+                tuple[Replica, ...]: Réplicas candidatas, sem ordem de preferência. Vazia se a operação não for suportada.
+        """
+        candidates = self._candidates.get(operation)
+        if candidates is None:
+            candidates = self._candidates[operation] = tuple(self._index.get(operation, {}).values())
+        return candidates
+
+    def load(self, address):
+        """
+            Requisições em andamento informadas no último heartbeat da réplica, ou None se ela não envia heartbeats.
+        """
+        entry = self._entries.get(address)
+        if entry is None or entry['load'] is None:
+            return None
+        return entry['load'].get('in_flight', 0)
+
+    def handle(self, message):
+        """
+            Processa uma mensagem de registro (RegistryMessageEnum) enviada por um servidor de operações.
+
+            Raises:
+                KeyError, TypeError, ValueError: Se a mensagem for inválida.
+        """
+        message_type = RegistryMessageEnum(message['type'])
+        address = (message['ip'], int(message['port']))
+
+        if message_type == RegistryMessageEnum.DEREGISTER:
+            self.remove(address)
+            return
+
+        replica = Replica(address[0], address[1], max(1, int(message.get('capacity', 1))))
+        expires_at = time.monotonic() + self.heartbeat_timeout
+        self.add(replica, message['operations'], expires_at, message.get('load') or {})
+
+    def evict_expired(self):
+        """
+            Remove as réplicas registradas cujo último heartbeat é mais antigo que heartbeat_timeout.
+        """
+        now = time.monotonic()
+        expired = [address for address, entry in self._entries.items()
+                   if entry['expires_at'] is not None and entry['expires_at'] <= now]
+        for address in expired:
+            self.remove(address)
+
+class LeaseTracker:
+    """
+        Conta, por réplica, as resoluções ainda válidas no cache dos clientes em que ela foi a primeira candidata.
+
+        O Name Server não observa as requisições TCP; essa contagem é a estimativa de carga em andamento usada pela
+        estratégia least_outstanding.
+
+        Attributes:
+            ttl (float): Validade, em segundos, de cada resolução entregue.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._leases = {}
+
+    def _expire(self, address, now):
+        leases = self._leases.get(address)
+        while leases and leases[0] <= now:
+            leases.popleft()
+        return leases
+
+    def add(self, address):
+        """
+            Registra uma resolução entregue com a réplica como primeira candidata.
+        """
+        now = time.monotonic()
+        self._expire(address, now)
+        self._leases.setdefault(address, deque()).append(now + self.ttl)
+
+    def count(self, address):
+        """
+            Número de resoluções ainda válidas que apontam primeiro para a réplica.
+        """
+        leases = self._expire(address, time.monotonic())
+        return len(leases) if leases else 0
 
 HOST = data_config['ip_name_server']
 PORT = data_config['port_name_server']
 
-# Loop principal do servidor
-with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as ns_socket:
-    ns_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-    ns_socket.bind((HOST, PORT))
-    print(f"Servidor UDP escutando em {HOST}:{PORT}")
-
-    while True:
-        data, addr = ns_socket.recvfrom(1024 * 1024)
-
-        operation = data.decode().strip()
-        result = search_operation_server(servers, operation)
-
-        if result:
-            server_ip, server_port = result
-            response = {
-                "server_ip": server_ip,
-                "server_port": server_port
-            }
-        else:
-            response = {
-                "error": "Operação não suportada"
-            }
-          
-        ns_socket.sendto(json.dumps(response).encode(), addr)
\ No newline at end of file
+# Tempo (em segundos) que os clientes podem manter uma resolução em cache
+DNS_TTL = data_config.get('dns_ttl', 60)
+DNS_NEGATIVE_TTL = data_config.get('dns_negative_ttl', 10)
+
+BALANCING_STRATEGY = data_config.get('balancing_strategy', balancing.DEFAULT_STRATEGY)
+
+# Servidores registrados são removidos após heartbeat_missed heartbeats perdidos
+HEARTBEAT_TIMEOUT = data_config.get('heartbeat_interval', 5) * data_config.get('heartbeat_missed', 3)
+
+# Respostas UDP maiores que o limite são truncadas e o cliente repete a consulta por TCP (mesma porta)
+UDP_REPLY_LIMIT = data_config.get('name_server_udp_limit', 1232)
+NAME_SERVER_PROCESSES = data_config.get('name_server_processes', 1)
+TCP_IDLE_TIMEOUT = 10
+
+# Limite de respostas serializadas mantidas em cache
+_MAX_CACHED_REPLIES = 4096
+
+class NameServer:
+    """
+        Serviço de resolução de operações (UDP, com fallback TCP na mesma porta).
+
+        As respostas são serializadas uma única vez por lista ordenada de réplicas e reaproveitadas nas consultas
+        seguintes (a ordem varia com a estratégia de balanceamento, mas o conjunto de ordens possíveis é pequeno).
+        Respostas maiores que udp_reply_limit são enviadas por UDP como {"truncated": true} e o cliente repete a consulta
+        por TCP, com o framing de common.protocol.
+
+        Em modo multiprocesso (SO_REUSEPORT), cada processo tem o seu próprio registro; as mensagens de registro recebidas
+        por um processo são repassadas aos demais pelo socket de controle.
+
+        Attributes:
+            host (str): Endereço IP de escuta.
+            port (int): Porta UDP e TCP de escuta.
+            registry (ServerRegistry): Réplicas conhecidas.
+            udp_reply_limit (int): Tamanho máximo, em bytes, de uma resposta UDP.
+    """
+
+    def __init__(self, host=HOST, port=PORT, servers=servers, udp_reply_limit=UDP_REPLY_LIMIT, reuse_port=False,
+                 control=None, peers=()):
+        """
+            Inicializa o serviço (os sockets são abertos em serve_forever).
+
+            Args:
+                host (str, optional): Endereço IP de escuta.
+                port (int, optional): Porta UDP e TCP de escuta.
+                servers (dict, optional): Servidores da configuração, registrados como fixos.
+                udp_reply_limit (int, optional): Tamanho máximo, em bytes, de uma resposta UDP.
+                reuse_port (bool, optional): Se os sockets usam SO_REUSEPORT (vários processos na mesma porta).
+                control (socket.socket, optional): Socket UDP de controle do processo (modo multiprocesso).
+                peers (list[tuple[str, int]], optional): Endereços de controle dos demais processos.
+        """
+        self.host = host
+        self.port = port
+        self.udp_reply_limit = udp_reply_limit
+        self.reuse_port = reuse_port
+        self.control = control
+        self.peers = list(peers)
+
+        self.registry = ServerRegistry(HEARTBEAT_TIMEOUT)
+        for server_data in servers.values():
+            self.registry.add(Replica(server_data['server_ip'], server_data['server_port'], 1), server_data['operations'])
+            for replica in server_data.get('replicas', []):
+                self.registry.add(replica, server_data['operations'])
+
+        self.leases = LeaseTracker(DNS_TTL)
+        self.balancer = balancing.Balancer(BALANCING_STRATEGY, self._replica_load)
+
+        self._replies = {}
+        self._negative_reply = json.dumps({"error": "Operação não suportada", "ttl": DNS_NEGATIVE_TTL}).encode()
+        self._truncated_reply = json.dumps({"truncated": True, "ttl": DNS_TTL}).encode()
+        self._lock = threading.Lock()
+
+    def _replica_load(self, address):
+        """
+            Carga usada pela estratégia least_outstanding: as requisições em andamento informadas no heartbeat ou, para
+            réplicas que não enviam heartbeats, as resoluções entregues ainda válidas.
+        """
+        load = self.registry.load(address)
+        return self.leases.count(address) if load is None else load
+
+    def _reply(self, candidates):
+        """
+            Resposta serializada para uma lista ordenada de réplicas, reaproveitada entre consultas.
+        """
+        key = tuple(candidates)
+        reply = self._replies.get(key)
+
+        if reply is None:
+            if len(self._replies) >= _MAX_CACHED_REPLIES:
+                self._replies.clear()
+            first = candidates[0]
+            reply = self._replies[key] = json.dumps({
+                "server_ip": first.host,
+                "server_port": first.port,
+                "servers": [list(replica) for replica in candidates],
+                "strategy": BALANCING_STRATEGY,
+                "ttl": DNS_TTL
+            }).encode()
+
+        return reply
+
+    def resolve(self, operation, repeated=False):
+        """
+            Resolve uma operação.
+
+            Args:
+                operation (str): Nome da operação (ex: "sum").
+                repeated (bool, optional): Se a consulta repete uma anterior (consulta TCP após resposta UDP truncada).
+                    Nesse caso a última ordem entregue é repetida e a resolução não é contada como um novo lease.
+
+            Returns:
+                bytes: Resposta JSON com as réplicas ordenadas pela estratégia de balanceamento, ou erro se a operação
+                não for suportada.
+        """
+        with self._lock:
+            candidates = self.registry.candidates(operation)
+            if repeated:
+                return self._reply(self.balancer.repeat(candidates)) if candidates else self._negative_reply
+
+            candidates = self.balancer.order(candidates)
+            if not candidates:
+                return self._negative_reply
+
+            first = candidates[0]
+            self.leases.add((first.host, first.port))
+            return self._reply(candidates)
+
+    def register(self, data, relay=True):
+        """
+            Processa uma mensagem de registro (JSON) e, se relay, a repassa aos demais processos.
+        """
+        try:
+            message = json.loads(data.decode())
+            with self._lock:
+                self.registry.handle(message)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f'Mensagem de registro inválida: {e}')
+            return
+
+        if relay and self.control is not None:
+            for peer in self.peers:
+                try:
+                    self.control.sendto(data, peer)
+                except OSError:
+                    pass
+
+    def _serve_tcp_connection(self, sock):
+        """
+            Atende consultas por TCP (uma por frame) até o cliente encerrar a conexão.
+
+            Os clientes só consultam por TCP após uma resposta UDP truncada, que já escolheu a ordem das réplicas e
+            contou o lease; a consulta TCP repete essa resolução sem efeitos sobre o balanceamento.
+        """
+        with sock:
+            sock.settimeout(TCP_IDLE_TIMEOUT)
+            protocol.configure_socket(sock)
+            reader = protocol.FrameReader(sock, max_frame_size=64 * 1024)
+
+            try:
+                while True:
+                    frame = reader.read_frame()
+                    if frame is None:
+                        return
+                    protocol.send_frame(sock, self.resolve(frame[1].decode().strip(), repeated=True))
+            except (OSError, ValueError, protocol.ProtocolError):
+                pass
+
+    def _open_sockets(self):
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+        for sock in (udp_socket, tcp_socket):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.bind((self.host, self.port))
+            sock.setblocking(False)
+
+        tcp_socket.listen()
+        return udp_socket, tcp_socket
+
+    def serve_forever(self):
+        """
+            Atende consultas e mensagens de registro até o processo ser interrompido.
+        """
+        udp_socket, tcp_socket = self._open_sockets()
+        selector = selectors.DefaultSelector()
+        selector.register(udp_socket, selectors.EVENT_READ, 'udp')
+        selector.register(tcp_socket, selectors.EVENT_READ, 'tcp')
+        if self.control is not None:
+            self.control.setblocking(False)
+            selector.register(self.control, selectors.EVENT_READ, 'control')
+
+        print(f"Servidor UDP escutando em {self.host}:{self.port}")
+        last_sweep = time.monotonic()
+
+        with udp_socket, tcp_socket:
+            while True:
+                for key, mask in selector.select(timeout=1.0):
+                    if key.data == 'tcp':
+                        try:
+                            sock, addr = tcp_socket.accept()
+                        except BlockingIOError:
+                            continue
+                        sock.setblocking(True)
+                        threading.Thread(target=self._serve_tcp_connection, args=(sock,), daemon=True).start()
+                        continue
+
+                    # Esvazia o socket antes de voltar ao select
+                    while True:
+                        try:
+                            data, addr = key.fileobj.recvfrom(64 * 1024)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        except OSError:
+                            continue
+
+                        if key.data == 'control':
+                            self.register(data, relay=False)
+                        elif data.startswith(b'{'):
+                            # Mensagens de registro são objetos JSON; consultas são o nome da operação
+                            self.register(data)
+                        else:
+                            reply = self.resolve(data.decode(errors='replace').strip())
+                            if len(reply) > self.udp_reply_limit:
+                                reply = self._truncated_reply
+                            try:
+                                udp_socket.sendto(reply, addr)
+                            except OSError:
+                                pass
+
+                # Remove, no máximo uma vez por segundo, servidores que pararam de enviar heartbeats
+                now = time.monotonic()
+                if now - last_sweep >= 1.0:
+                    last_sweep = now
+                    with self._lock:
+                        self.registry.evict_expired()
+
+def _run_process(host, port, control, peers):
+    """
+        Ponto de entrada de cada processo do Name Server em modo multiprocesso.
+    """
+    try:
+        NameServer(host, port, reuse_port=True, control=control, peers=peers).serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+def serve(host=HOST, port=PORT, processes=NAME_SERVER_PROCESSES):
+    """
+        Inicia o Name Server.
+
+        Com processes > 1, inicia um processo por núcleo solicitado, todos escutando na mesma porta com SO_REUSEPORT; o
+        kernel distribui as consultas entre eles. Sem suporte a SO_REUSEPORT, executa em um único processo.
+
+        Args:
+            host (str, optional): Endereço IP de escuta.
+            port (int, optional): Porta UDP e TCP de escuta.
+            processes (int, optional): Número de processos.
+    """
+    if processes > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print('SO_REUSEPORT não suportado nesta plataforma: executando em um único processo.')
+        processes = 1
+
+    if processes <= 1:
+        try:
+            NameServer(host, port).serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    controls = []
+    for _ in range(processes):
+        control = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        control.bind(('127.0.0.1', 0))
+        controls.append(control)
+    addresses = [control.getsockname() for control in controls]
+
+    workers = [
+        multiprocessing.Process(target=_run_process, args=(host, port, control, addresses[:i] + addresses[i + 1:]), daemon=True)
+        for i, control in enumerate(controls)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+if __name__ == '__main__':
+    serve()
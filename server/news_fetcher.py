@@ -0,0 +1,169 @@
+import time
+import threading
+import importlib.util
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+DEFAULT_NEWS_URL = 'https://www.uol.com.br'
+DEFAULT_REFRESH_INTERVAL = 300
+DEFAULT_TIMEOUT = 5
+MAX_HEADLINES = 5
+
+# lxml é opcional: quando instalado, é bem mais rápido que o parser da biblioteca padrão
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Apenas as tags <h3> são montadas na árvore; o resto da página é descartado durante o parsing
+_HEADLINE_TAGS = SoupStrainer('h3')
+
+def parse_headlines(html, limit=MAX_HEADLINES):
+    """
+        Extrai as manchetes (textos das tags <h3>) de uma página HTML.
+
+        Args:
+            html (bytes | str): Conteúdo da página.
+            limit (int, optional): Número máximo de manchetes.
+
+        Returns:
+            list[str]: Manchetes não vazias, na ordem da página.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_HEADLINE_TAGS)
+
+    headlines = []
+    for tag in soup.find_all('h3'):
+        text = tag.get_text(strip=True)
+        if text:
+            headlines.append(text)
+            if len(headlines) == limit:
+                break
+
+    return headlines
+
+class NewsFetcher:
+    """
+        Manchetes de um site de notícias, atualizadas em segundo plano.
+
+        Uma thread (daemon) baixa a página a cada refresh_interval segundos por uma sessão HTTP persistente (conexão
+        reaproveitada) e com timeout. As requisições são condicionais (If-None-Match / If-Modified-Since): se a página não
+        mudou, o servidor responde 304 sem corpo e as manchetes atuais são mantidas. Quem consulta as manchetes recebe
+        sempre a última versão obtida, sem esperar pelo site; só a primeira consulta, antes da primeira atualização,
+        aguarda (no máximo timeout segundos). Se uma atualização falhar, as manchetes anteriores continuam valendo.
+
+        Attributes:
+            url (str): Endereço da página de notícias.
+            refresh_interval (float): Intervalo, em segundos, entre atualizações.
+            timeout (float): Timeout, em segundos, de conexão e de leitura das requisições HTTP.
+            session (requests.Session): Sessão HTTP persistente.
+            updated_at (float | None): Instante (relógio monotônico) da última atualização bem-sucedida.
+    """
+
+    def __init__(self, url=DEFAULT_NEWS_URL, refresh_interval=DEFAULT_REFRESH_INTERVAL, timeout=DEFAULT_TIMEOUT, session=None):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.session = session or self._new_session()
+        self.updated_at = None
+        self._headlines = None
+        self._error = None
+        self._etag = None
+        self._last_modified = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _new_session():
+        session = requests.Session()
+        # Uma única conexão por host basta: só a thread de atualização usa a sessão
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=1)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = 'tsi-rpc-news/1.0'
+        return session
+
+    def refresh(self):
+        """
+            Baixa a página (requisição condicional) e atualiza as manchetes.
+
+            Returns:
+                bool: True se a página foi obtida (ou não mudou desde a última vez); False em caso de erro.
+        """
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+
+        try:
+            response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+            not_modified = response.status_code == 304 and self._headlines is not None
+
+            if not not_modified:
+                response.raise_for_status()
+                headlines = parse_headlines(response.content) or ['Nenhuma notícia encontrada!']
+        except Exception as e:
+            print(f'Erro ao obter as notícias: {e}')
+            with self._lock:
+                self._error = e
+            self._ready.set()
+            return False
+
+        with self._lock:
+            if not not_modified:
+                self._headlines = headlines
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+            self._error = None
+            self.updated_at = time.monotonic()
+
+        self._ready.set()
+        return True
+
+    def headlines(self):
+        """
+            Últimas manchetes obtidas, sem acessar o site.
+
+            Returns:
+                list[str]: Lista com até MAX_HEADLINES manchetes.
+                    Retorna ['Nenhuma notícia encontrada!'] se a página não tiver manchetes.
+                    Se nenhuma atualização teve sucesso, retorna [f'Erro ao obter as notícias: {e}'].
+        """
+        if not self._ready.is_set():
+            self._ready.wait(self.timeout)
+
+        with self._lock:
+            if self._headlines is not None:
+                return list(self._headlines)
+            error = self._error or 'tempo esgotado'
+
+        return [f'Erro ao obter as notícias: {error}']
+
+    def ttl(self):
+        """
+            Segundos até a próxima atualização (validade das manchetes atuais para o cache do cliente).
+
+            Returns:
+                float | None: TTL em segundos, ou None se as manchetes ainda não foram obtidas.
+        """
+        with self._lock:
+            if self.updated_at is None:
+                return None
+            return max(0.0, self.updated_at + self.refresh_interval - time.monotonic())
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self):
+        """
+            Inicia a thread (daemon) de atualização; a primeira atualização é feita imediatamente.
+        """
+        threading.Thread(target=self._run, name='news-refresh', daemon=True).start()
+
+    def stop(self):
+        """
+            Interrompe as atualizações e fecha a sessão HTTP.
+        """
+        self._stop.set()
+        self.session.close()
@@ -0,0 +1,79 @@
+import json
+import atexit
+import socket
+import threading
+from common.enums import RegistryMessageEnum
+
+DEFAULT_HEARTBEAT_INTERVAL = 5
+
+class Registration:
+    """
+        Registro de um servidor de operações no Name Server, mantido por heartbeats periódicos (UDP).
+
+        Cada heartbeat leva o registro completo (endereço, operações e capacidade) junto com as métricas de carga, de modo
+        que um Name Server reiniciado reaprende os servidores ativos no heartbeat seguinte. As mensagens não têm resposta:
+        a perda de uma delas é coberta pelas próximas. Ao encerrar, o servidor cancela o registro.
+
+        Attributes:
+            name (str): Nome do servidor (ex: "server2").
+            host (str): Endereço IP anunciado.
+            port (int): Porta TCP anunciada.
+            operations (list[str]): Operações atendidas.
+            capacity (int): Requisições que o servidor processa simultaneamente (peso no balanceamento).
+            name_server (tuple[str, int]): Endereço UDP do Name Server.
+            interval (float): Intervalo, em segundos, entre heartbeats.
+            load (callable): Função sem argumentos que retorna as métricas de carga (dict).
+    """
+
+    def __init__(self, name, host, port, operations, capacity, name_server, interval=DEFAULT_HEARTBEAT_INTERVAL, load=None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.operations = list(operations)
+        self.capacity = capacity
+        self.name_server = name_server
+        self.interval = interval
+        self.load = load or dict
+        self._stop = threading.Event()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, message_type):
+        message = {
+            'type': message_type.value,
+            'server': self.name,
+            'ip': self.host,
+            'port': self.port
+        }
+
+        if message_type != RegistryMessageEnum.DEREGISTER:
+            message['operations'] = self.operations
+            message['capacity'] = self.capacity
+            message['load'] = self.load()
+
+        try:
+            self._socket.sendto(json.dumps(message).encode(), self.name_server)
+        except OSError as e:
+            print(f'Erro ao enviar {message_type.value} ao Name Server: {e}')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._send(RegistryMessageEnum.HEARTBEAT)
+
+    def start(self):
+        """
+            Anuncia o servidor e inicia a thread (daemon) de heartbeats.
+        """
+        self._send(RegistryMessageEnum.REGISTER)
+        threading.Thread(target=self._run, name='heartbeat', daemon=True).start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+            Interrompe os heartbeats e cancela o registro no Name Server.
+        """
+        if self._stop.is_set():
+            return
+
+        self._stop.set()
+        self._send(RegistryMessageEnum.DEREGISTER)
+        self._socket.close()
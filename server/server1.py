@@ -1,40 +1,73 @@
 import os
-import json
-import socket
 from config import config, cache_config
+from server import server_core
+from common.enums import OperationsEnum
+from common.singleflight import SingleFlight
+from common.commands import canonical_command
 from server.math_operations import basic_operations
 
 SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
-CACHE_FILE = os.path.join(SERVER_DIR, 'cache_operations.json')
 
 # Inicialização do servidor
-operations_cache = cache_config.load_cache(CACHE_FILE)
 data_config = config.load_config()
 
 HOST = data_config['ip_server1']
-PORT = data_config['port_server1']
+PORT = server_core.replica_port(data_config['port_server1'])
+CACHE_FILE = server_core.cache_file(SERVER_DIR, 'cache_server1', PORT, data_config['port_server1'])
 MAX_CACHE_SIZE = data_config['max_cache_size']
 
-# Loop principal do servidor
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-    server_socket.bind((HOST, PORT))
-    server_socket.listen()
-
-    while True:
-        conn, addr = server_socket.accept()
-        with conn:
-            data = conn.recv(1024 * 1024).decode().strip()
-
-            if not data:
-                continue
-
-            if data in operations_cache:
-                print('Pegando valor do cache (servidor JSON).')
-                response = operations_cache[data]
-            else:
-                response = basic_operations(data)
-                cache_config.enforce_cache_limit(operations_cache, CACHE_FILE, MAX_CACHE_SIZE, data, response)
-                
-            conn.send(str(response).encode())
\ No newline at end of file
+# Operações anunciadas ao Name Server no registro
+OPERATIONS = [OperationsEnum.SUM.value, OperationsEnum.SUB.value, OperationsEnum.PROD.value, OperationsEnum.DIV.value]
+
+CACHE_TTL = data_config.get('cache_ttl', {})
+
+operations_cache = cache_config.PersistentCache(CACHE_FILE, MAX_CACHE_SIZE, data_config.get('cache_policy', 'lru'))
+
+# Requisições idênticas simultâneas aguardam uma única computação
+in_flight = SingleFlight()
+
+def _compute(key):
+    """
+        Calcula um comando canônico e armazena o resultado no cache.
+
+        O cache é consultado novamente: o resultado pode ter sido armazenado por uma computação anterior que terminou
+        entre a consulta de handle_request e o início desta.
+    """
+    reply = server_core.cached_reply(operations_cache, key, record_miss=False)
+    if reply is not None:
+        return reply
+
+    response = basic_operations(key)
+
+    ttl = cache_config.operation_ttl(CACHE_TTL, key)
+    operations_cache.set(key, response, ttl=ttl)
+
+    return server_core.Reply(response, ttl)
+
+def handle_request(data):
+    """
+        Processa um comando de operação básica, consultando o cache do servidor.
+
+        O cache é indexado pelo comando canônico (canonical_command), de modo que comandos equivalentes
+        (ex: "sum 1 2" e "sum 2 1.0") compartilham a mesma entrada. Comandos inválidos não são cacheados.
+        Requisições simultâneas do mesmo comando canônico compartilham uma única computação (single-flight).
+
+        Args:
+            data (str): Comando recebido (ex: "sum 5 2").
+
+        Returns:
+            server_core.Reply: Resposta para envio ao cliente (serializada pelo server_core) e seu TTL restante no cache.
+    """
+    key = canonical_command(data)
+    if key is None:
+        return server_core.Reply(basic_operations(data), None)
+
+    reply = server_core.cached_reply(operations_cache, key)
+    if reply is not None:
+        return reply
+
+    return in_flight.do(key, lambda: _compute(key))
+
+if __name__ == '__main__':
+    operations_cache.start_sweeper(data_config.get('cache_sweep_interval', 60))
+    server_core.serve(HOST, PORT, handle_request, data_config, 'server1', OPERATIONS)
@@ -1,40 +1,156 @@
 import os
-import json
-import socket
 from config import config, cache_config
-from server.math_operations import number_theory
+from server import server_core
+from common.enums import OperationsEnum
+from common.singleflight import SingleFlight
+from common.commands import canonical_command
+from server.math_operations import number_theory, number_theory_stream, start_prime_pool, check_primes, SIEVE_LIMIT
 
 SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
-CACHE_FILE = os.path.join(SERVER_DIR, 'cache_operations.json')
 
 # Inicialização do servidor
-operations_cache = cache_config.load_cache(CACHE_FILE)
 data_config = config.load_config()
 
 HOST = data_config['ip_server2']
-PORT = data_config['port_server2']
+PORT = server_core.replica_port(data_config['port_server2'])
+CACHE_FILE = server_core.cache_file(SERVER_DIR, 'cache_server2', PORT, data_config['port_server2'])
 MAX_CACHE_SIZE = data_config['max_cache_size']
 
-# Loop principal do servidor
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-    server_socket.bind((HOST, PORT))
-    server_socket.listen()
-
-    while True:
-        conn, addr = server_socket.accept()
-        with conn:
-            data = conn.recv(1024 * 1024).decode().strip()
-
-            if not data:
-                continue
-
-            if data in operations_cache:
-                print('Pegando valor do cache (servidor JSON).')
-                response = operations_cache[data]
-            else:
-                response = number_theory(data)
-                cache_config.enforce_cache_limit(operations_cache, CACHE_FILE, MAX_CACHE_SIZE, data, response)
-                
-            conn.send(str(response).encode())
\ No newline at end of file
+# Operações anunciadas ao Name Server no registro
+OPERATIONS = [OperationsEnum.FAT.value, OperationsEnum.PRIM.value, OperationsEnum.PRIME_RANGE.value, OperationsEnum.PRIME_COUNT.value]
+
+CACHE_TTL = data_config.get('cache_ttl', {})
+
+operations_cache = cache_config.PersistentCache(CACHE_FILE, MAX_CACHE_SIZE, data_config.get('cache_policy', 'lru'))
+
+# Requisições idênticas simultâneas aguardam uma única computação
+in_flight = SingleFlight()
+
+# Prefixo das entradas de primalidade por número; não é um comando válido, então não colide com chaves canônicas
+PRIME_KEY_PREFIX = '#prim'
+
+# Listas de prim com mais números que isso são cacheadas como um todo (uma entrada), e não número a número
+PRIME_CACHE_MAX_NUMBERS = 64
+
+def _check_primes(numbers):
+    """
+        Verifica a primalidade de uma lista curta de números, reutilizando resultados cacheados por número.
+
+        Apenas os números ainda não presentes no cache são calculados (em uma única chamada a number_theory),
+        de modo que listas sobrepostas (ex: "prim 10000019 10000079" e "prim 10000079 10000103") reaproveitam o
+        trabalho anterior. Números abaixo de SIEVE_LIMIT são consultas diretas ao crivo pré-calculado e não passam pelo
+        cache, para não ocuparem (nem removerem) entradas que valem a pena.
+
+        Args:
+            numbers (list[int]): Números a serem verificados.
+
+        Returns:
+            tuple[list[bool] | str, float | None]: Resultados na ordem recebida (ou mensagem de erro) e o menor TTL
+            restante entre os resultados usados.
+    """
+    results = {}
+    ttls = []
+    missing = []
+
+    for n in dict.fromkeys(numbers):
+        if n < SIEVE_LIMIT:
+            results[n] = check_primes(n)
+            continue
+
+        hit, value, ttl = operations_cache.lookup_entry(f'{PRIME_KEY_PREFIX} {n}')
+        if hit:
+            results[n] = value
+            ttls.append(ttl)
+        else:
+            missing.append(n)
+
+    if missing:
+        computed = number_theory(' '.join([OperationsEnum.PRIM.value] + [str(n) for n in missing]))
+        if isinstance(computed, str):
+            return computed, None
+
+        ttl = cache_config.operation_ttl(CACHE_TTL, OperationsEnum.PRIM.value)
+        for n, value in zip(missing, computed):
+            results[n] = value
+            operations_cache.set(f'{PRIME_KEY_PREFIX} {n}', value, ttl=ttl)
+        ttls.append(ttl)
+    elif results:
+        print('Pegando valor do cache (servidor).')
+
+    ttls = [t for t in ttls if t is not None]
+    return [results[n] for n in numbers], min(ttls) if ttls else None
+
+def _compute(key):
+    """
+        Calcula um comando canônico (exceto listas curtas de prim) e armazena o resultado no cache.
+
+        O cache é consultado novamente: o resultado pode ter sido armazenado por uma computação anterior que terminou
+        entre a consulta de handle_request e o início desta.
+    """
+    reply = server_core.cached_reply(operations_cache, key, record_miss=False)
+    if reply is not None:
+        return reply
+
+    response = number_theory(key)
+
+    ttl = cache_config.operation_ttl(CACHE_TTL, key)
+    operations_cache.set(key, response, ttl=ttl)
+
+    return server_core.Reply(response, ttl)
+
+def handle_request(data):
+    """
+        Processa um comando de teoria dos números, consultando o cache do servidor.
+
+        O cache é indexado pelo comando canônico (canonical_command); para listas curtas de prim (até
+        PRIME_CACHE_MAX_NUMBERS números), os resultados são cacheados por número, e listas maiores ocupam uma única
+        entrada, de modo que uma requisição não esvazie o cache. Comandos inválidos não são cacheados. Requisições simultâneas do mesmo comando canônico (ex: vários clientes
+        pedindo "fat 300000" após o cache ser esvaziado) compartilham uma única computação (single-flight).
+
+        Args:
+            data (str): Comando recebido (ex: "fat 5").
+
+        Returns:
+            server_core.Reply: Resposta para envio ao cliente (serializada pelo server_core) e seu TTL restante no cache.
+    """
+    key = canonical_command(data)
+    if key is None:
+        return server_core.Reply(number_theory(data), None)
+
+    cmd, *args = key.split()
+    if cmd == OperationsEnum.PRIM.value and len(args) <= PRIME_CACHE_MAX_NUMBERS:
+        return in_flight.do(key, lambda: server_core.Reply(*_check_primes([int(n) for n in args])))
+
+    reply = server_core.cached_reply(operations_cache, key)
+    if reply is not None:
+        return reply
+
+    return in_flight.do(key, lambda: _compute(key))
+
+def handle_stream(data):
+    """
+        Processa um comando pedido em partes: "fat n" (dígitos de n!) e "primes a b" (primos do intervalo) são gerados
+        aos poucos, sem montar o resultado completo (ver math_operations.number_theory_stream).
+
+        Respostas em partes não passam pelo cache do servidor: são justamente as grandes demais para ele. Os demais
+        comandos (e argumentos inválidos) são respondidos por handle_request.
+
+        Args:
+            data (str): Comando recebido (ex: "fat 1000000").
+
+        Returns:
+            Iterator[str | list[int]]: Partes do resultado.
+            server_core.Reply: Resposta completa, para comandos que não são gerados em partes.
+    """
+    key = canonical_command(data)
+    chunks = number_theory_stream(key) if key is not None else None
+
+    if chunks is None:
+        return handle_request(data)
+    return chunks
+
+if __name__ == '__main__':
+    # O pool é criado (fork) antes de qualquer thread, incluindo a de varredura do cache
+    start_prime_pool(data_config.get('prime_workers'))
+    operations_cache.start_sweeper(data_config.get('cache_sweep_interval', 60))
+    server_core.serve(HOST, PORT, handle_request, data_config, 'server2', OPERATIONS, handle_stream)
@@ -1,20 +1,18 @@
 import os
-import json
-import socket
-import requests
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-import google.generativeai as genai
 from config import config, cache_config
+from server import server_core, solver
+from server.news_fetcher import NewsFetcher, DEFAULT_NEWS_URL, DEFAULT_REFRESH_INTERVAL, DEFAULT_TIMEOUT
+from common.singleflight import SingleFlight
+from common.enums import OperationsEnum
 
 SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
-CACHE_FILE = os.path.join(SERVER_DIR, 'cache_operations.json')
 
 def get_news():
     """
         Obtém manchetes de notícias do site UOL via web scraping.
         
-        Faz requisição HTTP ao UOL, parseia HTML e extrai as principais manchetes das tags <h3>.
+        As manchetes (tags <h3>) são mantidas pelo news_fetcher, que atualiza a página em segundo plano a cada
+        news_refresh_interval segundos; esta função apenas lê a última versão obtida, sem acessar o site.
         
         Returns:
             list[str]: Lista com até 5 manchetes de notícias.
@@ -23,26 +21,17 @@ def get_news():
 
         Note:
             Requer conexão com a internet.
-            Retorna lista vazia com mensagem se nenhuma notícia encontrada.
+            Se uma atualização falhar, as manchetes anteriores continuam sendo retornadas.
             A estrutura HTML do site pode mudar, afetando o scraping.
     """
-    try:
-        response = requests.get('https://www.uol.com.br')
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        headlines = [a.get_text(strip=True) for a in soup.find_all('h3') if a.get_text(strip=True)]
-        
-        return headlines[:5] or ['Nenhuma notícia encontrada!']
-    except Exception as e:
-        return [f'Erro ao obter as notícias: {e}'] 
+    return news_fetcher.headlines()
 
 def math_problem_solver(problem: str) -> str:
     """
         Resolve problemas matemáticos descritos em linguagem natural usando IA.
         
-        Utiliza a API do Google Gemini para interpretar e resolver problemas matemáticos expressos em texto livre.
-        Solicita uma resposta em formato JSON, realiza o tratamento de strings para remover formatação Markdown e extrai o resultado númerico.
+        Encaminha o problema ao solver (server.solver.SolverService), que mantém o modelo (Google Gemini, ou o modelo
+        local de testes) configurado uma única vez e agrupa problemas recebidos ao mesmo tempo em uma única chamada.
         
         Args:
             problem (str): Descrição textual do problema matemático.
@@ -51,111 +40,97 @@ def math_problem_solver(problem: str) -> str:
             str: Resultado numérico com até 3 casas decimais convertido para string.
             str: "Erro: entrada inválida ou não matemática" se a IA identificar que o input não é um problema tratável ou
                  se o resultado for impraticável.
-            None: Em caso de falhas técnicas.
+            None: Em caso de falhas técnicas ou se o tempo máximo (solver_timeout) for excedido.
 
         Note:
-            Requer variável de ambiente GOOGLE_API_KEY configurada.
+            Com solver_backend "gemini", requer variável de ambiente GOOGLE_API_KEY configurada.
     """
     if not problem or not problem.strip():
         return "Erro: problema matemático não informado"
 
-    problem = problem.strip()
-
-    load_dotenv()
-    API_KEY = os.getenv("GOOGLE_API_KEY")
-
-    prompt = f"""
-        Você é um serviço de resolução de problemas matemáticos.
-
-        TAREFA:
-        1. Responde APENAS em JSON.
-        2. Analise se o texto abaixo descreve um problema matemático válido.
-        3. Se a operação estiver incompleta ou ambígua, retorne exatamente um JSON: {{"erro": true}}
-        4. Se NÃO for um problema matemático, retorne exatamente um JSON: {{"erro": true}}
-        5. Se o resultado for muito grande ou impraticável, retorne exatamente um JSON: {{"erro": true}}
-        6. Se for válido, explique o raciocínio passo a passo. 
-        7. Se o resultado for decimal, arredonde para no máximo 3 casas decimais.
-
-        FORMATO DE RESPOSTA (JSON VÁLIDO):
-        {{
-            "erro": false,
-            "raciocínio": [
-                "passo 1 ...",
-                "passo 2 ...",
-                "passo 3 ..."
-            ],
-            "resultado": <numero>
-        }}
-
-        TEXTO:
-        {problem}
-    """
+    return solver_service.solve(problem.strip())
 
-    try:
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash')
+# Inicialização do servidor
+data_config = config.load_config()
 
-        response = model.generate_content(prompt)
+HOST = data_config['ip_server3']
+PORT = server_core.replica_port(data_config['port_server3'])
+CACHE_FILE = server_core.cache_file(SERVER_DIR, 'cache_server3', PORT, data_config['port_server3'])
+MAX_CACHE_SIZE = data_config['max_cache_size']
 
-        # Limpa o texto para garantir um JSON puro
-        content = response.text.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        
-        content = content.strip("`").strip()
+# Operações anunciadas ao Name Server no registro
+OPERATIONS = [OperationsEnum.SOLVER.value, OperationsEnum.NEWS.value]
 
-        data = json.loads(content)
+CACHE_TTL = data_config.get('cache_ttl', {})
 
-        if data.get('erro'):
-            return "Erro: entrada inválida ou não matemática"
+operations_cache = cache_config.PersistentCache(CACHE_FILE, MAX_CACHE_SIZE, data_config.get('cache_policy', 'lru'))
 
-        return str(data.get('resultado'))
-    except Exception as e:
-        print(f"Erro: {e}")
-        return None
+# Manchetes atualizadas em segundo plano (iniciado em __main__); requisições "news" nunca esperam pelo site
+news_fetcher = NewsFetcher(
+    data_config.get('news_url', DEFAULT_NEWS_URL),
+    data_config.get('news_refresh_interval', DEFAULT_REFRESH_INTERVAL),
+    data_config.get('news_timeout', DEFAULT_TIMEOUT)
+)
 
-# Inicialização do servidor
-operations_cache = cache_config.load_cache(CACHE_FILE)
-data_config = config.load_config()
+# Modelo do solver inicializado uma única vez; o agrupamento de problemas simultâneos é opcional (solver_batch_size)
+solver_service = solver.SolverService(
+    solver.create_backend(
+        data_config.get('solver_backend', solver.DEFAULT_BACKEND),
+        data_config.get('solver_model', solver.DEFAULT_MODEL)
+    ),
+    data_config.get('solver_workers', solver.DEFAULT_WORKERS),
+    data_config.get('solver_batch_size', solver.DEFAULT_BATCH_SIZE),
+    data_config.get('solver_batch_wait', solver.DEFAULT_BATCH_WAIT),
+    data_config.get('solver_timeout', solver.DEFAULT_TIMEOUT)
+)
 
-HOST = data_config['ip_server3']
-PORT = data_config['port_server3']
-MAX_CACHE_SIZE = data_config['max_cache_size']
+# Requisições idênticas simultâneas aguardam uma única chamada ao solver
+in_flight = SingleFlight()
+
+def _compute(key, function):
+    """
+        Executa function e armazena o resultado no cache com a chave informada.
+
+        Falhas técnicas (None, ex: tempo máximo do solver excedido) não são cacheadas. O cache é consultado novamente:
+        o resultado pode ter sido armazenado por uma chamada anterior que terminou após a consulta de handle_request.
+    """
+    reply = server_core.cached_reply(operations_cache, key, record_miss=False)
+    if reply is not None:
+        return reply
 
-# Loop principal do servidor
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    response = function()
+    if response is None:
+        return server_core.Reply(None, None)
 
-    server_socket.bind((HOST, PORT))
-    server_socket.listen()
+    ttl = cache_config.operation_ttl(CACHE_TTL, key)
+    operations_cache.set(key, response, ttl=ttl)
 
-    while True:
-        conn, addr = server_socket.accept()
-        with conn:
-            data = conn.recv(1024 * 1024).decode().strip()
+    return server_core.Reply(response, ttl)
 
-            if not data:
-                continue
+def handle_request(data):
+    """
+        Processa um comando do servidor 3 (notícias ou solver de IA).
+
+        Notícias são respondidas com as últimas manchetes do news_fetcher, com TTL até a próxima atualização. O solver
+        consulta o cache do servidor, e requisições simultâneas do mesmo problema compartilham uma única chamada à API
+        (single-flight).
 
-            if data.strip() == 'news':
-                if 'news' in operations_cache:
-                    response = operations_cache['news']
-                else:
-                    response = get_news()
-                    cache_config.enforce_cache_limit(operations_cache, CACHE_FILE, MAX_CACHE_SIZE, 'news', response)
+        Args:
+            data (str): Comando recebido ("news" ou a descrição do problema).
 
-                conn.send(json.dumps(response).encode())
-                continue
-            
-            if data in operations_cache:
-                print('Pegando valor do cache (servidor JSON).')
-                response = operations_cache[data]
-            else:
-                response = math_problem_solver(data)
-                cache_config.enforce_cache_limit(operations_cache, CACHE_FILE, MAX_CACHE_SIZE, data, response)
+        Returns:
+            server_core.Reply: Resposta para envio ao cliente (serializada pelo server_core) e seu TTL restante no cache.
+    """
+    if data.strip() == 'news':
+        return server_core.Reply(get_news(), news_fetcher.ttl())
 
-            conn.send(str(response).encode())
+    reply = server_core.cached_reply(operations_cache, data)
+    if reply is not None:
+        return reply
 
+    return in_flight.do(data, lambda: _compute(data, lambda: math_problem_solver(data)))
 
+if __name__ == '__main__':
+    operations_cache.start_sweeper(data_config.get('cache_sweep_interval', 60))
+    news_fetcher.start()
+    server_core.serve(HOST, PORT, handle_request, data_config, 'server3', OPERATIONS)
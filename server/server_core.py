@@ -0,0 +1,477 @@
+import os
+import sys
+import time
+import queue
+import socket
+import asyncio
+import selectors
+import threading
+from collections import deque, namedtuple
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from common import protocol, serialization
+from server.registration import Registration, DEFAULT_HEARTBEAT_INTERVAL
+
+DEFAULT_SERVER_MODE = 'threads'
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_IN_FLIGHT = 32
+DEFAULT_IDLE_TIMEOUT = 60
+
+# Resposta de um handler acompanhada do tempo de validade (segundos) do resultado; ttl None indica que não expira
+Reply = namedtuple('Reply', ['value', 'ttl'])
+
+def _unwrap(result):
+    """
+        Separa a resposta de um handler em (valor, ttl).
+    """
+    if isinstance(result, Reply):
+        return result.value, result.ttl
+    return result, None
+
+class LoadStats:
+    """
+        Contadores de carga do servidor, enviados ao Name Server nos heartbeats.
+
+        Attributes:
+            in_flight (int): Comandos em processamento no momento.
+            requests (int): Comandos processados desde o início do servidor.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def begin(self, count=1):
+        with self._lock:
+            self.in_flight += count
+
+    def end(self, count=1):
+        with self._lock:
+            self.in_flight -= count
+            self.requests += count
+
+    def snapshot(self):
+        """
+            Returns:
+                dict: Métricas de carga atuais ({"in_flight": int, "requests": int}).
+        """
+        with self._lock:
+            return {'in_flight': self.in_flight, 'requests': self.requests}
+
+load_stats = LoadStats()
+
+def _dispatch(flags, payload, handler):
+    """
+        Processa um frame de requisição e monta o frame de resposta.
+
+        Frames FLAG_HELLO negociam o formato de payload da conexão (texto ou binário tipado). Frames comuns carregam um
+        único comando; se o handler informar o TTL do resultado (Reply), ele é enviado no início do payload (FLAG_TTL).
+        Frames de lote (FLAG_BATCH) carregam uma lista de comandos, processados em uma única passada; a resposta é a
+        lista de pares [resposta, ttl], na mesma ordem. A resposta usa o mesmo formato (FLAG_BINARY) da requisição.
+
+        Args:
+            flags (int): Flags do frame recebido.
+            payload (bytes): Conteúdo do frame recebido.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+
+        Returns:
+            tuple[int, bytes]: Flags e conteúdo do frame de resposta.
+    """
+    if flags & protocol.FLAG_HELLO:
+        return protocol.FLAG_HELLO, serialization.negotiate(payload).encode()
+
+    binary = bool(flags & protocol.FLAG_BINARY)
+    request = serialization.decode_request(flags, payload)
+    count = len(request) if flags & protocol.FLAG_BATCH else 1
+
+    load_stats.begin(count)
+    try:
+        if flags & protocol.FLAG_BATCH:
+            replies = [_unwrap(handler(command.strip())) if command.strip() else ('', None) for command in request]
+            return serialization.encode_batch_reply(replies, binary)
+
+        data = request.strip()
+        value, ttl = _unwrap(handler(data)) if data else ('', None)
+        return serialization.encode_reply(value, ttl, binary)
+    finally:
+        load_stats.end(count)
+
+def _is_stream_request(flags):
+    """
+        Indica se um frame de requisição pede a resposta em partes (FLAG_STREAM; lotes e negociação não são em partes).
+    """
+    return bool(flags & protocol.FLAG_STREAM) and not flags & (protocol.FLAG_BATCH | protocol.FLAG_HELLO)
+
+def _dispatch_stream(flags, payload, handler, stream_handler):
+    """
+        Processa um frame de requisição em partes (FLAG_STREAM) e gera os frames de resposta.
+
+        Se stream_handler retornar um iterador, cada parte segue em um frame FLAG_STREAM (no formato da requisição) e
+        um frame FLAG_STREAM vazio encerra a resposta. A parte seguinte só é gerada depois que a anterior foi enviada,
+        de modo que nem o resultado completo nem sua serialização ficam em memória. Demais respostas (erros, comandos
+        que não são gerados em partes, servidores sem stream_handler) seguem em um único frame comum.
+
+        Args:
+            flags (int): Flags do frame recebido.
+            payload (bytes): Conteúdo do frame recebido.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+            stream_handler (callable | None): Função que recebe o comando (str) e retorna um iterador das partes do
+                resultado, ou uma resposta comum (valor ou Reply).
+
+        Yields:
+            tuple[int, bytes]: Flags e conteúdo de cada frame de resposta.
+    """
+    binary = bool(flags & protocol.FLAG_BINARY)
+    data = serialization.decode_request(flags, payload).strip()
+
+    load_stats.begin()
+    try:
+        result = (stream_handler or handler)(data) if data else ''
+
+        if not isinstance(result, Iterator):
+            yield serialization.encode_reply(*_unwrap(result), binary)
+            return
+
+        for chunk in result:
+            yield serialization.encode_stream_chunk(chunk, binary)
+        yield protocol.FLAG_STREAM, b''
+    finally:
+        load_stats.end()
+
+class _Connection:
+    """
+        Estado de uma conexão persistente de cliente no servidor.
+
+        Attributes:
+            sock (socket.socket): Socket do cliente.
+            reader (protocol.FrameReader): Leitor de frames da conexão.
+            last_active (float): Instante (relógio monotônico) da última requisição atendida.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = protocol.FrameReader(sock)
+        self.last_active = time.monotonic()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+def _serve_connection(conn, handler, stream_handler=None):
+    """
+        Atende as requisições disponíveis em uma conexão, em uma thread do pool de workers.
+
+        Processa o frame que tornou a conexão legível e, em seguida, quaisquer frames já presentes no buffer
+        (requisições enviadas em sequência pelo cliente sem aguardar as respostas). Uma resposta em partes ocupa o
+        worker até a última parte ser enviada; o envio bloqueante limita a geração ao ritmo de leitura do cliente.
+
+        Args:
+            conn (_Connection): Conexão do cliente.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+            stream_handler (callable, optional): Handler das requisições em partes (ver _dispatch_stream).
+
+        Returns:
+            bool: True se a conexão continua aberta e deve voltar a ser monitorada.
+    """
+    try:
+        while True:
+            frame = conn.reader.read_frame()
+
+            if frame is None:
+                return False
+
+            if _is_stream_request(frame[0]):
+                frames = _dispatch_stream(*frame, handler, stream_handler)
+                try:
+                    for response_flags, response in frames:
+                        protocol.send_frame(conn.sock, response, response_flags)
+                finally:
+                    frames.close()
+            else:
+                response_flags, response = _dispatch(*frame, handler)
+                protocol.send_frame(conn.sock, response, response_flags)
+            conn.last_active = time.monotonic()
+
+            if not conn.reader.has_buffered_data():
+                return True
+    except Exception as e:
+        print(f'Erro ao atender requisição: {e}')
+        return False
+
+def serve_threads(host, port, handler, max_workers=DEFAULT_MAX_WORKERS, max_in_flight=DEFAULT_MAX_IN_FLIGHT, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                  stream_handler=None):
+    """
+        Executa o servidor TCP com um pool limitado de threads.
+
+        Um único loop de eventos (selectors) aceita conexões e monitora as conexões persistentes ociosas; quando uma conexão
+        fica legível ela é entregue a uma thread do pool, que atende a requisição e a devolve ao loop. Assim, conexões
+        keep-alive ociosas não ocupam workers.
+
+        O loop só despacha uma conexão quando há vaga para mais uma requisição em andamento. Quando o limite é atingido,
+        as conexões legíveis deixam de ser monitoradas e entram em uma fila, despachada à medida que os workers
+        terminam; suas requisições aguardam nos buffers do kernel (backpressure). O loop nunca bloqueia esperando uma
+        vaga: continua aceitando conexões, recebendo as devolvidas pelos workers e fechando as ociosas.
+
+        Args:
+            host (str): Endereço IP de escuta.
+            port (int): Porta TCP de escuta.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+            max_workers (int, optional): Número de threads que processam requisições simultaneamente.
+            max_in_flight (int, optional): Número máximo de requisições despachadas e ainda não respondidas.
+            idle_timeout (float, optional): Tempo, em segundos, após o qual uma conexão ociosa é fechada.
+            stream_handler (callable, optional): Handler das requisições em partes (ver _dispatch_stream).
+    """
+    slots = threading.BoundedSemaphore(max_in_flight)
+    selector = selectors.DefaultSelector()
+    returned = queue.SimpleQueue()
+    wakeup_recv, wakeup_send = socket.socketpair()
+    wakeup_recv.setblocking(False)
+    idle = set()
+    waiting = deque()
+
+    def on_done(conn, future):
+        slots.release()
+        keep_open = not future.cancelled() and future.exception() is None and future.result()
+        returned.put((conn, keep_open))
+        try:
+            wakeup_send.send(b'\0')
+        except OSError:
+            pass
+
+    def dispatch(conn):
+        if not slots.acquire(blocking=False):
+            return False
+        future = executor.submit(_serve_connection, conn, handler, stream_handler)
+        future.add_done_callback(lambda f: on_done(conn, f))
+        return True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+         socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        server_socket.bind((host, port))
+        server_socket.listen(max_in_flight)
+        server_socket.setblocking(False)
+        print(f'Servidor TCP (threads) escutando em {host}:{port}')
+
+        selector.register(server_socket, selectors.EVENT_READ, 'accept')
+        selector.register(wakeup_recv, selectors.EVENT_READ, 'wakeup')
+        last_sweep = time.monotonic()
+
+        while True:
+            for key, mask in selector.select(timeout=1.0):
+                if key.data == 'accept':
+                    try:
+                        sock, addr = server_socket.accept()
+                    except BlockingIOError:
+                        continue
+                    sock.settimeout(idle_timeout)
+                    protocol.configure_socket(sock)
+                    conn = _Connection(sock)
+                    idle.add(conn)
+                    selector.register(conn, selectors.EVENT_READ, conn)
+                elif key.data == 'wakeup':
+                    try:
+                        while wakeup_recv.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    conn = key.data
+                    selector.unregister(conn)
+                    idle.discard(conn)
+                    # Sem vaga, a conexão aguarda na fila sem ser monitorada (backpressure)
+                    if waiting or not dispatch(conn):
+                        waiting.append(conn)
+
+            # Conexões devolvidas pelos workers voltam a ser monitoradas
+            while not returned.empty():
+                conn, keep_open = returned.get()
+                if keep_open:
+                    idle.add(conn)
+                    selector.register(conn, selectors.EVENT_READ, conn)
+                else:
+                    conn.close()
+
+            # Vagas liberadas pelos workers atendem as conexões que aguardam, na ordem de chegada
+            while waiting and dispatch(waiting[0]):
+                waiting.popleft()
+
+            # Fecha conexões ociosas há mais tempo que o limite
+            now = time.monotonic()
+            if now - last_sweep >= 1.0:
+                last_sweep = now
+                for conn in [c for c in idle if now - c.last_active > idle_timeout]:
+                    selector.unregister(conn)
+                    idle.discard(conn)
+                    conn.close()
+
+async def _serve_asyncio(host, port, handler, max_workers, max_in_flight, idle_timeout, stream_handler):
+    """
+        Corrotina principal do servidor TCP baseado em asyncio.
+
+        As conexões são atendidas pelo event loop e o handler (bloqueante) é executado em um pool de threads,
+        limitado por um semáforo de requisições em andamento. Cada conexão pode enviar várias requisições.
+        Nas respostas em partes, cada parte é gerada no pool e a seguinte só depois do drain da anterior.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        async def on_client(reader, writer):
+            protocol.configure_socket(writer.get_extra_info('socket'))
+            try:
+                while True:
+                    try:
+                        frame = await asyncio.wait_for(protocol.read_frame_async(reader), idle_timeout)
+                    except asyncio.TimeoutError:
+                        return
+
+                    if frame is None:
+                        return
+
+                    if _is_stream_request(frame[0]):
+                        frames = _dispatch_stream(*frame, handler, stream_handler)
+                        try:
+                            async with slots:
+                                while True:
+                                    response = await loop.run_in_executor(executor, next, frames, None)
+                                    if response is None:
+                                        break
+                                    protocol.write_frame(writer, response[1], response[0])
+                                    await writer.drain()
+                        finally:
+                            frames.close()
+                        continue
+
+                    async with slots:
+                        response_flags, response = await loop.run_in_executor(executor, _dispatch, *frame, handler)
+
+                    protocol.write_frame(writer, response, response_flags)
+                    await writer.drain()
+            except Exception as e:
+                print(f'Erro ao atender requisição: {e}')
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(on_client, host, port, reuse_address=True, backlog=max_in_flight)
+        print(f'Servidor TCP (asyncio) escutando em {host}:{port}')
+
+        async with server:
+            await server.serve_forever()
+
+def serve_asyncio(host, port, handler, max_workers=DEFAULT_MAX_WORKERS, max_in_flight=DEFAULT_MAX_IN_FLIGHT, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                  stream_handler=None):
+    """
+        Executa o servidor TCP com asyncio.
+
+        Args:
+            host (str): Endereço IP de escuta.
+            port (int): Porta TCP de escuta.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+            max_workers (int, optional): Número de threads que executam o handler.
+            max_in_flight (int, optional): Número máximo de requisições sendo processadas ao mesmo tempo.
+            idle_timeout (float, optional): Tempo, em segundos, após o qual uma conexão ociosa é fechada.
+            stream_handler (callable, optional): Handler das requisições em partes (ver _dispatch_stream).
+    """
+    asyncio.run(_serve_asyncio(host, port, handler, max_workers, max_in_flight, idle_timeout, stream_handler))
+
+def replica_port(default_port):
+    """
+        Porta de escuta do servidor: a informada na linha de comando (réplicas, ex: "python -m server.server2 7768")
+        ou a porta padrão da configuração.
+
+        Args:
+            default_port (int): Porta da instância principal.
+
+        Returns:
+            int: Porta de escuta.
+    """
+    if len(sys.argv) > 1 and sys.argv[1].isdigit():
+        return int(sys.argv[1])
+    return default_port
+
+def cache_file(directory, name, port, default_port):
+    """
+        Caminho do cache persistente de um servidor; réplicas na mesma máquina usam arquivos separados.
+
+        Args:
+            directory (str): Diretório dos arquivos de cache.
+            name (str): Nome base do arquivo (ex: "cache_server2").
+            port (int): Porta de escuta do servidor.
+            default_port (int): Porta da instância principal.
+
+        Returns:
+            str: Caminho do arquivo .jsonl.
+    """
+    if port == default_port:
+        return os.path.join(directory, f'{name}.jsonl')
+    return os.path.join(directory, f'{name}_{port}.jsonl')
+
+def cached_reply(cache, key, record_miss=True):
+    """
+        Consulta o cache persistente de um servidor.
+
+        Args:
+            cache (config.cache_config.PersistentCache): Cache do servidor.
+            key (str): Chave da entrada (comando canônico).
+            record_miss (bool, optional): Se uma falha deve ser contabilizada nas estatísticas do cache.
+
+        Returns:
+            Reply | None: Resposta cacheada e seu TTL restante, ou None se a entrada não estiver no cache.
+    """
+    hit, response, ttl = cache.lookup_entry(key, record_miss)
+    if not hit:
+        return None
+
+    print('Pegando valor do cache (servidor).')
+    return Reply(response, ttl)
+
+def serve(host, port, handler, data_config, name=None, operations=None, stream_handler=None):
+    """
+        Inicia o servidor de operações no modo definido na configuração.
+
+        Ponto de entrada comum dos servidores 1, 2 e 3: cada servidor fornece apenas o seu handler. Se name e operations
+        forem informados, o servidor se registra no Name Server e envia heartbeats com a carga atual (load_stats).
+
+        Args:
+            host (str): Endereço IP de escuta.
+            port (int): Porta TCP de escuta.
+            handler (callable): Função que recebe o comando (str) e retorna a resposta (valor ou Reply).
+            data_config (dict): Configurações carregadas de configuracoes.txt. Chaves utilizadas:
+                - server_mode (str): 'threads' (padrão) ou 'asyncio'
+                - max_workers (int): Threads que executam o handler
+                - max_in_flight (int): Limite de requisições em andamento
+                - connection_idle_timeout (float): Segundos até fechar uma conexão persistente ociosa
+                - heartbeat_interval (float): Segundos entre heartbeats enviados ao Name Server
+            name (str, optional): Nome do servidor no registro (ex: "server2").
+            operations (list[str], optional): Operações atendidas pelo servidor.
+            stream_handler (callable, optional): Handler das requisições em partes (FLAG_STREAM); sem ele, essas
+                requisições recebem a resposta completa do handler em um único frame.
+
+        Raises:
+            ValueError: Se server_mode não for reconhecido.
+    """
+    mode = data_config.get('server_mode', DEFAULT_SERVER_MODE)
+    max_workers = data_config.get('max_workers', DEFAULT_MAX_WORKERS)
+    max_in_flight = max(data_config.get('max_in_flight', DEFAULT_MAX_IN_FLIGHT), max_workers)
+    idle_timeout = data_config.get('connection_idle_timeout', DEFAULT_IDLE_TIMEOUT)
+
+    if mode not in ('threads', 'asyncio'):
+        raise ValueError(f'Modo de servidor desconhecido: {mode}')
+
+    if name is not None and operations:
+        name_server = (data_config['ip_name_server'], data_config['port_name_server'])
+        interval = data_config.get('heartbeat_interval', DEFAULT_HEARTBEAT_INTERVAL)
+        Registration(name, host, port, operations, max_workers, name_server, interval, load_stats.snapshot).start()
+
+    if mode == 'threads':
+        serve_threads(host, port, handler, max_workers, max_in_flight, idle_timeout, stream_handler)
+    else:
+        serve_asyncio(host, port, handler, max_workers, max_in_flight, idle_timeout, stream_handler)
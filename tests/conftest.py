@@ -0,0 +1,35 @@
+import socket
+import threading
+import time
+
+import pytest
+
+def free_port():
+    """
+        Porta TCP livre na interface de loopback.
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@pytest.fixture
+def start_server():
+    """
+        Inicia um servidor TCP (server_core.serve_threads ou serve_asyncio) em uma thread (daemon) e retorna sua porta,
+        depois que ela passa a aceitar conexões.
+    """
+    def start(serve, handler, **options):
+        port = free_port()
+        threading.Thread(target=serve, args=('127.0.0.1', port, handler), kwargs=options, daemon=True).start()
+
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return port
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    return start
@@ -0,0 +1,52 @@
+import math
+import pytest
+from common.commands import canonical_command
+from server import math_operations as mo
+
+@pytest.mark.parametrize('command, expected', [
+    ('sum 1 2 3', 6.0),
+    ('sub 10 1 2', 7.0),
+    ('prod 2 3 4', 24.0),
+    ('div 100 5 2', 10.0),
+    ('sum 0.1 0.2', 0.30000000000000004),
+    ('sum 1e308 1e308', math.inf),
+    ('sub -1e308 1e308', -math.inf),
+    ('sum exact 0.1 0.2 0.0000000000000000001', '0.3000000000000000001'),
+    ('sub exact 1 1/3', '2/3'),
+    ('prod exact 2.5 4', '10'),
+    ('div exact 1 8', '0.125'),
+    ('sum exact -0.5 0.25', '-0.25'),
+])
+def test_basic_operations(command, expected):
+    assert mo.basic_operations(command) == expected
+
+def test_float_overflow_and_undefined_sums_follow_ieee():
+    assert math.isnan(mo.basic_operations('sum inf -inf'))
+    assert math.isnan(mo.basic_operations('sub inf inf'))
+
+def test_basic_operation_errors():
+    assert mo.basic_operations('div 1 0') == 'Erro: Divisão por zero não é permitida.'
+    assert mo.basic_operations('sum') == 'Erro: A operação requer pelo menos um número'
+    assert mo.basic_operations('sum 1 x') == 'Erro'
+
+def test_oversized_exact_operands_are_rejected():
+    assert canonical_command('sum exact 1e30000000') is None
+    assert mo.basic_operations('sum exact 1e30000000') == 'Erro'
+    assert mo.basic_operations('prod exact ' + ' '.join(['1e-900'] * 200)) == 'Erro'
+    assert mo.basic_operations('sum exact 1e900') == '1' + '0' * 900
+
+@pytest.mark.parametrize('a, b', [
+    ('sum 2 1', 'sum  1.0 2e0'),
+    ('prod 3 2 1', 'prod 1 2 3'),
+    ('sum exact 0.5 0.25', 'sum exact 1/4 1/2'),
+    ('fat 007 lead 05', 'fat 7 lead 5'),
+    ('prim 007 11', 'prim 7 11'),
+])
+def test_equivalent_commands_share_a_canonical_key(a, b):
+    assert canonical_command(a) == canonical_command(b)
+
+def test_non_commutative_and_invalid_commands():
+    assert canonical_command('sub 2 1') != canonical_command('sub 1 2')
+    assert canonical_command('sum 1 x') is None
+    assert canonical_command('fat 5 digits 3') is None
+    assert canonical_command('news') is None
@@ -0,0 +1,160 @@
+import json
+import pytest
+from config import cache_policies
+from config.cache_config import PersistentCache
+
+def test_policy_without_all_hooks_cannot_be_created():
+    class Incomplete(cache_policies.EvictionPolicy):
+        def on_insert(self, key, size, cost=1.0):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_create_policy_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        cache_policies.create_policy('mru')
+
+def test_fifo_ignores_accesses():
+    policy = cache_policies.create_policy('fifo')
+    for key in 'abc':
+        policy.on_insert(key, 10)
+    policy.on_access('a')
+
+    assert policy.victim() == 'a'
+
+def test_lru_evicts_least_recently_used():
+    policy = cache_policies.create_policy('LRU')
+    for key in 'abc':
+        policy.on_insert(key, 10)
+    policy.on_access('a')
+
+    assert policy.victim() == 'b'
+    policy.on_remove('b')
+    assert policy.victim() == 'c'
+
+def test_lfu_evicts_least_frequently_used_oldest_first():
+    policy = cache_policies.create_policy('lfu')
+    for key in 'abc':
+        policy.on_insert(key, 10)
+    policy.on_access('a')
+    policy.on_access('b')
+
+    assert policy.victim() == 'c'
+    policy.on_remove('c')
+    policy.on_access('b')
+    assert policy.victim() == 'a'
+
+def test_gdsf_prefers_evicting_large_cheap_entries():
+    policy = cache_policies.create_policy('gdsf')
+    policy.on_insert('small', 10, cost=1.0)
+    policy.on_insert('large', 10000, cost=1.0)
+    policy.on_insert('expensive', 10000, cost=5000.0)
+
+    assert policy.victim() == 'large'
+
+def test_victim_of_empty_policy_is_none():
+    for name in cache_policies.POLICIES:
+        assert cache_policies.create_policy(name).victim() is None
+
+def test_persistent_cache_evicts_by_bytes(tmp_path):
+    entry_size = len(PersistentCache._encode('k0', 'x' * 10))
+    cache = PersistentCache(str(tmp_path / 'cache.jsonl'), max_size=3 * entry_size, policy='lru')
+
+    for i in range(3):
+        cache.set(f'k{i}', 'x' * 10)
+    cache.lookup('k0')
+    cache.set('k3', 'x' * 10)
+
+    assert 'k1' not in cache
+    assert {'k0', 'k2', 'k3'} <= {key for key, _ in cache.items()}
+    assert cache.size <= cache.max_size
+    assert cache.stats()['evictions'] == 1
+    cache.close()
+
+def test_persistent_cache_rejects_entry_larger_than_limit(tmp_path):
+    cache = PersistentCache(str(tmp_path / 'cache.jsonl'), max_size=32)
+
+    assert cache.set('big', 'x' * 100) is False
+    assert len(cache) == 0
+    cache.close()
+
+def test_persistent_cache_reloads_log_and_drops_partial_record(tmp_path):
+    path = tmp_path / 'cache.jsonl'
+    cache = PersistentCache(str(path), max_size=1024 * 1024)
+    cache.set('sum 1 2', 3.0)
+    cache.set('fat 5', 120)
+    cache.delete('fat 5')
+    cache.close()
+
+    with open(path, 'ab') as f:
+        f.write(b'{"k": "prod 2 3", "v"')
+
+    reopened = PersistentCache(str(path), max_size=1024 * 1024)
+    assert reopened.lookup('sum 1 2') == (True, 3.0)
+    assert reopened.lookup('fat 5') == (False, None)
+    assert 'prod 2 3' not in reopened
+    reopened.close()
+
+def test_persistent_cache_expires_entries(tmp_path):
+    cache = PersistentCache(str(tmp_path / 'cache.jsonl'), max_size=1024 * 1024)
+    cache.set('news', ['a'], ttl=-1)
+    cache.set('sum 1 2', 3.0, ttl=60)
+
+    assert cache.lookup('news') == (False, None)
+    hit, value, ttl = cache.lookup_entry('sum 1 2')
+    assert hit and value == 3.0 and 0 < ttl <= 60
+    assert cache.stats()['expirations'] == 1
+    cache.close()
+
+def test_cached_reply_rechecks_without_counting_a_second_miss(tmp_path):
+    from server import server_core
+
+    cache = PersistentCache(str(tmp_path / 'cache.jsonl'), max_size=1024 * 1024)
+    assert server_core.cached_reply(cache, 'fat 5') is None
+    assert server_core.cached_reply(cache, 'fat 5', record_miss=False) is None
+    assert cache.stats()['misses'] == 1
+
+    cache.set('fat 5', '120')
+    assert server_core.cached_reply(cache, 'fat 5', record_miss=False) == server_core.Reply('120', None)
+    assert cache.stats()['hits'] == 1
+    cache.close()
+
+@pytest.mark.parametrize('name', ['fifo', 'lru', 'lfu', 'gdsf'])
+def test_eviction_order_matches_victims(name):
+    policy = cache_policies.create_policy(name)
+    for i, key in enumerate('abcd'):
+        policy.on_insert(key, 10 + i)
+    policy.on_access('a')
+    policy.on_access('c')
+    policy.on_remove('d')
+
+    order = policy.eviction_order()
+    victims = []
+    for _ in range(3):
+        victim = policy.victim()
+        victims.append(victim)
+        policy.on_remove(victim)
+    assert order == victims
+
+@pytest.mark.parametrize('name', ['fifo', 'lru', 'lfu'])
+def test_compaction_drops_expired_entries_and_keeps_eviction_order(tmp_path, name):
+    path = str(tmp_path / 'cache.jsonl')
+    cache = PersistentCache(path, max_size=1024 * 1024, policy=name)
+    for key in ('a', 'b', 'c', 'd'):
+        cache.set(key, key.upper())
+    cache.set('old', 'X', ttl=-1)
+    cache.lookup('a')
+    expected = cache.policy.eviction_order()
+    expected.remove('old')
+
+    cache.compact()
+    cache.close()
+
+    with open(path) as f:
+        assert [json.loads(line)['k'] for line in f] == expected
+
+    reopened = PersistentCache(path, max_size=1024 * 1024, policy=name)
+    assert reopened.policy.eviction_order() == expected
+    assert reopened.lookup('old') == (False, None)
+    reopened.close()
@@ -0,0 +1,92 @@
+import time
+
+from client.tcp_client import ResolutionCache, ResultCache, Resolution
+from common.balancing import Replica
+
+SUM = Resolution((Replica('127.0.0.1', 5001, 1), Replica('127.0.0.1', 6001, 1)), 'round_robin')
+FAT = Resolution((Replica('127.0.0.1', 5002, 1),), 'round_robin')
+
+def test_resolution_cache_hits_until_ttl():
+    cache = ResolutionCache()
+    assert cache.get('sum') == (False, None)
+
+    cache.put('sum', SUM, 60)
+    cache.put('fat', FAT, -1)
+    assert cache.get('sum') == (True, SUM)
+    assert cache.get('fat') == (False, None)
+
+def test_resolution_cache_keeps_negative_entries():
+    cache = ResolutionCache()
+    cache.put('xyz', None, 60)
+    assert cache.get('xyz') == (True, None)
+
+def test_resolution_cache_invalidation():
+    cache = ResolutionCache()
+    cache.put('sum', SUM, 60)
+    cache.put('sub', SUM, 60)
+    cache.put('fat', FAT, 60)
+    cache.put('xyz', None, 60)
+
+    # Só as resoluções que incluem o servidor que falhou são removidas (as negativas permanecem)
+    cache.invalidate_address('127.0.0.1', 6001)
+    assert cache.get('sum') == (False, None)
+    assert cache.get('sub') == (False, None)
+    assert cache.get('fat') == (True, FAT)
+    assert cache.get('xyz') == (True, None)
+
+    cache.invalidate('fat')
+    assert cache.get('fat') == (False, None)
+
+    cache.clear()
+    assert cache.get('xyz') == (False, None)
+
+def test_result_cache_hits_and_stats():
+    cache = ResultCache(max_entries=10, max_size=1024 * 1024, expiration=60)
+    assert cache.get('sum 1 2') == (False, None)
+
+    assert cache.put('sum 1 2', 3.0)
+    assert cache.get('sum 1 2') == (True, 3.0)
+    assert 'sum 1 2' in cache and len(cache) == 1
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, max_size=1024 * 1024, expiration=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats()['evictions'] == 1
+
+def test_result_cache_respects_size_limit():
+    cache = ResultCache(max_entries=100, max_size=2000, expiration=60)
+    assert not cache.put('big', 'x' * 5000)
+
+    for i in range(20):
+        cache.put(f'k{i}', 'y' * 100)
+    assert cache.size <= 2000
+    assert 'k19' in cache and 'k0' not in cache
+
+def test_result_cache_uses_the_shorter_of_server_ttl_and_expiration():
+    cache = ResultCache(max_entries=10, max_size=1024 * 1024, expiration=60)
+    cache.put('news', ['a'], ttl=0.05)
+    cache.put('sum 1 2', 3.0, ttl=3600)
+    time.sleep(0.1)
+
+    assert cache.get('news') == (False, None)
+    assert cache.stats()['expirations'] == 1
+    assert cache._entries['sum 1 2'][0] <= time.monotonic() + 60
+
+def test_result_cache_replaces_and_clears():
+    cache = ResultCache(max_entries=10, max_size=1024 * 1024, expiration=60)
+    cache.put('a', 'x' * 100)
+    size = cache.size
+    cache.put('a', 'y')
+
+    assert cache.get('a') == (True, 'y')
+    assert cache.size < size
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
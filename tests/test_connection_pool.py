@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+
+from client.async_operations import AsyncConnectionPool
+from client.rpc_exception import RPCServerNotFound
+from client.tcp_client import ConnectionPool, PooledConnection
+from common import protocol, serialization
+from server import server_core
+from tests.conftest import free_port
+
+def echo(command):
+    return command
+
+def count_chunks(command):
+    if command.startswith('count '):
+        return iter(str(i) for i in range(int(command[6:])))
+    return command
+
+def _reply(frame):
+    return serialization.decode_reply(*frame)[0]
+
+@pytest.fixture
+def port(start_server):
+    return start_server(server_core.serve_threads, echo, stream_handler=count_chunks)
+
+def test_connections_are_reused(port):
+    pool = ConnectionPool()
+
+    assert _reply(pool.request('127.0.0.1', port, 'a')) == 'a'
+    conn, reused = pool.acquire('127.0.0.1', port)
+    assert reused and conn.binary
+    pool.release(conn)
+
+    assert _reply(pool.request('127.0.0.1', port, 'b')) == 'b'
+    assert len(pool._idle[('127.0.0.1', port)]) == 1
+    assert pool.outstanding('127.0.0.1', port) == 0
+    pool.clear()
+
+def test_text_wire_format(port):
+    conn = PooledConnection('127.0.0.1', port, wire_format=serialization.WIRE_TEXT)
+    assert not conn.binary
+    flags, payload = serialization.encode_request('x', conn.binary)
+    assert _reply(conn.request(payload, flags)) == 'x'
+    conn.close()
+
+def test_pool_keeps_at_most_max_size_idle_connections(port):
+    pool = ConnectionPool(max_size=1)
+    first, _ = pool.acquire('127.0.0.1', port)
+    second, _ = pool.acquire('127.0.0.1', port)
+
+    pool.release(first)
+    pool.release(second)
+    assert list(pool._idle[('127.0.0.1', port)]) == [first]
+    assert second.sock.fileno() == -1
+    pool.clear()
+
+def test_stale_reused_connection_is_retried_once(start_server):
+    port = start_server(server_core.serve_threads, echo, idle_timeout=0.2)
+    pool = ConnectionPool()
+
+    assert _reply(pool.request('127.0.0.1', port, 'a')) == 'a'
+    # O servidor fecha a conexão ociosa; a requisição seguinte falha nela e é repetida em uma conexão nova
+    time.sleep(1.5)
+    assert _reply(pool.request('127.0.0.1', port, 'b')) == 'b'
+    pool.clear()
+
+def test_expired_idle_connections_are_not_reused(port):
+    pool = ConnectionPool(idle_timeout=0)
+    pool.request('127.0.0.1', port, 'a')
+
+    conn, reused = pool.acquire('127.0.0.1', port)
+    assert not reused
+    conn.close()
+
+def test_unreachable_server_raises():
+    pool = ConnectionPool(connect_timeout=0.5)
+    with pytest.raises(RPCServerNotFound):
+        pool.request('127.0.0.1', free_port(), 'a')
+
+def test_pipeline_and_batch(port):
+    pool = ConnectionPool()
+    frames = pool.pipeline('127.0.0.1', port, ['a', ['b', 'c'], 'd'], window=2)
+
+    assert _reply(frames[0]) == 'a'
+    assert serialization.decode_batch_reply(*frames[1]) == [('b', None), ('c', None)]
+    assert _reply(frames[2]) == 'd'
+    pool.clear()
+
+def test_stream_returns_connection_to_pool(port):
+    pool = ConnectionPool()
+    frames = list(pool.stream('127.0.0.1', port, 'count 3'))
+
+    assert [serialization.decode_stream_chunk(*frame) for frame in frames[:-1]] == ['0', '1', '2']
+    assert frames[-1] == (protocol.FLAG_STREAM, b'')
+    assert len(pool._idle[('127.0.0.1', port)]) == 1
+    pool.clear()
+
+def test_interrupted_stream_closes_connection(port):
+    pool = ConnectionPool()
+    frames = pool.stream('127.0.0.1', port, 'count 100')
+    next(frames)
+    frames.close()
+
+    assert not pool._idle.get(('127.0.0.1', port))
+    assert pool.outstanding('127.0.0.1', port) == 0
+
+def test_async_pool_reuses_connections(port):
+    async def main():
+        pool = AsyncConnectionPool()
+        first = _reply(await pool.request('127.0.0.1', port, 'a'))
+        second = _reply(await pool.request('127.0.0.1', port, 'b'))
+        idle = len(pool._idle[('127.0.0.1', port)])
+        replies = await asyncio.gather(*(pool.request('127.0.0.1', port, str(i)) for i in range(5)))
+        pool.clear()
+        return first, second, idle, [_reply(frame) for frame in replies], pool.outstanding('127.0.0.1', port)
+
+    assert asyncio.run(main()) == ('a', 'b', 1, ['0', '1', '2', '3', '4'], 0)
+
+def test_async_pool_retries_stale_connection(start_server):
+    port = start_server(server_core.serve_threads, echo, idle_timeout=0.2)
+
+    async def main():
+        pool = AsyncConnectionPool()
+        await pool.request('127.0.0.1', port, 'a')
+        await asyncio.sleep(1.5)
+        reply = _reply(await pool.request('127.0.0.1', port, 'b'))
+        pool.clear()
+        return reply
+
+    assert asyncio.run(main()) == 'b'
+
+def test_async_pool_pipeline_and_stream(port):
+    async def main():
+        pool = AsyncConnectionPool()
+        frames = await pool.pipeline('127.0.0.1', port, ['a', ['b']], window=1)
+        chunks = [serialization.decode_stream_chunk(*frame) async for frame in pool.stream('127.0.0.1', port, 'count 3')
+                  if frame[1]]
+        pool.clear()
+        return _reply(frames[0]), serialization.decode_batch_reply(*frames[1]), chunks
+
+    assert asyncio.run(main()) == ('a', [('b', None)], ['0', '1', '2'])
+
+def test_async_pool_unreachable_server_raises():
+    async def main():
+        await AsyncConnectionPool(connect_timeout=0.5).request('127.0.0.1', free_port(), 'a')
+
+    with pytest.raises(RPCServerNotFound):
+        asyncio.run(main())
@@ -0,0 +1,80 @@
+import math
+import inspect
+import pytest
+from server import math_operations as mo
+from client.operations import Operations, command_args
+
+@pytest.mark.parametrize('n', [0, 1, 5, 20, 170, 1000, 5000, 12345])
+def test_factorial_matches_math_factorial(n):
+    assert mo.factorial(n) == math.factorial(n)
+    assert mo.factorial_result(n) == str(math.factorial(n))
+
+def test_checkpoints_are_reused():
+    expected = math.factorial(30000)
+    assert mo.factorial(25000) == math.factorial(25000)
+    assert mo.factorial(30000) == expected
+    assert mo.factorial(30000) == expected
+
+def test_int_to_decimal_matches_str():
+    for value in (0, 7, -12345, 10 ** 5000, 3 ** 40000 - 1, -(7 ** 20000)):
+        assert mo.int_to_decimal(value) == str(value)
+
+def test_decimal_chunks_join_to_full_number():
+    value = math.factorial(3000)
+    chunks = list(mo.decimal_chunks(value, size=1000))
+
+    assert ''.join(chunks) == str(value)
+    assert all(len(chunk) == 1000 for chunk in chunks[1:])
+
+def test_reduced_modes():
+    digits = str(math.factorial(3000))
+
+    assert mo.factorial_result(3000, 'digits') == len(digits)
+    assert mo.factorial_result(3000, 'lead', 12) == digits[:12]
+    assert mo.factorial_result(3000, 'mod', 1000000007) == math.factorial(3000) % 1000000007
+    assert mo.factorial_result(20, 'hex') == hex(math.factorial(20))
+    assert mo.factorial_digits(100000) == 456574
+
+@pytest.mark.parametrize('n', [100, 1000, 3000, 20000])
+@pytest.mark.parametrize('k', [1, 7, 50, 200, 10 ** 9])
+def test_lead_matches_leading_digits_of_math_factorial(n, k):
+    assert mo.factorial_result(n, 'lead', k) == str(math.factorial(n))[:k]
+
+@pytest.mark.parametrize('value', [10 ** 300, 10 ** 300 - 1, 2 * 10 ** 299 + 1, 3 ** 1000, 7 ** 2000 + 12345])
+def test_leading_digits_near_rounding_boundaries(value):
+    text = str(value)
+    for k in (1, 5, 100):
+        assert mo.leading_digits(value, len(text), k) == text[:k]
+
+def test_invalid_factorials_return_error():
+    assert mo.number_theory('fat -1').startswith('Erro')
+    assert mo.number_theory(f'fat {mo.MAX_FACTORIAL + 1}').startswith('Erro')
+    assert mo.number_theory('fat 5 digits 3') == 'Erro'
+    assert mo.number_theory('fat x') == 'Erro'
+
+def test_client_maps_keyword_arguments_to_command_arguments():
+    def fat(self, n=None, mode=None, param=None):
+        pass
+
+    signature = inspect.signature(fat)
+    op = Operations.__new__(Operations)
+
+    assert command_args(signature, op, (10,), {'mode': 'digits'}) == [10, 'digits']
+    assert command_args(signature, op, (), {'n': 10, 'mode': 'lead', 'param': 5}) == [10, 'lead', 5]
+    assert command_args(signature, op, (10,), {}) == [10]
+    with pytest.raises(TypeError):
+        command_args(signature, op, (10,), {'modo': 'digits'})
+
+def test_client_operations_forward_keyword_arguments():
+    sent = []
+
+    class RecordingOperations(Operations):
+        def _process_operation(self, cmd, *args, use_cache=False):
+            sent.append((cmd, args))
+
+    op = RecordingOperations()
+    op.fat(10, mode='digits')
+    op.fat(n=7)
+    op.sum(1, 2, 3)
+
+    assert sent == [('fat', (10, 'digits')), ('fat', (7,)), ('sum', (1, 2, 3))]
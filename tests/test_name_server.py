@@ -0,0 +1,145 @@
+import json
+import time
+import threading
+
+from client import tcp_client
+from common import balancing
+from common.balancing import Replica
+from server import server_core
+from server.name_server import NameServer, LeaseTracker
+from tests.conftest import free_port
+
+A = Replica('127.0.0.1', 9001, 1)
+B = Replica('127.0.0.1', 9002, 1)
+C = Replica('127.0.0.1', 9003, 3)
+
+def _name_server(*replicas, strategy=balancing.ROUND_ROBIN):
+    name_server = NameServer(servers={})
+    name_server.balancer = balancing.Balancer(strategy, name_server._replica_load)
+    for replica in replicas:
+        name_server.registry.add(replica, ['sum'])
+    return name_server
+
+def _first(reply):
+    response = json.loads(reply)
+    return response['server_ip'], response['server_port']
+
+def _message(message_type, replica, operations=('sum',), **extra):
+    return json.dumps({'type': message_type, 'ip': replica.host, 'port': replica.port, 'capacity': replica.weight,
+                       'operations': list(operations), **extra}).encode()
+
+def test_round_robin_alternates_first_replica():
+    name_server = _name_server(A, B)
+    firsts = [_first(name_server.resolve('sum')) for _ in range(4)]
+    assert firsts == [(A.host, A.port), (B.host, B.port), (A.host, A.port), (B.host, B.port)]
+
+def test_unknown_operation_gets_negative_reply():
+    name_server = _name_server(A)
+    assert 'error' in json.loads(name_server.resolve('fat'))
+    assert 'error' in json.loads(name_server.resolve('fat', repeated=True))
+
+def test_repeated_resolve_has_no_side_effects():
+    name_server = _name_server(A, B)
+
+    reply = name_server.resolve('sum')
+    assert name_server.leases.count((A.host, A.port)) == 1
+
+    # A repetição por TCP devolve a mesma ordem, sem contar outro lease nem avançar o round robin
+    assert name_server.resolve('sum', repeated=True) == reply
+    assert name_server.resolve('sum', repeated=True) == reply
+    assert name_server.leases.count((A.host, A.port)) == 1
+    assert _first(name_server.resolve('sum')) == (B.host, B.port)
+
+def test_repeated_resolve_keeps_weighted_cursor():
+    name_server = _name_server(A, C, strategy=balancing.WEIGHTED)
+    firsts = []
+    for _ in range(8):
+        reply = name_server.resolve('sum')
+        assert name_server.resolve('sum', repeated=True) == reply
+        firsts.append(_first(reply))
+
+    assert firsts.count((C.host, C.port)) == 6
+    assert firsts.count((A.host, A.port)) == 2
+
+def test_registration_heartbeat_and_deregistration():
+    name_server = _name_server()
+    assert 'error' in json.loads(name_server.resolve('sum'))
+
+    name_server.register(_message('register', A))
+    assert _first(name_server.resolve('sum')) == (A.host, A.port)
+
+    name_server.register(_message('heartbeat', A, operations=('sum', 'sub'), load={'in_flight': 2}))
+    assert _first(name_server.resolve('sub')) == (A.host, A.port)
+    assert name_server._replica_load((A.host, A.port)) == 2
+
+    name_server.register(_message('deregister', A))
+    assert 'error' in json.loads(name_server.resolve('sum'))
+
+def test_invalid_registration_is_ignored():
+    name_server = _name_server(A)
+    name_server.register(b'{"type": "register"}')
+    name_server.register(b'{nao e json')
+    assert name_server.registry.candidates('sum') == (A,)
+
+def test_expired_registrations_are_evicted():
+    name_server = _name_server()
+    name_server.registry.heartbeat_timeout = -1
+    name_server.register(_message('register', A))
+    name_server.registry.evict_expired()
+    assert name_server.registry.candidates('sum') == ()
+
+def test_least_outstanding_prefers_replica_with_fewer_leases():
+    name_server = _name_server(A, B, strategy=balancing.LEAST_OUTSTANDING)
+    firsts = [_first(name_server.resolve('sum')) for _ in range(6)]
+    assert firsts.count((A.host, A.port)) == 3
+    assert firsts.count((B.host, B.port)) == 3
+
+def test_lease_tracker_expires_leases():
+    leases = LeaseTracker(ttl=-1)
+    leases.add(('127.0.0.1', 1))
+    assert leases.count(('127.0.0.1', 1)) == 0
+
+    leases = LeaseTracker(ttl=60)
+    leases.add(('127.0.0.1', 1))
+    leases.add(('127.0.0.1', 1))
+    assert leases.count(('127.0.0.1', 1)) == 2
+
+def test_truncated_udp_reply_is_repeated_over_tcp():
+    port = free_port()
+    name_server = _name_server(A, B)
+    name_server.host, name_server.port, name_server.udp_reply_limit = '127.0.0.1', port, 16
+    threading.Thread(target=name_server.serve_forever, daemon=True).start()
+
+    for _ in range(50):
+        try:
+            resolution, ttl = tcp_client.resolve_operation('sum', '127.0.0.1', port, timeout=0.2)
+            break
+        except tcp_client.RPCServerNotFound:
+            continue
+
+    assert set(resolution.replicas) == {A, B}
+    assert resolution.replicas[0] == A
+    # Uma única escolha: o lease foi contado uma vez e a próxima consulta começa pela outra réplica
+    assert name_server.leases.count((A.host, A.port)) == 1
+    assert _first(name_server.resolve('sum')) == (B.host, B.port)
+
+def test_client_fails_over_to_a_live_replica(start_server):
+    live = Replica('127.0.0.1', start_server(server_core.serve_threads, lambda command: command), 1)
+    dead = Replica('127.0.0.1', free_port(), 1)
+
+    port = free_port()
+    name_server = _name_server(dead, live)
+    name_server.host, name_server.port = '127.0.0.1', port
+    threading.Thread(target=name_server.serve_forever, daemon=True).start()
+    time.sleep(0.2)
+
+    tcp_client.resolution_cache.clear()
+    assert tcp_client.dns_connection('sum 1 2', '127.0.0.1', port, use_cache=False) == 'sum 1 2'
+
+    # A resolução que incluía a réplica inacessível foi invalidada; a réplica fica no fim da ordem
+    assert tcp_client.resolution_cache.get('sum') == (False, None)
+    assert tcp_client.replica_selector.order(tcp_client.Resolution((dead, live), 'round_robin'))[-1] == (dead.host, dead.port)
+
+    assert tcp_client.dns_connection('sum 3 4', '127.0.0.1', port, use_cache=False) == 'sum 3 4'
+    assert tcp_client.resolution_cache.get('sum')[0]
+    tcp_client.resolution_cache.clear()
@@ -0,0 +1,134 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from server.news_fetcher import NewsFetcher, parse_headlines
+
+PAGE = (
+    '<html><body><h1>Portal</h1>'
+    '<h3>Primeira</h3><p>texto</p><h3>  </h3><h3>Segunda <b>parte</b></h3>'
+    '<div><h3>Terceira</h3></div>'
+    '</body></html>'
+).encode()
+
+class NewsHandler(BaseHTTPRequestHandler):
+    """
+        Página de notícias local: responde 304 quando o If-None-Match coincide com o ETag atual.
+    """
+
+    def do_GET(self):
+        site = self.server.site
+        site['requests'].append(dict(self.headers))
+
+        if site['status'] != 200:
+            self.send_response(site['status'])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.headers.get('If-None-Match') == site['etag']:
+            self.send_response(304)
+            self.send_header('ETag', site['etag'])
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', site['etag'])
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(site['body'])))
+        self.end_headers()
+        self.wfile.write(site['body'])
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), NewsHandler)
+    server.site = {'status': 200, 'etag': '"v1"', 'body': PAGE, 'requests': []}
+    server.site['url'] = f'http://127.0.0.1:{server.server_address[1]}/'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server.site
+
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def fetcher(site):
+    fetcher = NewsFetcher(site['url'], refresh_interval=60, timeout=2)
+    yield fetcher
+    fetcher.stop()
+
+def test_parse_headlines_keeps_non_empty_h3_in_order():
+    assert parse_headlines(PAGE) == ['Primeira', 'Segundaparte', 'Terceira']
+
+def test_parse_headlines_respects_limit():
+    assert parse_headlines(PAGE, limit=2) == ['Primeira', 'Segundaparte']
+
+def test_parse_headlines_ignores_other_tags():
+    assert parse_headlines('<h1>a</h1><h2>b</h2><p>c</p>') == []
+
+def test_refresh_uses_etag_and_keeps_headlines_on_304(site, fetcher):
+    assert fetcher.refresh()
+    assert fetcher.headlines() == ['Primeira', 'Segundaparte', 'Terceira']
+    assert 'If-None-Match' not in site['requests'][0]
+
+    # A página mudou, mas o ETag não: o 304 mantém as manchetes já obtidas
+    site['body'] = b'<h3>Outra</h3>'
+    assert fetcher.refresh()
+    assert site['requests'][1]['If-None-Match'] == '"v1"'
+    assert fetcher.headlines() == ['Primeira', 'Segundaparte', 'Terceira']
+
+    site['etag'] = '"v2"'
+    assert fetcher.refresh()
+    assert fetcher.headlines() == ['Outra']
+
+def test_page_without_headlines(site, fetcher):
+    site['body'] = b'<p>sem manchetes</p>'
+    assert fetcher.refresh()
+    assert fetcher.headlines() == ['Nenhuma notícia encontrada!']
+
+def test_failed_refresh_keeps_last_headlines(site, fetcher):
+    assert fetcher.refresh()
+
+    site['status'] = 500
+    assert not fetcher.refresh()
+    assert fetcher.headlines() == ['Primeira', 'Segundaparte', 'Terceira']
+
+def test_failure_before_first_fetch_reports_error(site, fetcher):
+    site['status'] = 503
+    assert not fetcher.refresh()
+
+    headlines = fetcher.headlines()
+    assert len(headlines) == 1
+    assert headlines[0].startswith('Erro ao obter as notícias')
+
+def test_unreachable_site_keeps_last_headlines(site):
+    fetcher = NewsFetcher(site['url'], refresh_interval=60, timeout=2)
+    assert fetcher.refresh()
+
+    fetcher.url = 'http://127.0.0.1:1/'
+    assert not fetcher.refresh()
+    assert fetcher.headlines() == ['Primeira', 'Segundaparte', 'Terceira']
+    fetcher.stop()
+
+def test_ttl_counts_down_from_refresh_interval(site, fetcher):
+    assert fetcher.ttl() is None
+
+    assert fetcher.refresh()
+    ttl = fetcher.ttl()
+    assert 0 < ttl <= fetcher.refresh_interval
+
+    # Um 304 também renova a validade
+    fetcher.updated_at -= 30
+    assert fetcher.ttl() <= fetcher.refresh_interval - 30
+    assert fetcher.refresh()
+    assert fetcher.ttl() > fetcher.refresh_interval - 30
+
+def test_start_fetches_in_background(site, fetcher):
+    fetcher.start()
+    assert fetcher.headlines() == ['Primeira', 'Segundaparte', 'Terceira']
+    assert fetcher.ttl() is not None
@@ -0,0 +1,45 @@
+import json
+from config.cache_config import PersistentCache
+from client.tcp_client import OfflineCache, OfflineStore
+
+def _server_log(path, entries):
+    cache = PersistentCache(str(path), max_size=1024 * 1024)
+    for key, value in entries.items():
+        cache.set(key, value)
+    cache.close()
+
+def test_offline_cache_reads_every_server_log_by_canonical_key(tmp_path):
+    _server_log(tmp_path / 'cache_server1.jsonl', {'sum 1.0 2.0': 3.0})
+    _server_log(tmp_path / 'cache_server2_7768.jsonl', {'fat 5': '120'})
+    cache = OfflineCache([str(tmp_path / 'cache_server*.jsonl')])
+
+    assert cache.lookup('sum 2 1') == (True, 3.0)
+    assert cache.lookup('fat 005 ') == (True, '120')
+    assert cache.lookup('prod 2 3') == (False, None)
+
+def test_offline_cache_picks_up_new_files(tmp_path):
+    cache = OfflineCache([str(tmp_path / 'cache_server*.jsonl')])
+    assert cache.lookup('sum 1 2') == (False, None)
+
+    _server_log(tmp_path / 'cache_server1.jsonl', {'sum 1.0 2.0': 3.0})
+    assert cache.lookup('sum 1 2') == (True, 3.0)
+
+def test_offline_store_follows_deletions_and_expiry(tmp_path):
+    path = tmp_path / 'cache_server1.jsonl'
+    cache = PersistentCache(str(path), max_size=1024 * 1024)
+    cache.set('sum 1.0 2.0', 3.0)
+    cache.set('news', ['a'], ttl=-1)
+    cache.set('fat 5', '120')
+    cache.delete('fat 5')
+    cache.close()
+
+    store = OfflineStore(str(path))
+    assert store.lookup('sum 1.0 2.0') == (True, 3.0)
+    assert store.lookup('news') == (False, None)
+    assert store.lookup('fat 5') == (False, None)
+
+def test_offline_store_reads_json_objects(tmp_path):
+    path = tmp_path / 'cache_operations.json'
+    path.write_text(json.dumps({'sum 1 2': 3.0}))
+
+    assert OfflineStore(str(path)).lookup('sum 1 2') == (True, 3.0)
@@ -0,0 +1,62 @@
+import math
+import pytest
+from server import math_operations as mo
+
+def _trial_division(n):
+    if n < 2:
+        return False
+    return all(n % d for d in range(2, math.isqrt(n) + 1))
+
+def test_sieve_matches_trial_division():
+    assert [n for n in range(-5, 5000) if mo.check_primes(n)] == [n for n in range(-5, 5000) if _trial_division(n)]
+
+def test_miller_rabin_range_matches_trial_division():
+    start = mo.SIEVE_LIMIT - 100
+    assert [mo.check_primes(n) for n in range(start, start + 3000)] == [_trial_division(n) for n in range(start, start + 3000)]
+
+@pytest.mark.parametrize('n', [
+    3215031751,            # Pseudoprimo forte para as bases 2, 3, 5 e 7
+    3825123056546413051,   # Pseudoprimo forte para as bases primas até 23
+    318665857834031151167461,  # Pseudoprimo forte para as bases primas até 37
+    41041 * 62745,         # Produto de números de Carmichael
+    (2 ** 61 - 1) * (2 ** 31 - 1),
+    (2 ** 89 - 1) * (2 ** 107 - 1),
+    (2 ** 127 - 1) ** 2,
+])
+def test_composites_are_rejected(n):
+    assert not mo.check_primes(n)
+
+@pytest.mark.parametrize('n', [2 ** 31 - 1, 2 ** 61 - 1, 2 ** 89 - 1, 2 ** 107 - 1, 2 ** 127 - 1, 2 ** 521 - 1])
+def test_mersenne_primes_are_accepted(n):
+    assert mo.check_primes(n)
+
+def test_prime_ranges_match_trial_division():
+    low, high = 10 ** 9, 10 ** 9 + 2000
+    expected = [n for n in range(low, high + 1) if _trial_division(n)]
+
+    assert mo.primes_in_range(low, high) == expected
+    assert mo.count_primes_in_range(low, high) == len(expected)
+    assert [p for chunk in mo.primes_in_range_chunks(low, high) for p in chunk] == expected
+
+def test_prime_count_up_to_ten_million():
+    assert mo.number_theory('pcount 0 10000000') == 664579
+
+def test_dense_prim_lists_use_sieve_with_same_answers():
+    numbers = list(range(10 ** 9, 10 ** 9 + 3000))
+    assert mo._sieve_is_cheaper(numbers[0], numbers[-1], len(numbers))
+    assert mo.number_theory('prim ' + ' '.join(map(str, numbers))) == [_trial_division(n) for n in numbers]
+
+def test_invalid_prime_ranges_return_error():
+    assert mo.number_theory('primes 10 1').startswith('Erro')
+    assert mo.number_theory(f'pcount 0 {mo.MAX_PRIME_RANGE + 1}').startswith('Erro')
+    assert mo.number_theory(f'primes {mo.MAX_PRIME_RANGE_END} {mo.MAX_PRIME_RANGE_END + 1}').startswith('Erro')
+    assert mo.number_theory('prim 7 x') == 'Erro'
+
+def test_base_primes_are_reused_between_ranges():
+    low = 2 ** 44
+    first = mo.primes_in_range(low, low + 5000)
+    table = mo._base_primes(math.isqrt(low + 5000))
+
+    assert mo._base_primes(math.isqrt(low)) is table
+    assert first == [n for n in range(low, low + 5001) if mo.check_primes(n)]
+    assert mo.count_primes_in_range(low + 1000, low + 5000) == sum(1 for p in first if p >= low + 1000)
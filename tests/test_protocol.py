@@ -0,0 +1,116 @@
+import socket
+import asyncio
+import threading
+import pytest
+from common import protocol
+
+def _reader_pair(buffer_size=protocol.DEFAULT_BUFFER_SIZE, max_frame_size=protocol.DEFAULT_MAX_FRAME_SIZE):
+    left, right = socket.socketpair()
+    return left, right, protocol.FrameReader(right, buffer_size, max_frame_size)
+
+def test_header_round_trip():
+    header = protocol.encode_header(1234, protocol.FLAG_BATCH | protocol.FLAG_TTL)
+
+    assert len(header) == protocol.HEADER.size
+    assert protocol.decode_header(header) == (protocol.FLAG_BATCH | protocol.FLAG_TTL, 1234)
+
+def test_decode_header_rejects_other_version_and_oversized_frames():
+    with pytest.raises(protocol.ProtocolError):
+        protocol.decode_header(protocol.HEADER.pack(protocol.PROTOCOL_VERSION + 1, 0, 1))
+    with pytest.raises(protocol.ProtocolError):
+        protocol.decode_header(protocol.encode_header(101), max_frame_size=100)
+
+def test_ttl_is_prefixed_only_when_present():
+    assert protocol.pack_ttl(b'3.0', None) == (0, b'3.0')
+
+    flags, payload = protocol.pack_ttl(b'3.0', 59.2)
+    assert flags == protocol.FLAG_TTL
+    assert protocol.unpack_ttl(flags, payload) == (60, b'3.0')
+    assert protocol.unpack_ttl(0, b'3.0') == (None, b'3.0')
+
+def test_reader_splits_frames_sent_together():
+    left, right, reader = _reader_pair()
+    with left, right:
+        left.sendall(protocol.encode_frame(b'sum 1 2') + protocol.encode_frame(b'', protocol.FLAG_STREAM)
+                     + protocol.encode_frame(b'fat 5', protocol.FLAG_BINARY))
+
+        assert reader.read_frame() == (0, b'sum 1 2')
+        assert reader.has_buffered_data()
+        assert reader.read_frame() == (protocol.FLAG_STREAM, b'')
+        assert reader.read_frame() == (protocol.FLAG_BINARY, b'fat 5')
+        assert not reader.has_buffered_data()
+
+def test_reader_grows_buffer_for_large_frames():
+    payload = bytes(range(256)) * 4096
+    left, right, reader = _reader_pair(buffer_size=1024)
+    with left, right:
+        def send():
+            left.sendall(protocol.encode_frame(b'a'))
+            protocol.send_frame(left, payload)
+            left.sendall(protocol.encode_frame(b'b'))
+
+        # O payload não cabe no buffer do socket: o envio precisa acontecer junto com a leitura
+        sender = threading.Thread(target=send)
+        sender.start()
+
+        assert reader.read_frame() == (0, b'a')
+        assert reader.read_frame() == (0, payload)
+        assert reader.read_frame() == (0, b'b')
+        sender.join()
+
+def test_reader_returns_none_when_closed_between_frames():
+    left, right, reader = _reader_pair()
+    with right:
+        left.sendall(protocol.encode_frame(b'news'))
+        left.close()
+
+        assert reader.read_frame() == (0, b'news')
+        assert reader.read_frame() is None
+
+def test_reader_rejects_connection_closed_mid_frame():
+    left, right, reader = _reader_pair()
+    with right:
+        left.sendall(protocol.encode_frame(b'sum 1 2')[:-2])
+        left.close()
+
+        with pytest.raises(protocol.ProtocolError):
+            reader.read_frame()
+
+def test_reader_rejects_oversized_frame():
+    left, right, reader = _reader_pair(max_frame_size=8)
+    with left, right:
+        left.sendall(protocol.encode_frame(b'x' * 9))
+
+        with pytest.raises(protocol.ProtocolError):
+            reader.read_frame()
+
+def test_async_read_and_write_frames():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(protocol.encode_frame(b'prim 7', protocol.FLAG_BINARY) + protocol.encode_frame(b'x' * 100)[:10])
+        reader.feed_eof()
+
+        assert await protocol.read_frame_async(reader) == (protocol.FLAG_BINARY, b'prim 7')
+        with pytest.raises(protocol.ProtocolError):
+            await protocol.read_frame_async(reader)
+
+        empty = asyncio.StreamReader()
+        empty.feed_eof()
+        assert await protocol.read_frame_async(empty) is None
+
+    asyncio.run(scenario())
+
+def test_write_frame_matches_encode_frame():
+    class Writer:
+        def __init__(self):
+            self.data = bytearray()
+
+        def write(self, data):
+            self.data += data
+
+    small, large = Writer(), Writer()
+    protocol.write_frame(small, b'abc', protocol.FLAG_TTL)
+    protocol.write_frame(large, b'y' * (protocol._COALESCE_LIMIT + 1))
+
+    assert bytes(small.data) == protocol.encode_frame(b'abc', protocol.FLAG_TTL)
+    assert bytes(large.data) == protocol.encode_frame(b'y' * (protocol._COALESCE_LIMIT + 1))
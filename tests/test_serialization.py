@@ -0,0 +1,53 @@
+import pytest
+from fractions import Fraction
+from common import protocol, serialization
+
+@pytest.mark.parametrize('value', [
+    None, True, False, 0, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 200, -(3 ** 300), 0.1, float('inf'),
+    '', 'Erro: Divisão por zero não é permitida.', '0.3000000000000000001', b'\x00\xff',
+    [True, False, True], [1, 2, 3], [1.5, -2.0], [1, 2 ** 70], [1, 'a', None, [2.5]], {'a': [1, 2], 'b': None},
+])
+def test_binary_round_trip(value):
+    assert serialization.decode(serialization.encode(value)) == value
+
+def test_binary_vectors_are_compact():
+    assert len(serialization.encode([True] * 1000)) == 1 + 4 + 1000
+    assert len(serialization.encode(list(range(1000)))) == 1 + 4 + 8 * 1000
+
+def test_binary_decode_rejects_trailing_bytes():
+    with pytest.raises(serialization.SerializationError):
+        serialization.decode(serialization.encode(1) + b'\x00')
+
+def test_negotiate_picks_first_supported_format():
+    assert serialization.negotiate(b'msgpack, binary,text') == serialization.WIRE_BINARY
+    assert serialization.negotiate(b'msgpack') == serialization.WIRE_TEXT
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('value', [
+    '0.3000000000000000001', '120', '1/3', '-7', 'true', 'null', 'NaN', '"citado"', '[1, 2]',
+    'Erro: Comando desconhecido!', 3.0, 120, [True, False], ['Manchete 1', 'Manchete 2'], '',
+])
+def test_replies_keep_their_type(value, binary):
+    flags, payload = serialization.encode_reply(value, 30, binary)
+    assert serialization.decode_reply(flags, payload) == (value, 30)
+
+    flags, payload = serialization.encode_batch_reply([(value, None), ('42', 5)], binary)
+    assert serialization.decode_batch_reply(flags, payload) == [(value, None), ('42', 5)]
+
+def test_reply_of_other_types_is_sent_as_text():
+    flags, payload = serialization.encode_reply(Fraction(1, 3), None, True)
+    assert serialization.decode_reply(flags, payload) == ('1/3', None)
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_requests_round_trip(binary):
+    for message in ('sum 1 2', ['sum 1 2', 'fat 5']):
+        flags, payload = serialization.encode_request(message, binary)
+        assert bool(flags & protocol.FLAG_BATCH) == isinstance(message, list)
+        assert serialization.decode_request(flags, payload) == message
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_stream_chunks_keep_digits_as_text(binary):
+    for chunk in ('0012', [2, 3, 5]):
+        flags, payload = serialization.encode_stream_chunk(chunk, binary)
+        assert flags & protocol.FLAG_STREAM and payload
+        assert serialization.decode_stream_chunk(flags, payload) == chunk
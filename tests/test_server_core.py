@@ -0,0 +1,200 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from common import protocol, serialization
+from server import server_core
+
+class Client:
+    """
+        Conexão persistente de teste com o servidor.
+    """
+
+    def __init__(self, port, timeout=5):
+        self.sock = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+        self.reader = protocol.FrameReader(self.sock)
+
+    def send(self, message, binary=False, flags=0):
+        request_flags, payload = serialization.encode_request(message, binary)
+        protocol.send_frame(self.sock, payload, request_flags | flags)
+
+    def read(self):
+        return self.reader.read_frame()
+
+    def call(self, message, binary=False):
+        self.send(message, binary)
+        flags, payload = self.read()
+        if flags & protocol.FLAG_BATCH:
+            return serialization.decode_batch_reply(flags, payload)
+        return serialization.decode_reply(flags, payload)
+
+    def negotiate(self):
+        offer = ','.join(serialization.SUPPORTED_WIRE_FORMATS).encode()
+        protocol.send_frame(self.sock, offer, protocol.FLAG_HELLO)
+        flags, payload = self.read()
+        return bool(flags & protocol.FLAG_HELLO) and payload == serialization.WIRE_BINARY.encode()
+
+    def close(self):
+        self.sock.close()
+
+SERVE_MODES = [server_core.serve_threads, server_core.serve_asyncio]
+
+def handler(command):
+    """
+        Handler de teste: "ttl x" responde x com TTL de 30 segundos; "fail" lança exceção; os demais comandos são
+        devolvidos como recebidos.
+    """
+    if command.startswith('ttl '):
+        return server_core.Reply(command[4:], 30)
+    if command == 'fail':
+        raise RuntimeError('falha no handler')
+    return command
+
+def stream_handler(command):
+    """
+        Handler de partes de teste: "count n" gera as partes "0" ... "n-1"; os demais comandos vão para handler.
+    """
+    if command.startswith('count '):
+        return iter(str(i) for i in range(int(command[6:])))
+    return handler(command)
+
+def test_full_pool_does_not_block_the_event_loop(start_server):
+    entered = threading.Event()
+    release = threading.Event()
+
+    def handler(command):
+        if command == 'block':
+            entered.set()
+            release.wait(5)
+        return command
+
+    port = start_server(server_core.serve_threads, handler, max_workers=1, max_in_flight=1, idle_timeout=0.5)
+
+    busy = Client(port)
+    busy.send('block')
+    assert entered.wait(5)
+
+    # Sem vaga: a requisição aguarda na fila enquanto o loop continua aceitando e fechando conexões ociosas
+    waiting = Client(port)
+    waiting.send('fila')
+    idle = Client(port)
+    assert idle.sock.recv(1) == b''
+
+    release.set()
+    assert busy.read() is not None
+    assert serialization.decode_reply(*waiting.read()) == ('fila', None)
+
+    busy.close()
+    waiting.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_keep_alive_serves_several_requests_per_connection(start_server, serve):
+    port = start_server(serve, handler)
+    client = Client(port)
+
+    for i in range(5):
+        assert client.call(f'sum {i}') == (f'sum {i}', None)
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_reply_ttl_and_binary_format(start_server, serve):
+    port = start_server(serve, handler)
+    client = Client(port)
+
+    assert client.call('ttl 120') == ('120', 30)
+    assert client.negotiate()
+    assert client.call('ttl 120', binary=True) == ('120', 30)
+    assert client.call('', binary=True) == ('', None)
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+@pytest.mark.parametrize('binary', [False, True])
+def test_batch_frame_answers_every_command_in_order(start_server, serve, binary):
+    port = start_server(serve, handler)
+    client = Client(port)
+    if binary:
+        assert client.negotiate()
+
+    assert client.call(['a', 'ttl b', ' ', 'c'], binary) == [('a', None), ('b', 30), ('', None), ('c', None)]
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_pipelined_requests_are_answered_in_order(start_server, serve):
+    port = start_server(serve, handler)
+    client = Client(port)
+
+    for i in range(10):
+        client.send(f'cmd {i}')
+    assert [serialization.decode_reply(*client.read()) for _ in range(10)] == [(f'cmd {i}', None) for i in range(10)]
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+@pytest.mark.parametrize('binary', [False, True])
+def test_stream_frames(start_server, serve, binary):
+    port = start_server(serve, handler, stream_handler=stream_handler)
+    client = Client(port)
+    if binary:
+        assert client.negotiate()
+
+    client.send('count 3', binary, protocol.FLAG_STREAM)
+    chunks = []
+    while True:
+        flags, payload = client.read()
+        assert flags & protocol.FLAG_STREAM
+        if not payload:
+            break
+        chunks.append(serialization.decode_stream_chunk(flags, payload))
+    assert chunks == ['0', '1', '2']
+
+    # Comandos que não são gerados em partes voltam em um único frame comum, na mesma conexão
+    client.send('ttl 5', binary, protocol.FLAG_STREAM)
+    flags, payload = client.read()
+    assert not flags & protocol.FLAG_STREAM
+    assert serialization.decode_reply(flags, payload) == ('5', 30)
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_idle_connections_are_closed(start_server, serve):
+    port = start_server(serve, handler, idle_timeout=0.3)
+    client = Client(port)
+
+    assert client.call('a') == ('a', None)
+    assert client.sock.recv(1) == b''
+    client.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_handler_error_closes_only_its_connection(start_server, serve):
+    port = start_server(serve, handler)
+    failing = Client(port)
+    healthy = Client(port)
+
+    failing.send('fail')
+    assert failing.read() is None
+    assert healthy.call('ok') == ('ok', None)
+    healthy.close()
+
+@pytest.mark.parametrize('serve', SERVE_MODES)
+def test_max_in_flight_limits_concurrent_requests(start_server, serve):
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def slow_handler(command):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return command
+
+    port = start_server(serve, slow_handler, max_workers=4, max_in_flight=2)
+    clients = [Client(port) for _ in range(6)]
+    for i, client in enumerate(clients):
+        client.send(f'cmd {i}')
+
+    assert [serialization.decode_reply(*client.read()) for client in clients] == [(f'cmd {i}', None) for i in range(6)]
+    assert running[1] <= 2
+    for client in clients:
+        client.close()
@@ -0,0 +1,145 @@
+import asyncio
+import time
+import threading
+
+import pytest
+
+from common.singleflight import SingleFlight, AsyncSingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 42
+
+    leader = threading.Thread(target=lambda: results.append(flights.do('k', compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flights.do('k', compute)))
+    follower.start()
+    while not flights.coalesced:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [42, 42]
+    assert len(calls) == 1
+
+def test_async_calls_share_one_execution():
+    async def main():
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'ok'
+
+        results = await asyncio.gather(*(flights.do('k', compute) for _ in range(5)))
+        return results, calls, flights.coalesced
+
+    results, calls, coalesced = asyncio.run(main())
+    assert results == ['ok'] * 5
+    assert len(calls) == 1
+    assert coalesced == 4
+
+def test_async_leader_cancellation_does_not_cancel_followers():
+    async def main():
+        flights = AsyncSingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return 'ok'
+
+        leader = asyncio.create_task(flights.do('k', compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do('k', compute))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await follower, flights.coalesced
+
+    assert asyncio.run(main()) == ('ok', 1)
+
+def test_async_computation_cancelled_when_every_caller_gives_up():
+    async def main():
+        flights = AsyncSingleFlight()
+        cancelled = asyncio.Event()
+
+        async def compute():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flights.do('k', compute)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        # Uma nova chamada não reaproveita a computação cancelada
+        async def fresh():
+            return 'novo'
+
+        return await flights.do('k', fresh)
+
+    assert asyncio.run(main()) == 'novo'
+
+def test_async_exception_reaches_every_caller():
+    async def main():
+        flights = AsyncSingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise ValueError('falhou')
+
+        return await asyncio.gather(*(flights.do('k', compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_client_does_not_coalesce_calls_to_different_replicas(monkeypatch):
+    from client import tcp_client
+    from client.rpc_exception import RPCServerNotFound
+
+    started = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def request_reply(command, host, port):
+        calls.append(port)
+        started.wait()
+        if port == 1:
+            raise RPCServerNotFound(host, port)
+        return 'ok', None
+
+    monkeypatch.setattr(tcp_client, '_request_reply', request_reply)
+    results = {}
+
+    def call(port):
+        try:
+            results[port] = tcp_client.rpc_connection('sum 1 2', '127.0.0.1', port, use_cache=False)
+        except RPCServerNotFound:
+            results[port] = 'falhou'
+
+    threads = [threading.Thread(target=call, args=(port,)) for port in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(calls) == [1, 2]
+    assert results == {1: 'falhou', 2: 'ok'}
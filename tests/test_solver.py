@@ -0,0 +1,73 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from server.solver import SolverService, FakeBackend, INVALID_PROBLEM, DEFAULT_BATCH_SIZE
+
+PROBLEMS = {
+    'Quanto é 2 + 3 * 4?': '14',
+    'Calcule 10 / 4': '2.5',
+    'Quanto é (1 + 2) ** 3?': '27',
+    'Resolva 7 - 9': '-2',
+    'Quanto é 6 * 7?': '42',
+    'Qual é a capital da França?': INVALID_PROBLEM,
+}
+
+class TruncatedBatchBackend(FakeBackend):
+    """
+        Responde os lotes com um objeto a menos que o número de problemas.
+    """
+
+    def generate(self, prompt, timeout=None):
+        text = super().generate(prompt, timeout)
+        if 'PROBLEMAS:' in prompt:
+            return json.dumps(json.loads(text)[:-1])
+        return text
+
+def solve_concurrently(service, problems):
+    with ThreadPoolExecutor(max_workers=len(problems)) as pool:
+        return list(pool.map(service.solve, problems))
+
+def test_solves_single_problem():
+    service = SolverService(FakeBackend())
+    assert service.solve('Quanto é 2 + 3 * 4?') == '14'
+    assert service.solve('Qual é a capital da França?') == INVALID_PROBLEM
+
+def test_batching_is_disabled_by_default():
+    assert DEFAULT_BATCH_SIZE == 1
+
+    service = SolverService(FakeBackend(), batch_wait=0.2)
+    assert solve_concurrently(service, list(PROBLEMS)) == list(PROBLEMS.values())
+    assert service.model_calls == len(PROBLEMS)
+
+def test_concurrent_problems_are_batched():
+    backend = FakeBackend()
+    service = SolverService(backend, batch_size=8, batch_wait=0.2)
+
+    assert solve_concurrently(service, list(PROBLEMS)) == list(PROBLEMS.values())
+    assert service.model_calls < len(PROBLEMS)
+    assert backend.calls == service.model_calls
+
+def test_batch_size_limits_problems_per_call():
+    service = SolverService(FakeBackend(), batch_size=2, batch_wait=0.2)
+
+    assert solve_concurrently(service, list(PROBLEMS)) == list(PROBLEMS.values())
+    assert service.model_calls >= len(PROBLEMS) // 2
+
+def test_malformed_batch_falls_back_to_one_call_per_problem():
+    service = SolverService(TruncatedBatchBackend(), batch_size=8, batch_wait=0.2)
+    problems = list(PROBLEMS)[:3]
+
+    assert solve_concurrently(service, problems) == [PROBLEMS[problem] for problem in problems]
+    # Uma chamada para o lote descartado e uma para cada problema
+    assert service.model_calls == 1 + len(problems)
+
+def test_timeout_returns_none():
+    service = SolverService(FakeBackend(latency=0.5), timeout=0.05)
+    assert service.solve('Quanto é 1 + 1?') is None
+
+def test_backend_error_returns_none():
+    class BrokenBackend(FakeBackend):
+        def generate(self, prompt, timeout=None):
+            raise ConnectionError('sem rede')
+
+    assert SolverService(BrokenBackend()).solve('Quanto é 1 + 1?') is None